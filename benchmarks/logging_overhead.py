@@ -0,0 +1,101 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Benchmark measuring the logging overhead of a feed poll per logging profile, compared with the former eager
+f-string messages. Fails if the 'hot_path' profile exceeds its overhead budget per poll.
+
+Usage: python benchmarks/logging_overhead.py [poll_count]
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import os
+import sys
+import time
+import typing
+
+import structlog
+
+from rss_feeds_backend.common.logging_profile import LOG_PROFILE_MAP, IngestionSummary, configure_logging
+
+DEFAULT_POLL_COUNT = 20000
+HOT_PATH_BUDGET_MICROSECONDS = 15.0  # logging overhead allowed per poll in the 'hot_path' profile
+FEED_URL = "https://example.com/feed"
+
+
+def log_eager_poll(logger: typing.Any, summary: IngestionSummary) -> None:
+    """
+    Logs a poll storing 5 new posts of 25 the way the ingestion did before the logging profiles
+
+    Args:
+        logger: the structlog logger
+        summary: unused, keeps the signature of the poll loggers
+    """
+    logger.info(f"Async REST GET is successful from url '{FEED_URL}'")
+    logger.info("Feed is retrieved successfully!")
+    logger.info("Feed object is instantiated!")
+    logger.info("Feed object will be updated")
+    logger.info(f"{5} new posts will be inserted, {20} posts already exist")
+
+
+def log_profiled_poll(logger: typing.Any, summary: IngestionSummary) -> None:
+    """
+    Logs a poll storing 5 new posts of 25 the way the ingestion does with the logging profiles
+
+    Args:
+        logger: the structlog logger
+        summary: aggregates the outcomes of the polls
+    """
+    logger.debug("Async REST GET is successful", url=FEED_URL)
+    logger.debug("Feed object will be updated", link=FEED_URL)
+    logger.debug("Posts will be inserted", new=5, existing=20)
+    logger.info("Poll summary", address=FEED_URL, outcome="stored", seen=25, new=5, sampled=True)
+    summary.record("stored", seen=25, new=5)
+
+
+def measure(log_poll: typing.Callable[[typing.Any, IngestionSummary], None], poll_count: int) -> float:
+    """
+    Measures the logging time of the polls with a logger of the current configuration
+
+    Args:
+        log_poll: logs a single poll
+        poll_count: number of the polls to log
+
+    Returns:
+        microseconds spent on logging per poll
+    """
+    logger = structlog.get_logger()  # a used logger keeps the configuration it is first used with
+    summary = IngestionSummary()
+    start = time.perf_counter()
+    for _ in range(poll_count):
+        log_poll(logger, summary)
+    return (time.perf_counter() - start) * 1e6 / poll_count
+
+
+def main() -> None:
+    """Prints the logging overhead per poll of every profile and checks the budget of the 'hot_path' profile"""
+    poll_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_POLL_COUNT
+    with open(os.devnull, "w") as null_file:
+        logger_factory = structlog.PrintLoggerFactory(file=null_file)  # the cost of the terminal is not measured
+        configure_logging("verbose", logger_factory)
+        print(f"[   eager f-strings] {measure(log_eager_poll, poll_count):>8.2f} us/poll")
+        overheads = {}
+        for profile_name in LOG_PROFILE_MAP:
+            configure_logging(profile_name, logger_factory)
+            overheads[profile_name] = measure(log_profiled_poll, poll_count)
+            print(f"[{profile_name:>18}] {overheads[profile_name]:>8.2f} us/poll")
+    verdict = "within" if overheads["hot_path"] <= HOT_PATH_BUDGET_MICROSECONDS else "OVER"
+    print(f"'hot_path' profile is {verdict} the budget of {HOT_PATH_BUDGET_MICROSECONDS} us/poll")
+    sys.exit(0 if verdict == "within" else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Benchmark comparing the memory allocations of the XML extraction when the feed content is handed over as
+a decoded string (the former 'response.text' path) and as raw bytes (the current 'response.content' path).
+
+Usage: python benchmarks/xml_extraction_allocations.py [item_count]
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import logging
+import sys
+import time
+import tracemalloc
+import typing
+
+import structlog
+
+from rss_feeds_backend.feed_processing.feed_extractors.xml_extractor import XmlExtractor
+
+DEFAULT_ITEM_COUNT = 10000
+DESCRIPTION_LENGTH = 1000
+KIBIBYTE = 1024
+
+
+def generate_feed(item_count: int) -> bytes:
+    """
+    Generates an RSS document as it would be received from a feed source
+
+    Args:
+        item_count: number of <item>s in the document
+
+    Returns:
+        the encoded RSS document
+    """
+    items = "".join(
+        f"<item><title>Title {index}</title><link>https://example.com/{index}</link>"
+        f"<description>{'ü' * DESCRIPTION_LENGTH}</description><guid>guid-{index}</guid>"
+        f"<pubDate>Mon, 02 Oct 2023 10:00:00 +0000</pubDate></item>"
+        for index in range(item_count)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss xmlns:atom="http://www.w3.org/2005/Atom"><channel>'
+        '<title>Benchmark</title><atom:link href="https://example.com/feed"/><description>Benchmark feed</description>'
+        f"<ttl>10</ttl><lastBuildDate>Mon, 02 Oct 2023 10:00:00 +0000</lastBuildDate>{items}</channel></rss>"
+    ).encode()
+
+
+def measure(extraction: typing.Callable[[], typing.Any]) -> typing.Tuple[int, float]:
+    """
+    Runs the extraction under tracemalloc
+
+    Args:
+        extraction: the extraction to measure
+
+    Returns:
+        peak traced memory in KiB and the elapsed seconds
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    extraction()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak // KIBIBYTE, elapsed
+
+
+def main() -> None:
+    """Prints the peak allocations of the str and bytes paths for the full and the streaming extraction"""
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    item_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ITEM_COUNT
+    raw_content = generate_feed(item_count)
+    known_guids = frozenset(f"guid-{index}" for index in range(5, item_count))  # a typical poll: 5 new items
+    print(f"Feed size: {len(raw_content) // KIBIBYTE} KiB, {item_count} items")
+    for streaming in (False, True):
+        extractor = XmlExtractor(streaming=streaming)
+        str_peak, str_elapsed = measure(lambda: extractor.extract_records(raw_content.decode(), known_guids))
+        bytes_peak, bytes_elapsed = measure(lambda: extractor.extract_records(raw_content, known_guids))
+        mode = "streaming" if streaming else "full tree"
+        print(f"[{mode:>9}] str path: peak {str_peak:>8} KiB in {str_elapsed:.3f}s | "
+              f"bytes path: peak {bytes_peak:>8} KiB in {bytes_elapsed:.3f}s | "
+              f"allocation drop: {100 * (1 - bytes_peak / str_peak):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
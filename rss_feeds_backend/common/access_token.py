@@ -0,0 +1,195 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of the signed expiring access tokens and their deny list
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+import typing
+
+import orjson
+import structlog
+
+from rss_feeds_backend.exceptions import InvalidTokenError
+
+LOGGER = structlog.get_logger()
+TOKEN_TTL = int(os.getenv("RSS_FEEDS_TOKEN_TTL", "3600"))  # seconds a token stays valid after it is issued
+TOKEN_SECRET = os.getenv("RSS_FEEDS_TOKEN_SECRET", "")  # random per process if not set, tokens die on restart
+HEADER_SEGMENT = base64.urlsafe_b64encode(orjson.dumps({"alg": "HS256", "typ": "JWT"})).rstrip(b"=")
+
+
+def _b64encode(data: bytes) -> bytes:
+    """
+    Encodes the data as unpadded base64url, as in the JWT segments
+
+    Args:
+        data: raw bytes
+
+    Returns:
+        encoded bytes
+    """
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(segment: bytes) -> bytes:
+    """
+    Decodes an unpadded base64url segment
+
+    Args:
+        segment: encoded bytes
+
+    Returns:
+        raw bytes
+    """
+    return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+
+class TokenDenyList:
+    """
+    In-memory deny list of the revoked tokens. A token is only kept until it expires, since an expired token is
+    rejected anyway; so the list stays as small as the number of tokens revoked within the last TTL.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the TokenDenyList object"""
+        self.expiries: typing.Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, token_id: str, expiry: float) -> None:
+        """
+        Denies the token until it expires
+
+        Args:
+            token_id: unique id of the token
+            expiry: epoch seconds when the token expires
+        """
+        with self._lock:
+            now = time.time()
+            for expired_id in [key for key, value in self.expiries.items() if value <= now]:
+                del self.expiries[expired_id]
+            self.expiries[token_id] = expiry
+
+    def __contains__(self, token_id: str) -> bool:
+        """
+        Checks whether the token is revoked
+
+        Args:
+            token_id: unique id of the token
+
+        Returns:
+            True if the token is revoked, False otherwise
+        """
+        return token_id in self.expiries
+
+    def __len__(self) -> int:
+        """
+        Returns the number of revoked tokens which are not purged yet
+
+        Returns:
+            size of the deny list
+        """
+        return len(self.expiries)
+
+
+class TokenSigner:
+    """
+    Issues and verifies JWT compatible access tokens signed with HMAC-SHA256. A token carries the id and the name
+    of the user, so that the requests are authenticated without a DB query.
+    """
+
+    def __init__(self, secret: str = TOKEN_SECRET, ttl: int = TOKEN_TTL) -> None:
+        """
+        Initializes the TokenSigner object
+
+        Args:
+            secret: key of the signatures, has to be shared by all the processes serving the API
+            ttl: seconds a token stays valid after it is issued
+        """
+        if not secret:
+            LOGGER.warning("RSS_FEEDS_TOKEN_SECRET is not set, the issued tokens are only valid for this process!")
+        self.key: bytes = secret.encode() if secret else secrets.token_bytes(32)
+        self.ttl: int = ttl
+        self.deny_list: TokenDenyList = TokenDenyList()
+
+    def issue(self, user_id: int, username: str) -> str:
+        """
+        Issues a new token of the user
+
+        Args:
+            user_id: primary key of the user
+            username: name of the user
+
+        Returns:
+            the signed token
+        """
+        now = int(time.time())
+        claims = {"sub": username, "uid": user_id, "iat": now, "exp": now + self.ttl, "jti": secrets.token_hex(8)}
+        signing_input = HEADER_SEGMENT + b"." + _b64encode(orjson.dumps(claims))
+        return (signing_input + b"." + _b64encode(self._sign(signing_input))).decode()
+
+    def verify(self, token: str) -> typing.Dict[str, typing.Any]:
+        """
+        Checks the signature, the expiry and the revocation of the token
+
+        Args:
+            token: the token issued by this signer
+
+        Returns:
+            claims of the token
+
+        Raises:
+            InvalidTokenError: if the token is malformed, forged, expired or revoked
+        """
+        try:
+            signing_input, signature = token.encode().rsplit(b".", 1)
+            if not hmac.compare_digest(_b64decode(signature), self._sign(signing_input)):
+                raise InvalidTokenError("Signature does not match!")
+            claims = orjson.loads(_b64decode(signing_input.split(b".", 1)[1]))
+        except (ValueError, IndexError, binascii.Error, orjson.JSONDecodeError) as exc:
+            raise InvalidTokenError(f"Token is malformed! {exc}")
+        if claims["exp"] <= time.time():
+            raise InvalidTokenError("Token is expired!")
+        if claims["jti"] in self.deny_list:
+            raise InvalidTokenError("Token is revoked!")
+        return claims
+
+    def revoke(self, claims: typing.Dict[str, typing.Any]) -> None:
+        """
+        Revokes a verified token until it expires
+
+        Args:
+            claims: claims of the verified token
+        """
+        self.deny_list.revoke(claims["jti"], claims["exp"])
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        """
+        Computes the signature of the header and the claims
+
+        Args:
+            signing_input: encoded header and claims joined with a dot
+
+        Returns:
+            HMAC-SHA256 digest
+        """
+        return hmac.new(self.key, signing_input, hashlib.sha256).digest()
+
+
+TOKEN_SIGNER = TokenSigner()  # shared by all the requests of the process!
@@ -0,0 +1,198 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of the logging profiles, the sampled and lazy log fields and the ingestion summary
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import logging
+import os
+import threading
+import time
+import typing
+from types import MappingProxyType
+
+import structlog
+
+LOGGER = structlog.get_logger()
+LOG_PROFILE = os.getenv("RSS_FEEDS_LOG_PROFILE", "default")  # one of the keys of LOG_PROFILE_MAP
+SUMMARY_INTERVAL = float(os.getenv("RSS_FEEDS_LOG_SUMMARY_INTERVAL", "60"))  # seconds between ingestion summaries
+SAMPLED = "sampled"  # event field marking a per-item or per-poll event which may be sampled
+
+
+class LogProfile(typing.NamedTuple):
+    """Log level and sampling of a logging profile"""
+    level: int
+    sample_rate: int  # 1 of every sample_rate occurrences of a sampled event is written
+
+
+LOG_PROFILE_MAP = MappingProxyType(
+    {
+        "verbose": LogProfile(level=logging.DEBUG, sample_rate=1),
+        "default": LogProfile(level=logging.INFO, sample_rate=1),
+        "hot_path": LogProfile(level=logging.INFO, sample_rate=int(os.getenv("RSS_FEEDS_LOG_SAMPLE_RATE", "100"))),
+    },
+)
+
+
+class Lazy:
+    """Log field whose value is only computed if the event is written"""
+
+    __slots__ = ("function",)
+
+    def __init__(self, function: typing.Callable[[], typing.Any]) -> None:
+        """
+        Initializes the Lazy object
+
+        Args:
+            function: callable computing the value of the field
+        """
+        self.function = function
+
+
+class EventSampler:
+    """
+    structlog processor writing only 1 of every sample_rate occurrences of the events marked as sampled.
+    The written event carries the number of its occurrences so far.
+    """
+
+    def __init__(self, sample_rate: int) -> None:
+        """
+        Initializes the EventSampler object
+
+        Args:
+            sample_rate: 1 of every sample_rate occurrences of an event is written
+        """
+        self.sample_rate: int = sample_rate
+        self.counts: typing.Dict[str, int] = {}
+        self._lock = threading.Lock()  # the API and the ingestion threads log concurrently
+
+    def __call__(self, logger: typing.Any, method_name: str, event_dict: typing.Dict[str, typing.Any]) -> typing.Any:
+        """
+        Drops the sampled-out occurrences of the sampled events
+
+        Args:
+            logger: the wrapped logger
+            method_name: name of the called log method
+            event_dict: fields of the event
+
+        Returns:
+            the fields of the event to write
+
+        Raises:
+            DropEvent: if the occurrence is sampled out
+        """
+        if not event_dict.pop(SAMPLED, False) or self.sample_rate <= 1:
+            return event_dict
+        with self._lock:
+            count = self.counts.get(event_dict["event"], 0) + 1
+            self.counts[event_dict["event"]] = count
+        if (count - 1) % self.sample_rate:
+            raise structlog.DropEvent
+        event_dict["occurrences"] = count
+        return event_dict
+
+
+def resolve_lazy_fields(logger: typing.Any, method_name: str, event_dict: typing.Dict[str, typing.Any]) -> typing.Any:
+    """
+    structlog processor computing the Lazy fields of an event which is going to be written
+
+    Args:
+        logger: the wrapped logger
+        method_name: name of the called log method
+        event_dict: fields of the event
+
+    Returns:
+        the fields of the event with the computed values
+    """
+    for key, value in event_dict.items():
+        if isinstance(value, Lazy):
+            event_dict[key] = value.function()
+    return event_dict
+
+
+def configure_logging(
+        profile_name: str = LOG_PROFILE,
+        logger_factory: typing.Optional[typing.Callable[..., typing.Any]] = None,
+) -> LogProfile:
+    """
+    Configures structlog according to the logging profile. The calls below the level of the profile are no-ops and
+    the fields are passed unformatted, so the suppressed events cost a method call only.
+
+    Args:
+        profile_name: name of the profile, 'verbose', 'default' or 'hot_path'
+        logger_factory: factory of the wrapped loggers, printing to stdout if None
+
+    Returns:
+        the applied LogProfile
+
+    Raises:
+        ValueError: if the profile is not defined
+    """
+    profile = LOG_PROFILE_MAP.get(profile_name)
+    if profile is None:
+        raise ValueError(f"Logging profile '{profile_name}' is not defined!")
+    structlog.configure(
+        processors=[
+            EventSampler(profile.sample_rate),
+            resolve_lazy_fields,
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            structlog.processors.StackInfoRenderer(),
+            structlog.dev.set_exc_info,
+            structlog.processors.TimeStamper(fmt="%Y-%m-%d %H:%M:%S", utc=False),
+            structlog.dev.ConsoleRenderer(),
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(profile.level),
+        logger_factory=logger_factory or structlog.PrintLoggerFactory(),
+        cache_logger_on_first_use=True,
+    )
+    LOGGER.info(f"Logging profile '{profile_name}' is applied")
+    return profile
+
+
+class IngestionSummary:
+    """Aggregates the outcomes of the polls and writes them as a single event per interval"""
+
+    def __init__(self, interval: float = SUMMARY_INTERVAL) -> None:
+        """
+        Initializes the IngestionSummary object
+
+        Args:
+            interval: seconds between the written summaries
+        """
+        self.interval: float = interval
+        self.counters: typing.Dict[str, int] = {}
+        self.last_written: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str, seen: int = 0, new: int = 0) -> None:
+        """
+        Adds the outcome of a poll, writes the summary if the interval is elapsed
+
+        Args:
+            outcome: result of the poll, e.g. 'stored', 'not_modified', 'unchanged' or 'failed'
+            seen: number of the extracted items
+            new: number of the items which were not in the DB before
+        """
+        with self._lock:
+            for key, value in ((outcome, 1), ("seen", seen), ("new", new), ("skipped", seen - new)):
+                self.counters[key] = self.counters.get(key, 0) + value
+            now = time.monotonic()
+            if now - self.last_written < self.interval:
+                return
+            counters, self.counters = self.counters, {}
+            elapsed, self.last_written = now - self.last_written, now
+        LOGGER.info("Ingestion summary", seconds=round(elapsed, 1), **counters)
+
+
+INGESTION_SUMMARY = IngestionSummary()  # shared by all the feed processors of the process!
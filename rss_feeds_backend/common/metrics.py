@@ -0,0 +1,301 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of the in-process metrics registry exposed in Prometheus text format
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import threading
+import typing
+
+import structlog
+
+LOGGER = structlog.get_logger()
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4"  # the charset is appended by the response
+SUB_BUCKET_BITS = 7  # 64 linear sub-buckets per power of 2, the recorded values are kept within 1.6%
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+LabelValues = typing.Tuple[str, ...]
+
+
+def _format_labels(label_names: typing.Sequence[str], label_values: LabelValues, **extra: str) -> str:
+    """
+    Formats the labels of a sample in Prometheus text format
+
+    Args:
+        label_names: names of the labels of the metric
+        label_values: values of the labels in the order of their names
+        extra: additional labels, e.g. the quantile
+
+    Returns:
+        the labels within curly braces, empty string if there are no labels
+    """
+    pairs = list(zip(label_names, label_values)) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class Metric:
+    """Base class of the metrics, keeps a value per combination of the label values"""
+
+    metric_type: str = ""
+
+    def __init__(self, name: str, description: str, label_names: typing.Sequence[str] = ()) -> None:
+        """
+        Initializes the Metric object
+
+        Args:
+            name: name of the metric in Prometheus format, e.g. 'rss_feeds_polls_total'
+            description: help text of the metric
+            label_names: names of the labels distinguishing the samples
+        """
+        self.name: str = name
+        self.description: str = description
+        self.label_names: typing.Tuple[str, ...] = tuple(label_names)
+        self._lock = threading.Lock()  # the API and the ingestion threads record concurrently
+
+    def render(self) -> typing.List[str]:
+        """
+        Returns the lines of the metric in Prometheus text format
+
+        Returns:
+            the help, the type and the sample lines
+        """
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.metric_type}"]
+
+
+class Counter(Metric):
+    """Monotonically increasing count, e.g. the number of polls"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, description: str, label_names: typing.Sequence[str] = ()) -> None:
+        """
+        Initializes the Counter object
+
+        Args:
+            name: name of the metric in Prometheus format, e.g. 'rss_feeds_polls_total'
+            description: help text of the metric
+            label_names: names of the labels distinguishing the samples
+        """
+        super().__init__(name, description, label_names)
+        self.values: typing.Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, *label_values: str) -> None:
+        """
+        Increases the count of the label values
+
+        Args:
+            amount: the increment, not negative
+            label_values: values of the labels in the order of their names
+        """
+        with self._lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self) -> typing.List[str]:
+        """
+        Returns the lines of the counter in Prometheus text format
+
+        Returns:
+            the help, the type and a sample line per label values
+        """
+        lines = super().render()
+        with self._lock:
+            values = list(self.values.items())
+        for label_values, value in values:
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value:g}")
+        return lines
+
+
+class HdrRecorder:
+    """
+    HDR-style log-linear histogram of non-negative integers: the values are counted in buckets which are linear
+    within every power of 2, so the relative error stays bounded from microseconds to hours while at most 64 sparse
+    buckets are kept per power of 2. The percentiles are read without keeping the samples.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the HdrRecorder object"""
+        self.buckets: typing.Dict[int, int] = {}  # lower bound of the bucket -> number of values
+        self.count: int = 0
+        self.total: int = 0
+        self.max: int = 0
+
+    def record(self, value: int) -> None:
+        """
+        Counts the value in its bucket
+
+        Args:
+            value: the value to record, negative values are counted as 0
+        """
+        value = max(value, 0)
+        shift = max(value.bit_length() - SUB_BUCKET_BITS, 0)
+        lower_bound = value >> shift << shift
+        self.buckets[lower_bound] = self.buckets.get(lower_bound, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, quantile: float) -> int:
+        """
+        Returns the value below which the given fraction of the recorded values is
+
+        Args:
+            quantile: fraction between 0 and 1, e.g. 0.99
+
+        Returns:
+            the highest value equivalent to the bucket of the quantile, 0 if nothing is recorded
+        """
+        rank = quantile * self.count
+        seen = 0
+        for lower_bound in sorted(self.buckets):
+            seen += self.buckets[lower_bound]
+            if seen >= rank:
+                shift = max(lower_bound.bit_length() - SUB_BUCKET_BITS, 0)
+                return min(lower_bound + (1 << shift) - 1, self.max)
+        return self.max
+
+
+class Histogram(Metric):
+    """
+    Distribution of the observed values, e.g. latencies or sizes, exposed as a Prometheus summary of quantiles.
+    The values are recorded as integers of the given unit, e.g. microseconds for the latencies given in seconds.
+    """
+
+    metric_type = "summary"
+
+    def __init__(
+            self,
+            name: str,
+            description: str,
+            label_names: typing.Sequence[str] = (),
+            unit: float = 1.0,
+    ) -> None:
+        """
+        Initializes the Histogram object
+
+        Args:
+            name: name of the metric in Prometheus format, e.g. 'rss_feeds_fetch_seconds'
+            description: help text of the metric
+            label_names: names of the labels distinguishing the samples
+            unit: resolution of the recorded values, e.g. 1e-6 to record the seconds as microseconds
+        """
+        super().__init__(name, description, label_names)
+        self.unit: float = unit
+        self.recorders: typing.Dict[LabelValues, HdrRecorder] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """
+        Records the value for the label values
+
+        Args:
+            value: the observed value, e.g. seconds or bytes
+            label_values: values of the labels in the order of their names
+        """
+        with self._lock:
+            recorder = self.recorders.get(label_values)
+            if recorder is None:
+                recorder = self.recorders[label_values] = HdrRecorder()
+            recorder.record(round(value / self.unit))
+
+    def render(self) -> typing.List[str]:
+        """
+        Returns the lines of the histogram in Prometheus text format
+
+        Returns:
+            the help, the type, the quantile, sum and count lines per label values
+        """
+        lines = super().render()
+        with self._lock:
+            for label_values, recorder in self.recorders.items():
+                for quantile in QUANTILES:
+                    labels = _format_labels(self.label_names, label_values, quantile=str(quantile))
+                    lines.append(f"{self.name}{labels} {recorder.percentile(quantile) * self.unit:g}")
+                labels = _format_labels(self.label_names, label_values)
+                lines.append(f"{self.name}_sum{labels} {recorder.total * self.unit:g}")
+                lines.append(f"{self.name}_count{labels} {recorder.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Keeps the metrics of the process by their names"""
+
+    def __init__(self) -> None:
+        """Initializes the MetricsRegistry object"""
+        self.metrics: typing.Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str, label_names: typing.Sequence[str] = ()) -> Counter:
+        """
+        Returns the counter with the name, registers it on first use
+
+        Args:
+            name: name of the metric in Prometheus format
+            description: help text of the metric
+            label_names: names of the labels distinguishing the samples
+
+        Returns:
+            the Counter object
+        """
+        return self._register(Counter(name, description, label_names))
+
+    def histogram(
+            self,
+            name: str,
+            description: str,
+            label_names: typing.Sequence[str] = (),
+            unit: float = 1.0,
+    ) -> Histogram:
+        """
+        Returns the histogram with the name, registers it on first use
+
+        Args:
+            name: name of the metric in Prometheus format
+            description: help text of the metric
+            label_names: names of the labels distinguishing the samples
+            unit: resolution of the recorded values
+
+        Returns:
+            the Histogram object
+        """
+        return self._register(Histogram(name, description, label_names, unit=unit))
+
+    def render(self) -> str:
+        """
+        Returns all the metrics in Prometheus text format
+
+        Returns:
+            the exposition text
+        """
+        with self._lock:
+            metrics = list(self.metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+    def _register(self, metric: Metric) -> typing.Any:
+        """
+        Keeps the metric unless a metric with the same name is registered before
+
+        Args:
+            metric: the new metric
+
+        Returns:
+            the registered metric with the name
+        """
+        with self._lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+
+METRICS = MetricsRegistry()  # shared by the API and the ingestion of the process!
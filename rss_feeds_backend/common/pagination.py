@@ -0,0 +1,67 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of the keyset pagination helpers
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import base64
+import binascii
+import typing
+
+import orjson
+import structlog
+from fastapi import HTTPException
+from starlette import status
+
+LOGGER = structlog.get_logger()
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"  # response header carrying the cursor of the next page
+
+
+def encode_cursor(*values: typing.Any) -> str:
+    """
+    Encodes the sort key of the last item of a page into an opaque cursor
+
+    Args:
+        values: sort key values of the last item, e.g. publication date and id
+
+    Returns:
+        url safe cursor token
+    """
+    return base64.urlsafe_b64encode(orjson.dumps(values)).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, *converters: typing.Callable[[typing.Any], typing.Any]) -> typing.Tuple[typing.Any, ...]:
+    """
+    Decodes the cursor token back into the sort key values
+
+    Args:
+        cursor: cursor token returned by a previous page
+        converters: callables converting each decoded value into its sort key type
+
+    Returns:
+        tuple of the sort key values
+
+    Raises:
+        HTTPException: if the cursor is not issued by the application
+    """
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(converters):
+            raise ValueError("Unexpected number of values!")
+        return tuple(converter(value) for converter, value in zip(converters, values))
+    except (ValueError, TypeError, binascii.Error, orjson.JSONDecodeError) as exc:
+        error_message = f"Cursor '{cursor}' is not valid!"
+        LOGGER.error(f"{error_message} {exc}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error_message)
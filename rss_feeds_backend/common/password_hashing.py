@@ -0,0 +1,103 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of PasswordHasher class
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import asyncio
+import os
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+import structlog
+from passlib.context import CryptContext
+
+LOGGER = structlog.get_logger()
+PASSWORD_WORKERS = int(os.getenv("RSS_FEEDS_PASSWORD_WORKERS", str(os.cpu_count() or 1)))  # threads hashing
+pwd_context = CryptContext(schemes=["bcrypt"])
+
+
+class PasswordHasher:
+    """
+    Runs the bcrypt hashing and verification on a bounded pool of threads instead of the event loop.
+    bcrypt releases the GIL while hashing, so the threads use all the cores.
+    """
+
+    def __init__(self, worker_count: int = PASSWORD_WORKERS) -> None:
+        """
+        Initializes the PasswordHasher object, the pool is created on first use
+
+        Args:
+            worker_count: number of threads hashing in parallel, the other requests wait in the queue of the pool
+        """
+        self.worker_count: int = worker_count
+        self._pool: typing.Optional[ThreadPoolExecutor] = None
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        """
+        Returns the pool of the hashing threads, creates it on first use
+
+        Returns:
+            the thread pool
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.worker_count, thread_name_prefix="password")
+            LOGGER.info(f"Password hashing pool is created with {self.worker_count} threads")
+        return self._pool
+
+    async def hash(self, password: str) -> str:
+        """
+        Hashes the password without blocking the event loop
+
+        Args:
+            password: the plain password
+
+        Returns:
+            bcrypt hash of the password
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.pool, pwd_context.hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        """
+        Verifies the password against the hash without blocking the event loop
+
+        Args:
+            password: the plain password
+            password_hash: bcrypt hash to compare with
+
+        Returns:
+            True if the password is correct, False otherwise
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.pool, pwd_context.verify, password, password_hash)
+
+    def hash_many(self, passwords: typing.Iterable[str]) -> typing.List[str]:
+        """
+        Hashes the passwords in parallel, used outside of the event loop, e.g. by the provisioning script
+
+        Args:
+            passwords: the plain passwords
+
+        Returns:
+            bcrypt hashes in the order of the passwords
+        """
+        return list(self.pool.map(pwd_context.hash, passwords))
+
+    def shutdown(self) -> None:
+        """Stops the threads of the pool, if it is created"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+PASSWORD_HASHER = PasswordHasher()  # shared by all the requests of the process!
@@ -0,0 +1,277 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of ReadBitmap class
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import sys
+import typing
+from array import array
+from bisect import bisect_left
+
+CONTAINER_BITS = 16  # low bits of a value stored within its container
+CONTAINER_MASK = (1 << CONTAINER_BITS) - 1
+BITMAP_BYTES = (1 << CONTAINER_BITS) // 8  # 8 KiB, fixed size of a bitmap container
+ARRAY_LIMIT = 4096  # an array container holding more values than this is larger than a bitmap container
+Container = typing.Union[array, bytearray]
+
+
+class ReadBitmap:
+    """
+    Roaring-style compressed set of non-negative integers below 2**32, e.g. the ids of the posts read by a user.
+    The values are grouped by their high 16 bits into containers. Sparse containers are sorted arrays of 2-byte
+    values, dense containers are 8 KiB bitmaps.
+    """
+
+    def __init__(self, values: typing.Iterable[int] = ()) -> None:
+        """
+        Initializes the ReadBitmap object
+
+        Args:
+            values: initial values of the set
+        """
+        self.containers: typing.Dict[int, Container] = {}
+        self.cardinalities: typing.Dict[int, int] = {}
+        self.update(values)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of values in the set
+
+        Returns:
+            cardinality of the set
+        """
+        return sum(self.cardinalities.values())
+
+    def __contains__(self, value: int) -> bool:
+        """
+        Checks whether the value is in the set
+
+        Args:
+            value: the value to check
+
+        Returns:
+            True if the value is in the set, False otherwise
+        """
+        container = self.containers.get(value >> CONTAINER_BITS)
+        return container is not None and self._contains_low(container, value & CONTAINER_MASK)
+
+    def __iter__(self) -> typing.Iterator[int]:
+        """
+        Iterates over the values in ascending order
+
+        Yields:
+            values of the set
+        """
+        for high in sorted(self.containers):
+            base = high << CONTAINER_BITS
+            container = self.containers[high]
+            if isinstance(container, array):
+                yield from (base + low for low in container)
+                continue
+            for byte_index, byte in enumerate(container):
+                while byte:
+                    lowest_bit = byte & -byte
+                    yield base + (byte_index << 3) + lowest_bit.bit_length() - 1
+                    byte ^= lowest_bit
+
+    def add(self, value: int) -> bool:
+        """
+        Adds the value to the set
+
+        Args:
+            value: the value to add
+
+        Returns:
+            True if the value is added, False if it was already in the set
+        """
+        high, low = value >> CONTAINER_BITS, value & CONTAINER_MASK
+        container = self.containers.setdefault(high, array("H"))
+        if isinstance(container, bytearray):
+            mask = 1 << (low & 7)
+            if container[low >> 3] & mask:
+                return False
+            container[low >> 3] |= mask
+        else:
+            index = bisect_left(container, low)
+            if index < len(container) and container[index] == low:
+                return False
+            container.insert(index, low)
+        self.cardinalities[high] = self.cardinalities.get(high, 0) + 1
+        if isinstance(container, array) and len(container) > ARRAY_LIMIT:
+            self.containers[high] = self._to_bitmap(container)
+        return True
+
+    def discard(self, value: int) -> bool:
+        """
+        Removes the value from the set if it is present
+
+        Args:
+            value: the value to remove
+
+        Returns:
+            True if the value is removed, False if it was not in the set
+        """
+        high, low = value >> CONTAINER_BITS, value & CONTAINER_MASK
+        container = self.containers.get(high)
+        if container is None:
+            return False
+        if isinstance(container, bytearray):
+            mask = 1 << (low & 7)
+            if not container[low >> 3] & mask:
+                return False
+            container[low >> 3] &= ~mask
+        else:
+            index = bisect_left(container, low)
+            if index == len(container) or container[index] != low:
+                return False
+            del container[index]
+        self.cardinalities[high] -= 1
+        if not self.cardinalities[high]:
+            del self.containers[high]
+            del self.cardinalities[high]
+        elif isinstance(container, bytearray) and self.cardinalities[high] <= ARRAY_LIMIT:
+            self.containers[high] = self._to_array(container)
+        return True
+
+    def update(self, values: typing.Iterable[int]) -> None:
+        """
+        Adds all the values to the set
+
+        Args:
+            values: the values to add
+        """
+        for value in values:
+            self.add(value)
+
+    def partition(self, values: typing.Iterable[int]) -> typing.Tuple[typing.List[int], typing.List[int]]:
+        """
+        Splits the given values into the ones in the set and the others, e.g. a page of post ids into the read and
+        the unread ones. The values are visited in ascending order, so each container is looked up once.
+
+        Args:
+            values: the values to split
+
+        Returns:
+            sorted distinct values in the set and sorted distinct values not in the set
+        """
+        inside: typing.List[int] = []
+        outside: typing.List[int] = []
+        high, container = None, None
+        for value in sorted(set(values)):
+            if value >> CONTAINER_BITS != high:
+                high = value >> CONTAINER_BITS
+                container = self.containers.get(high)
+            if container is not None and self._contains_low(container, value & CONTAINER_MASK):
+                inside.append(value)
+            else:
+                outside.append(value)
+        return inside, outside
+
+    def intersection(self, values: typing.Iterable[int]) -> typing.List[int]:
+        """
+        Selects the given values which are in the set
+
+        Args:
+            values: the values to check
+
+        Returns:
+            sorted distinct values in both the given values and the set
+        """
+        return self.partition(values)[0]
+
+    def difference(self, values: typing.Iterable[int]) -> typing.List[int]:
+        """
+        Selects the given values which are not in the set
+
+        Args:
+            values: the values to check
+
+        Returns:
+            sorted distinct given values missing in the set
+        """
+        return self.partition(values)[1]
+
+    def nbytes(self) -> int:
+        """
+        Estimates the memory used by the set
+
+        Returns:
+            size of the containers and their dictionaries in bytes
+        """
+        container_bytes = sum(sys.getsizeof(container) for container in self.containers.values())
+        return container_bytes + sys.getsizeof(self.containers) + sys.getsizeof(self.cardinalities)
+
+    def container_counts(self) -> typing.Dict[str, int]:
+        """
+        Counts the containers per representation
+
+        Returns:
+            number of array and bitmap containers
+        """
+        bitmap_count = sum(isinstance(container, bytearray) for container in self.containers.values())
+        return {
+            "array": len(self.containers) - bitmap_count,
+            "bitmap": bitmap_count,
+        }
+
+    @classmethod
+    def _contains_low(cls, container: Container, low: int) -> bool:
+        """
+        Checks whether the container holds the low bits of a value
+
+        Args:
+            container: the array or bitmap container
+            low: low 16 bits of the value
+
+        Returns:
+            True if the container holds the low bits, False otherwise
+        """
+        if isinstance(container, bytearray):
+            return bool(container[low >> 3] & (1 << (low & 7)))
+        index = bisect_left(container, low)
+        return index < len(container) and container[index] == low
+
+    @classmethod
+    def _to_bitmap(cls, container: array) -> bytearray:
+        """
+        Converts a sorted array container into a bitmap container
+
+        Args:
+            container: the array container
+
+        Returns:
+            bitmap container holding the same values
+        """
+        bitmap = bytearray(BITMAP_BYTES)
+        for low in container:
+            bitmap[low >> 3] |= 1 << (low & 7)
+        return bitmap
+
+    @classmethod
+    def _to_array(cls, container: bytearray) -> array:
+        """
+        Converts a bitmap container into a sorted array container
+
+        Args:
+            container: the bitmap container
+
+        Returns:
+            array container holding the same values
+        """
+        values = array("H")
+        for byte_index, byte in enumerate(container):
+            for bit in range(8):
+                if byte & (1 << bit):
+                    values.append((byte_index << 3) + bit)
+        return values
@@ -0,0 +1,68 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of the NDJSON streaming response helpers
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import os
+import typing
+
+import orjson
+import structlog
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+LOGGER = structlog.get_logger()
+NDJSON_MEDIA_TYPE = "application/x-ndjson"  # one JSON object per line
+STREAM_BATCH_SIZE = int(os.getenv("RSS_FEEDS_STREAM_BATCH_SIZE", "500"))  # rows fetched from the DB cursor at once
+RowBatches = typing.AsyncIterator[typing.List[typing.Dict[str, typing.Any]]]
+
+
+def wants_ndjson(request: Request, stream: bool = False) -> bool:
+    """
+    Checks whether the client asked for the streaming NDJSON response
+
+    Args:
+        request: the incoming request
+        stream: value of the stream query parameter
+
+    Returns:
+        True if the stream parameter is set or the Accept header asks for NDJSON, False otherwise
+    """
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_response(
+        row_batches: RowBatches,
+        headers: typing.Optional[typing.Dict[str, str]] = None,
+) -> StreamingResponse:
+    """
+    Creates a response writing the rows as NDJSON while they are fetched, one chunk per batch of rows.
+    Bypasses the pydantic validation and encoding, only a single batch is held in memory at a time.
+
+    Args:
+        row_batches: async iterator of the row batches, each row is a dictionary of column values
+        headers: additional headers of the response
+
+    Returns:
+        the streaming response
+    """
+    async def serialize() -> typing.AsyncIterator[bytes]:
+        row_count = 0
+        async for rows in row_batches:
+            if rows:
+                row_count += len(rows)
+                yield b"".join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+        LOGGER.debug("Rows are streamed", rows=row_count)
+
+    return StreamingResponse(serialize(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
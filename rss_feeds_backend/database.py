@@ -15,22 +15,111 @@ Implementation of Database related functionalities
 # -----------------------------------------------------------------------------#
 """
 import typing
-from pathlib import Path
+from datetime import datetime
 
 import structlog
-from sqlmodel import create_engine, Session, select
+from sqlalchemy import Index, Table, UniqueConstraint, delete, event, func, inspect, literal, text, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import Select, SelectOfScalar
 
+from rss_feeds_backend.common.streaming import STREAM_BATCH_SIZE
 from rss_feeds_backend.db_models.feed import Feed
 from rss_feeds_backend.db_models.post import Post
+from rss_feeds_backend.db_models.user import User
+from rss_feeds_backend.db_models.user_feed import UserFeed
+from rss_feeds_backend.db_models.user_post import UserPost
+from rss_feeds_backend.response_cache import FEEDS_SCOPE, POSTS_SCOPE, RESPONSE_CACHE
+from rss_feeds_backend.search_index import create_search_index
+from rss_feeds_backend.storage import create_storage_backend
 
 LOGGER = structlog.get_logger()
-DB_PATH = Path(__file__).parents[0] / "rss_feeds.db"
+INSERT_BATCH_SIZE = 500  # rows per multi-row INSERT, keeps the bound parameters below the SQLite limit
+DIALECT_INSERT_MAP = {  # dialects supporting INSERT ... ON CONFLICT DO NOTHING
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
 
-engine = create_engine(
-    f"sqlite:///{DB_PATH}",
-    connect_args={"check_same_thread": False},  # Needed for SQLite
-    echo=True  # Log generated SQL
-)
+storage_backend = create_storage_backend()  # selected via the RSS_FEEDS_DATABASE_URL environment variable
+engine = storage_backend.engine
+search_index = create_search_index(storage_backend.name)
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def create_search_index_tables(target: typing.Any, connection: typing.Any, **kwargs: typing.Any) -> None:
+    """
+    Creates the search index structures whenever the tables are created
+
+    Args:
+        target: the metadata of the created tables
+        connection: connection creating the tables
+        kwargs: other arguments of the DDL event
+    """
+    search_index.create(connection)
+
+
+def upgrade_schema(bind: Engine = engine) -> None:
+    """
+    Adds the columns, the indexes and the unique constraints of the models which are missing in the existing tables,
+    e.g. in a database created by a former version. create_all only creates the missing tables, so it has to be
+    called beforehand. A missing unique constraint is created as a unique index after the duplicates are removed.
+    Every step checks the current schema first, so the upgrade is safe to run on every startup.
+
+    Args:
+        bind: engine of the database to upgrade
+    """
+    with bind.begin() as connection:
+        inspector = inspect(connection)
+        added_columns: typing.Set[str] = set()
+        for table in SQLModel.metadata.sorted_tables:
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_ddl = f"{column.name} {column.type.compile(dialect=connection.dialect)}"
+                if not column.nullable and column.default is not None:  # the existing rows get the model default
+                    default = literal(getattr(column.default.arg, "value", column.default.arg)).compile(
+                        dialect=connection.dialect,
+                        compile_kwargs={"literal_binds": True},
+                    )
+                    column_ddl = f"{column_ddl} NOT NULL DEFAULT {default}"
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+                added_columns.add(f"{table.name}.{column.name}")
+                LOGGER.info(f"Column '{column.name}' is added to the existing table '{table.name}'")
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(connection)
+                    LOGGER.info(f"Index '{index.name}' is created on the existing table '{table.name}'")
+            existing_uniques = existing_indexes | {
+                constraint["name"] for constraint in inspector.get_unique_constraints(table.name)
+            }
+            for constraint in table.constraints:
+                if isinstance(constraint, UniqueConstraint) and constraint.name not in existing_uniques:
+                    _create_unique_index(connection, table, constraint)
+        if f"{UserFeed.__tablename__}.unread_count" in added_columns:  # the counters start from the actual counts
+            actual_count = build_unread_count_query(UserFeed.user_id, UserFeed.feed_id).scalar_subquery()
+            connection.execute(update(UserFeed).values(unread_count=actual_count))
+
+
+def _create_unique_index(connection: Connection, table: Table, constraint: UniqueConstraint) -> None:
+    """
+    Creates the unique constraint on an existing table as a unique index, which both SQLite and PostgreSQL can add
+    and ON CONFLICT can refer to. Only the first row of the duplicate rows is kept.
+
+    Args:
+        connection: connection upgrading the schema
+        table: the existing table
+        constraint: the unique constraint missing in the table
+    """
+    first_ids = select(func.min(table.c.id)).group_by(*constraint.columns).scalar_subquery()
+    duplicate_count = connection.execute(delete(table).where(table.c.id.not_in(first_ids))).rowcount
+    if duplicate_count:
+        LOGGER.warning(f"{duplicate_count} duplicate rows are removed from the existing table '{table.name}'")
+    Index(constraint.name, *constraint.columns, unique=True).create(connection)
+    LOGGER.info(f"Unique index '{constraint.name}' is created on the existing table '{table.name}'")
 
 
 def get_session():
@@ -38,17 +127,149 @@ def get_session():
         yield session
 
 
-def insert_update_feed(feed: Feed) -> None:
-    with Session(engine) as session:
-        feed_from_db = fetch_feed_from_db(feed.link, session)
-        if feed_from_db:
-            LOGGER.info("Feed object will be updated")
-            feed = update_feed_details(existing_feed=feed_from_db, new_feed=feed)
-        else:
-            LOGGER.info("Feed object will be added to the DB!")
-        session.add(feed)
+async def get_async_session() -> typing.AsyncIterator[AsyncSession]:
+    """
+    Yields a session of the async engine, so that the queries of the endpoints do not block the event loop
+
+    Yields:
+        async session for DB connection, the loaded objects stay usable after commit
+    """
+    async with AsyncSession(storage_backend.async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+def insert_update_feed(feed: Feed) -> int:
+    """
+    Inserts the feed into the database or updates the existing one with the new posts
+
+    Args:
+        feed: Feed object instantiated from an RSS feed
+
+    Returns:
+        number of posts which were not in the database before
+    """
+    with Session(engine, expire_on_commit=False) as session:  # the caller reads the feed after the commit
+        new_post_count = upsert_feed(feed, session)
         session.commit()
-        session.refresh(feed)
+    _invalidate_responses([new_post_count])
+    return new_post_count
+
+
+def insert_update_feeds(feeds: typing.List[Feed]) -> typing.List[int]:
+    """
+    Inserts or updates a batch of feeds within a single transaction
+
+    Args:
+        feeds: Feed objects instantiated from RSS feeds
+
+    Returns:
+        number of posts which were not in the database before, per feed in the same order
+    """
+    with Session(engine, expire_on_commit=False) as session:  # the callers read the feeds after the commit
+        new_post_counts = [upsert_feed(feed, session) for feed in feeds]
+        session.commit()
+    _invalidate_responses(new_post_counts)
+    return new_post_counts
+
+
+def _invalidate_responses(new_post_counts: typing.List[int]) -> None:
+    """
+    Bumps the versions of the cached responses after the ingestion commits, feed details may change on every write
+
+    Args:
+        new_post_counts: number of the inserted posts per stored feed
+    """
+    if any(new_post_counts):
+        RESPONSE_CACHE.bump(FEEDS_SCOPE, POSTS_SCOPE)
+    else:
+        RESPONSE_CACHE.bump(FEEDS_SCOPE)
+
+
+def upsert_feed(feed: Feed, session: Session) -> int:
+    """
+    Adds the feed or updates the existing one together with its new posts, the transaction is left to the caller.
+    The given feed is only read, it keeps its posts.
+
+    Args:
+        feed: Feed object instantiated from an RSS feed
+        session: session for DB connection
+
+    Returns:
+        number of posts which were not in the database before
+    """
+    feed_from_db = fetch_feed_from_db(feed.link, session)
+    if feed_from_db:
+        LOGGER.debug("Feed object will be updated", link=feed.link)
+        stored_feed = update_feed_details(existing_feed=feed_from_db, new_feed=feed)
+    else:
+        LOGGER.debug("Feed object will be added to the DB!", link=feed.link)
+        stored_feed = Feed(**feed.dict())  # posts are bulk inserted, not cascaded through the relationship!
+    session.add(stored_feed)
+    session.flush()  # assigns the primary key of a new feed
+    return bulk_insert_posts(stored_feed.id, feed.posts, session)
+
+
+def bulk_insert_posts(feed_id: int, posts: typing.List[Post], session: Session) -> int:
+    """
+    Inserts the posts which do not exist in the DB yet, independent of the number of posts the feed already has:
+    one query fetches the existing guids of the batch and one multi-row INSERT ignores any remaining conflict
+
+    Args:
+        feed_id: primary key of the feed owning the posts
+        posts: Post objects instantiated from an RSS feed
+        session: session for DB connection
+
+    Returns:
+        number of the inserted posts
+    """
+    existing_guids = fetch_existing_guids_from_db([post.guid for post in posts], session)
+    rows: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+    for post in posts:
+        if post.guid in existing_guids or post.guid in rows:
+            continue
+        rows[post.guid] = {
+            "title": post.title,
+            "link": post.link,
+            "guid": post.guid,
+            "description": post.description,
+            "publication_date": post.publication_date,
+            "feed_id": feed_id,
+        }
+    LOGGER.debug("Posts will be inserted", new=len(rows), existing=len(posts) - len(rows))
+    insert = DIALECT_INSERT_MAP[session.bind.dialect.name]
+    row_list = list(rows.values())
+    inserted_count = 0
+    for offset in range(0, len(row_list), INSERT_BATCH_SIZE):
+        row_batch = row_list[offset:offset + INSERT_BATCH_SIZE]
+        statement = insert(Post).values(row_batch)
+        inserted_count += session.execute(statement.on_conflict_do_nothing(index_elements=["guid"])).rowcount
+        search_index.index_posts(session, [row["guid"] for row in row_batch])
+    if inserted_count:
+        # the new posts are unread for all the followers of the feed
+        session.execute(
+            update(UserFeed)
+            .where(UserFeed.feed_id == feed_id)
+            .values(unread_count=UserFeed.unread_count + inserted_count),
+        )
+    return inserted_count
+
+
+def fetch_existing_guids_from_db(guids: typing.List[str], session: Session) -> typing.Set[str]:
+    """
+    Fetches which of the given post guids already exist in the database
+
+    Args:
+        guids: post guids to check
+        session: session for DB connection
+
+    Returns:
+        set of the guids existing in the database
+    """
+    existing_guids: typing.Set[str] = set()
+    for offset in range(0, len(guids), INSERT_BATCH_SIZE):
+        query = select(Post.guid).where(Post.guid.in_(guids[offset:offset + INSERT_BATCH_SIZE]))
+        existing_guids.update(session.exec(query).all())
+    return existing_guids
 
 
 def fetch_feed_from_db(link: str, session: Session = get_session()) -> typing.Optional[Feed]:
@@ -65,9 +286,9 @@ def fetch_feed_from_db(link: str, session: Session = get_session()) -> typing.Op
     query = select(Feed).where(Feed.link == link)
     feed = session.exec(query).first()
     if feed:
-        LOGGER.info(f"There exists a feed object in DB with the link '{link}'")
+        LOGGER.debug("There exists a feed object in DB", link=link)
     else:
-        LOGGER.info(f"There is no feed object in DB with the link '{link}'")
+        LOGGER.debug("There is no feed object in DB", link=link)
     return feed
 
 
@@ -100,9 +321,9 @@ def fetch_post_from_db(guid: str, session: Session = get_session()) -> typing.Op
     query = select(Post).where(Post.guid == guid)
     post = session.exec(query).first()
     if post:
-        LOGGER.info(f"There exists a post object in DB with the guid '{guid}'")
+        LOGGER.debug("There exists a post object in DB", guid=guid)
     else:
-        LOGGER.info(f"There is no post object in DB with the guid '{guid}'")
+        LOGGER.debug("There is no post object in DB", guid=guid)
     return post
 
 
@@ -121,9 +342,505 @@ def fetch_all_posts_from_db(session: Session = get_session()) -> typing.List[Pos
     return post_list
 
 
+async def async_fetch_feed_from_db(link: str, session: AsyncSession) -> typing.Optional[Feed]:
+    """
+    Fetches the Feed object from the database without blocking the event loop
+
+    Args:
+        link: feed address used as an identifier
+        session: async session for DB connection
+
+    Returns:
+        Feed object if it exists, None otherwise
+    """
+    query = select(Feed).where(Feed.link == link)
+    feed = (await session.exec(query)).first()
+    if feed:
+        LOGGER.debug("There exists a feed object in DB", link=link)
+    else:
+        LOGGER.debug("There is no feed object in DB", link=link)
+    return feed
+
+
+async def async_fetch_all_feeds_from_db(session: AsyncSession) -> typing.List[Feed]:
+    """
+    Fetches all the Feed objects from the database without blocking the event loop
+
+    Args:
+        session: async session for DB connection
+
+    Returns:
+        List of Feed objects
+    """
+    query = select(Feed)
+    return (await session.exec(query)).all()
+
+
+async def async_fetch_post_from_db(guid: str, session: AsyncSession) -> typing.Optional[Post]:
+    """
+    Fetches the Post object from the database without blocking the event loop
+
+    Args:
+        guid: post guid used as an identifier
+        session: async session for DB connection
+
+    Returns:
+        Post object if it exists, None otherwise
+    """
+    query = select(Post).where(Post.guid == guid)
+    post = (await session.exec(query)).first()
+    if post:
+        LOGGER.debug("There exists a post object in DB", guid=guid)
+    else:
+        LOGGER.debug("There is no post object in DB", guid=guid)
+    return post
+
+
+async def async_fetch_all_posts_from_db(session: AsyncSession) -> typing.List[Post]:
+    """
+    Fetches all the Post objects from the database without blocking the event loop
+
+    Args:
+        session: async session for DB connection
+
+    Returns:
+        List of Post objects
+    """
+    query = select(Post)
+    return (await session.exec(query)).all()
+
+
+async def async_fetch_feeds_page_from_db(
+        session: AsyncSession,
+        limit: int,
+        after_id: typing.Optional[int] = None,
+) -> typing.List[Feed]:
+    """
+    Fetches a page of Feed objects ordered by their ids, seeking past the previous page via the primary key
+
+    Args:
+        session: async session for DB connection
+        limit: maximum number of feeds to fetch
+        after_id: id of the last feed of the previous page, None for the first page
+
+    Returns:
+        List of Feed objects
+    """
+    return (await session.exec(build_feeds_page_query(limit, after_id))).all()
+
+
+async def async_fetch_posts_page_from_db(
+        session: AsyncSession,
+        limit: int,
+        after: typing.Optional[typing.Tuple[datetime, int]] = None,
+) -> typing.List[Post]:
+    """
+    Fetches a page of Post objects, the most recent first. The page seeks past the previous page via the
+    (publication_date, id) index, so its cost does not depend on how deep the page is.
+
+    Args:
+        session: async session for DB connection
+        limit: maximum number of posts to fetch
+        after: publication date and id of the last post of the previous page, None for the first page
+
+    Returns:
+        List of Post objects
+    """
+    return (await session.exec(build_posts_page_query(limit, after))).all()
+
+
+def build_feeds_page_query(
+        limit: typing.Optional[int] = None,
+        after_id: typing.Optional[int] = None,
+) -> SelectOfScalar:
+    """
+    Builds the query of a page of Feed objects ordered by their ids
+
+    Args:
+        limit: maximum number of feeds to select, None for all the remaining feeds
+        after_id: id of the last feed of the previous page, None for the first page
+
+    Returns:
+        query selecting the Feed objects of the page
+    """
+    query = select(Feed).order_by(Feed.id).limit(limit)
+    if after_id is not None:
+        query = query.where(Feed.id > after_id)
+    return query
+
+
+def build_posts_page_query(
+        limit: typing.Optional[int] = None,
+        after: typing.Optional[typing.Tuple[datetime, int]] = None,
+) -> SelectOfScalar:
+    """
+    Builds the query of a page of Post objects, the most recent first
+
+    Args:
+        limit: maximum number of posts to select, None for all the remaining posts
+        after: publication date and id of the last post of the previous page, None for the first page
+
+    Returns:
+        query selecting the Post objects of the page
+    """
+    query = select(Post).order_by(Post.publication_date.desc(), Post.id.desc()).limit(limit)
+    if after is not None:
+        query = query.where(tuple_(Post.publication_date, Post.id) < after)
+    return query
+
+
+async def async_stream_rows_from_db(
+        session: AsyncSession,
+        query: typing.Union[Select, SelectOfScalar],
+        model: typing.Type[SQLModel],
+        batch_size: int = STREAM_BATCH_SIZE,
+) -> typing.AsyncIterator[typing.List[typing.Dict[str, typing.Any]]]:
+    """
+    Streams the rows of a query selecting a model in batches via a server side cursor. The columns are fetched
+    as plain values without instantiating the model objects, so the memory stays bounded by the batch size.
+
+    Args:
+        session: async session for DB connection
+        query: query selecting the model objects, e.g. built by build_filtered_posts_query
+        model: table model selected by the query
+        batch_size: number of rows fetched from the cursor at once
+
+    Yields:
+        List of dictionaries of the column values
+    """
+    query = query.with_only_columns(*model.__table__.columns).execution_options(yield_per=batch_size)
+    result = await session.stream(query)
+    keys = [str(key) for key in result.keys()]  # plain strings, the column names are str subclasses
+    async for rows in result.partitions(batch_size):
+        yield [dict(zip(keys, row)) for row in rows]
+
+
+def build_filtered_posts_query(
+        user_id: int,
+        read: typing.Optional[bool] = None,
+        feed_link: typing.Optional[str] = None,
+        followed: typing.Optional[bool] = None,
+        post_ids: typing.Optional[typing.Collection[int]] = None,
+) -> typing.Union[Select, SelectOfScalar]:
+    """
+    Compiles the post filters into a single query, the read and followed states are checked via EXISTS subqueries
+
+    Args:
+        user_id: primary key of the user whose read and followed states are used
+        read: True for the read posts only, False for the unread posts only, None for both
+        feed_link: link of the feed whose posts are selected, None for all the feeds
+        followed: True for the posts of the followed feeds only, False for the others, None for both
+        post_ids: ids of the posts to select from, None for all the posts
+
+    Returns:
+        query selecting the Post objects passing all the given filters
+    """
+    query = select(Post)
+    if post_ids is not None:
+        query = query.where(Post.id.in_(post_ids))
+    if read is not None:
+        is_read = select(UserPost.id).where(UserPost.user_id == user_id, UserPost.post_id == Post.id).exists()
+        query = query.where(is_read if read else ~is_read)
+    if feed_link is not None:
+        query = query.join(Feed, Feed.id == Post.feed_id).where(Feed.link == feed_link)
+    if followed is not None:
+        is_followed = select(UserFeed.id).where(UserFeed.user_id == user_id, UserFeed.feed_id == Post.feed_id).exists()
+        query = query.where(is_followed if followed else ~is_followed)
+    return query
+
+
+async def async_fetch_filtered_posts_from_db(
+        session: AsyncSession,
+        user_id: int,
+        read: typing.Optional[bool] = None,
+        feed_link: typing.Optional[str] = None,
+        followed: typing.Optional[bool] = None,
+        post_ids: typing.Optional[typing.Collection[int]] = None,
+) -> typing.List[Post]:
+    """
+    Fetches the Post objects passing all the given filters with a single query
+
+    Args:
+        session: async session for DB connection
+        user_id: primary key of the user whose read and followed states are used
+        read: True for the read posts only, False for the unread posts only, None for both
+        feed_link: link of the feed whose posts are selected, None for all the feeds
+        followed: True for the posts of the followed feeds only, False for the others, None for both
+        post_ids: ids of the posts to select from, None for all the posts
+
+    Returns:
+        List of Post objects
+    """
+    query = build_filtered_posts_query(user_id, read=read, feed_link=feed_link, followed=followed, post_ids=post_ids)
+    return (await session.exec(query.order_by(Post.id))).all()
+
+
+async def async_search_posts_from_db(
+        session: AsyncSession,
+        user_id: int,
+        search_text: str,
+        limit: int,
+        after: typing.Optional[typing.Tuple[float, int]] = None,
+        read: typing.Optional[bool] = None,
+        feed_link: typing.Optional[str] = None,
+        followed: typing.Optional[bool] = None,
+) -> typing.List[typing.Tuple[Post, float]]:
+    """
+    Fetches a page of the Post objects matching the search text and the given filters, the best match first.
+    The page seeks past the previous page via the (rank, id) of its last post.
+
+    Args:
+        session: async session for DB connection
+        user_id: primary key of the user whose read and followed states are used
+        search_text: free text entered by the user, all of its terms have to match
+        limit: maximum number of posts to fetch
+        after: rank and id of the last post of the previous page, None for the first page
+        read: True for the read posts only, False for the unread posts only, None for both
+        feed_link: link of the feed whose posts are selected, None for all the feeds
+        followed: True for the posts of the followed feeds only, False for the others, None for both
+
+    Returns:
+        List of Post objects together with their ranks, lower rank is a better match
+    """
+    search = search_index.build_search_subquery(search_text)
+    query = (
+        build_filtered_posts_query(user_id, read=read, feed_link=feed_link, followed=followed)
+        .join(search, search.c.post_id == Post.id)
+        .add_columns(search.c.rank)
+        .order_by(search.c.rank, Post.id)
+        .limit(limit)
+    )
+    if after is not None:
+        query = query.where(tuple_(search.c.rank, Post.id) > after)
+    return (await session.execute(query)).all()
+
+
+async def async_fetch_read_post_ids_from_db(session: AsyncSession, user_id: int) -> typing.List[int]:
+    """
+    Fetches the ids of the posts read by the user
+
+    Args:
+        session: async session for DB connection
+        user_id: primary key of the user
+
+    Returns:
+        List of post ids
+    """
+    query = select(UserPost.post_id).where(UserPost.user_id == user_id)
+    return (await session.exec(query)).all()
+
+
+async def async_fetch_read_version_from_db(session: AsyncSession, user_id: int) -> int:
+    """
+    Fetches the version of the read posts of the user, every committed change of them increases it
+
+    Args:
+        session: async session for DB connection
+        user_id: primary key of the user
+
+    Returns:
+        version of the read posts
+    """
+    query = select(User.read_version).where(User.id == user_id)
+    return (await session.exec(query)).first() or 0
+
+
+async def async_bump_read_version_in_db(session: AsyncSession, user_id: int) -> int:
+    """
+    Increases the version of the read posts of the user, the transaction is left to the caller.
+    The updated row stays locked until the commit, so no other change can take the next version in between.
+
+    Args:
+        session: async session for DB connection
+        user_id: primary key of the user
+
+    Returns:
+        the new version of the read posts
+    """
+    await session.execute(update(User).where(User.id == user_id).values(read_version=User.read_version + 1))
+    return await async_fetch_read_version_from_db(session, user_id)
+
+
+async def async_fetch_post_ids_of_feed_from_db(session: AsyncSession, feed_id: int) -> typing.List[int]:
+    """
+    Fetches the ids of the posts of the feed
+
+    Args:
+        session: async session for DB connection
+        feed_id: primary key of the feed
+
+    Returns:
+        List of post ids
+    """
+    query = select(Post.id).where(Post.feed_id == feed_id)
+    return (await session.exec(query)).all()
+
+
+def build_unread_count_query(
+        user_id: typing.Any,
+        feed_id: typing.Any,
+) -> SelectOfScalar:
+    """
+    Builds the query counting the posts of the feed which are not read by the user, the source of truth of the
+    unread counters kept in UserFeed
+
+    Args:
+        user_id: primary key of the user, or a column to correlate with
+        feed_id: primary key of the feed, or a column to correlate with
+
+    Returns:
+        query selecting the number of unread posts
+    """
+    is_read = select(UserPost.id).where(UserPost.user_id == user_id, UserPost.post_id == Post.id).exists()
+    return select(func.count(Post.id)).where(Post.feed_id == feed_id, ~is_read)
+
+
+async def async_follow_feed_in_db(session: AsyncSession, user_id: int, feed_id: int) -> None:
+    """
+    Adds the UserFeed row with its unread counter counted within the same INSERT ... SELECT statement, so that no
+    post stored in between the count and the insert is missed. The transaction is left to the caller.
+
+    Args:
+        session: async session for DB connection
+        user_id: primary key of the user
+        feed_id: primary key of the feed
+    """
+    unread_count = build_unread_count_query(user_id, feed_id).scalar_subquery()
+    statement = UserFeed.__table__.insert().from_select(
+        ["user_id", "feed_id", "unread_count"],
+        select(literal(user_id), literal(feed_id), unread_count),
+    )
+    await session.execute(statement)
+
+
+async def async_fetch_unread_counts_from_db(session: AsyncSession, user_id: int) -> typing.Dict[str, int]:
+    """
+    Fetches the unread counters of the feeds followed by the user, without counting any post
+
+    Args:
+        session: async session for DB connection
+        user_id: primary key of the user
+
+    Returns:
+        dictionary of unread post counts per feed link
+    """
+    query = select(Feed.link, UserFeed.unread_count).join(Feed, Feed.id == UserFeed.feed_id)
+    return dict((await session.exec(query.where(UserFeed.user_id == user_id))).all())
+
+
+async def async_mark_post_read_in_db(session: AsyncSession, user_id: int, post: Post) -> bool:
+    """
+    Marks the post as read unless the DB already has it as read. The unique constraint of UserPost rejects a second
+    mark, so concurrent requests, also of other processes, cannot mark it twice. The transaction is left to the caller.
+
+    Args:
+        session: async session for DB connection
+        user_id: primary key of the user
+        post: the Post object to mark
+
+    Returns:
+        True if the post is marked now, False if it was read before
+    """
+    return bool(await async_mark_posts_read_in_db(session, user_id, post.feed_id, [post.id]))
+
+
+async def async_mark_posts_read_in_db(
+        session: AsyncSession,
+        user_id: int,
+        feed_id: int,
+        post_ids: typing.List[int],
+) -> int:
+    """
+    Marks the posts of the feed as read with multi-row INSERTs, the posts the DB already has as read are skipped via
+    the unique constraint of UserPost. The transaction is left to the caller.
+
+    Args:
+        session: async session for DB connection
+        user_id: primary key of the user
+        feed_id: primary key of the feed owning the posts
+        post_ids: primary keys of the posts to mark
+
+    Returns:
+        number of the posts marked now
+    """
+    insert = DIALECT_INSERT_MAP[session.bind.dialect.name]
+    marked_count = 0
+    for offset in range(0, len(post_ids), INSERT_BATCH_SIZE):
+        rows = [{"user_id": user_id, "post_id": post_id} for post_id in post_ids[offset:offset + INSERT_BATCH_SIZE]]
+        statement = insert(UserPost).values(rows).on_conflict_do_nothing(index_elements=["user_id", "post_id"])
+        marked_count += (await session.execute(statement)).rowcount
+    if marked_count:
+        await async_adjust_unread_counter(session, user_id, feed_id, delta=-marked_count)
+    return marked_count
+
+
+async def async_mark_post_unread_in_db(session: AsyncSession, user_id: int, post: Post) -> bool:
+    """
+    Marks the post as unread if the DB has it as read, the transaction is left to the caller
+
+    Args:
+        session: async session for DB connection
+        user_id: primary key of the user
+        post: the Post object to mark
+
+    Returns:
+        True if the post is marked now, False if it was not read before
+    """
+    statement = delete(UserPost).where(UserPost.user_id == user_id, UserPost.post_id == post.id)
+    if not (await session.execute(statement)).rowcount:
+        return False
+    await async_adjust_unread_counter(session, user_id, post.feed_id, delta=1)
+    return True
+
+
+async def async_adjust_unread_counter(session: AsyncSession, user_id: int, feed_id: int, delta: int) -> None:
+    """
+    Adjusts the unread counter of the feed if the user follows it, the transaction is left to the caller
+
+    Args:
+        session: async session for DB connection
+        user_id: primary key of the user
+        feed_id: primary key of the feed
+        delta: change of the unread post count, e.g. -1 when a post is marked as read
+    """
+    await session.execute(
+        update(UserFeed)
+        .where(UserFeed.user_id == user_id, UserFeed.feed_id == feed_id)
+        .values(unread_count=UserFeed.unread_count + delta),
+    )
+
+
+async def async_rebuild_unread_counters(session: AsyncSession, fix: bool = True) -> typing.Dict[str, int]:
+    """
+    Recounts the unread posts of all the followed feeds and compares them with the maintained counters
+
+    Args:
+        session: async session for DB connection
+        fix: flag to overwrite the drifted counters with the recounted values and commit
+
+    Returns:
+        number of checked and drifted counters
+    """
+    actual_count = build_unread_count_query(UserFeed.user_id, UserFeed.feed_id).scalar_subquery()
+    query = select(UserFeed.id, UserFeed.unread_count, actual_count)
+    rows = (await session.exec(query)).all()
+    drifted = {user_feed_id: actual for user_feed_id, unread_count, actual in rows if unread_count != actual}
+    if drifted:
+        LOGGER.warning(f"{len(drifted)} of {len(rows)} unread counters drifted from the actual counts")
+    if fix and drifted:
+        for user_feed_id, actual in drifted.items():
+            await session.execute(update(UserFeed).where(UserFeed.id == user_feed_id).values(unread_count=actual))
+        await session.commit()
+    return {
+        "checked": len(rows),
+        "drifted": len(drifted),
+        "fixed": len(drifted) if fix else 0,
+    }
+
+
 def update_feed_details(existing_feed: Feed, new_feed: Feed) -> Feed:
     """
-    Goes over the new feed and updates the existing feed object
+    Updates the details of the existing feed object, the posts are handled by bulk_insert_posts
 
     Args:
          existing_feed: existing feed object in the DB
@@ -136,9 +853,7 @@ def update_feed_details(existing_feed: Feed, new_feed: Feed) -> Feed:
     existing_feed.description = new_feed.description
     existing_feed.ttl = new_feed.ttl
     existing_feed.last_build_date = new_feed.last_build_date
-    for new_post in new_feed.posts:
-        if new_post in existing_feed.posts:
-            LOGGER.info(f"Post '{new_post.guid}' already exists! Skipping...")
-            continue
-        existing_feed.posts.append(new_post)
+    existing_feed.etag = new_feed.etag
+    existing_feed.last_modified = new_feed.last_modified
+    existing_feed.content_digest = new_feed.content_digest
     return existing_feed
@@ -20,6 +20,7 @@ from datetime import datetime
 from sqlalchemy import VARCHAR, Column
 from sqlmodel import SQLModel, Field, Relationship
 
+from rss_feeds_backend.common.enums import FeedType
 from rss_feeds_backend.db_models.post import Post
 
 
@@ -30,5 +31,9 @@ class Feed(SQLModel, table=True):
     link: str = Field(sa_column=Column("link", VARCHAR, unique=True, index=True))
     description: str = Field(nullable=False)
     ttl: int = Field(nullable=False)
+    feed_type: str = Field(default=FeedType.XML, nullable=False)  # FeedType of the source, to restore the extractor
     last_build_date: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    etag: typing.Optional[str] = Field(default=None)  # validator of the last retrieved content for conditional GET
+    last_modified: typing.Optional[str] = Field(default=None)  # validator of the last retrieved content
+    content_digest: typing.Optional[str] = Field(default=None)  # hash of the last stored content
     posts: typing.List[Post] = Relationship(back_populates="feed")
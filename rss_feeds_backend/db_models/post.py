@@ -17,12 +17,15 @@ Implementation of Database Model class Post
 import typing
 from datetime import datetime
 
-from sqlalchemy import VARCHAR, Column
+from sqlalchemy import VARCHAR, Column, Index
 from sqlmodel import SQLModel, Field, Relationship
 
 
 class Post(SQLModel, table=True):
     """Represents the Post object as a DB table"""
+    __table_args__ = (
+        Index("ix_post_publication_date_id", "publication_date", "id"),  # keyset pagination of the posts
+    )
     id: typing.Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(nullable=False)
     link: str = Field(nullable=False)
@@ -30,7 +33,11 @@ class Post(SQLModel, table=True):
     description: str = Field(nullable=False)
     publication_date: datetime = Field(default_factory=datetime.utcnow, nullable=False)
     feed: "Feed" = Relationship(back_populates="posts")
-    feed_id: typing.Optional[int] = Field(default=None, foreign_key="feed.id")  # to make connection between two tables
+    feed_id: typing.Optional[int] = Field(
+        default=None,
+        foreign_key="feed.id",  # to make connection between two tables
+        index=True,
+    )
 
     def __eq__(self, other: typing.Any) -> bool:
         """
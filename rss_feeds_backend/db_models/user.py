@@ -16,13 +16,12 @@ Implementation of Database Model class User
 """
 import typing
 
-from passlib.context import CryptContext
 from sqlalchemy import VARCHAR, Column, ARRAY, String
 from sqlmodel import SQLModel, Field, Relationship
 
+from rss_feeds_backend.common.password_hashing import PASSWORD_HASHER, pwd_context
 from rss_feeds_backend.db_models.feed import Feed
 
-pwd_context = CryptContext(schemes=["bcrypt"])
 ADMIN_NAME = "admin"
 ADMIN_PASS = "12345678"
 
@@ -38,6 +37,7 @@ class User(SQLModel, table=True):
     id: typing.Optional[int] = Field(default=None, primary_key=True)
     username: str = Field(sa_column=Column("username", VARCHAR, unique=True, index=True))
     password_hash: str = ""
+    read_version: int = Field(default=0, nullable=False)  # bumped with every change of the read posts of the user
 
     def set_password(self, password: str) -> None:
         """
@@ -59,3 +59,24 @@ class User(SQLModel, table=True):
             True if password is correct, False otherwise
         """
         return pwd_context.verify(password, self.password_hash)
+
+    async def async_set_password(self, password: str) -> None:
+        """
+        Sets password_hash like set_password, the hashing runs on the password hashing pool.
+
+        Args:
+            password: a new password to set
+        """
+        self.password_hash = await PASSWORD_HASHER.hash(password)
+
+    async def async_verify_password(self, password: str) -> bool:
+        """
+        Verifies the password like verify_password, the hashing runs on the password hashing pool.
+
+        Args:
+            password: a password to check if it is correct
+
+        Returns:
+            True if password is correct, False otherwise
+        """
+        return await PASSWORD_HASHER.verify(password, self.password_hash)
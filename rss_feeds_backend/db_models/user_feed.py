@@ -16,11 +16,16 @@ Implementation of Database Model class to relate User and Feed objects
 """
 import typing
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 
 class UserFeed(SQLModel, table=True):
     """Represents users following feeds"""
+    __table_args__ = (
+        Index("ix_userfeed_user_id_feed_id", "user_id", "feed_id"),  # EXISTS lookups of the post filters
+    )
     id: typing.Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(nullable=False)  # primary key of the User Table
     feed_id: int = Field(nullable=False)  # primary key of the Feed table
+    unread_count: int = Field(default=0, nullable=False)  # posts of the feed not read by the user, kept up to date
@@ -16,11 +16,16 @@ Implementation of Database Model class to mark Posts as read by User objects
 """
 import typing
 
+from sqlalchemy import UniqueConstraint
 from sqlmodel import SQLModel, Field
 
 
 class UserPost(SQLModel, table=True):
     """Represents users read posts"""
+    __table_args__ = (
+        # one read mark per user and post, its index serves the EXISTS lookups of the post filters as well
+        UniqueConstraint("user_id", "post_id", name="uq_userpost_user_id_post_id"),
+    )
     id: typing.Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(nullable=False)  # primary key of the User Table
     post_id: int = Field(nullable=False)  # primary key of the Post table
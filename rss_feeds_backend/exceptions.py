@@ -18,3 +18,7 @@ Implementation of exceptions utilized in the application
 
 class BadRequestException(Exception):
     pass
+
+
+class InvalidTokenError(Exception):
+    pass
@@ -15,12 +15,14 @@ Implementation of FeedCollector base object
 # -----------------------------------------------------------------------------#
 """
 import abc
+import asyncio
 import typing
 from types import TracebackType
 
 import structlog
 
 LOGGER = structlog.get_logger()
+FeedContent = typing.Union[bytes, memoryview, str]  # raw content is preferred, lxml/orjson decode it themselves
 
 
 class FeedCollector(abc.ABC):
@@ -35,6 +37,31 @@ class FeedCollector(abc.ABC):
         """
         self.is_connection_available = False
         self.feed_url = feed_url
+        self.etag: typing.Optional[str] = None
+        self.last_modified: typing.Optional[str] = None
+        self.pending_etag: typing.Optional[str] = None  # validator of the retrieved content, used once it is stored
+        self.pending_last_modified: typing.Optional[str] = None
+        self.is_not_modified: bool = False  # set when the source reports that the content has not changed
+
+    def set_validators(self, etag: typing.Optional[str], last_modified: typing.Optional[str]) -> None:
+        """
+        Sets the cache validators of the last retrieved content to be used in conditional requests
+
+        Args:
+            etag: ETag value of the last retrieved content
+            last_modified: Last-Modified value of the last retrieved content
+        """
+        self.etag = self.pending_etag = etag
+        self.last_modified = self.pending_last_modified = last_modified
+
+    def commit_validators(self) -> None:
+        """
+        Uses the validators of the last retrieved content in the next conditional requests, called once the content
+        is stored; a content which could not be stored is therefore requested again instead of being reported as
+        not modified
+        """
+        self.etag = self.pending_etag
+        self.last_modified = self.pending_last_modified
 
     @abc.abstractmethod
     def make_connection(self) -> bool:
@@ -49,13 +76,41 @@ class FeedCollector(abc.ABC):
         """
 
     @abc.abstractmethod
-    def get_feed_content(self) -> str:
+    def get_feed_content(self) -> FeedContent:
         """
         Requests the current feed content
 
         Returns:
-            the received status
+            the received content, preferably the raw bytes
+        """
+
+    async def async_make_connection(self) -> bool:
+        """
+        Async variant of make_connection, runs the blocking implementation in a worker thread by default
+
+        Returns:
+            True if connection is established successfully, False otherwise
         """
+        return await asyncio.to_thread(self.make_connection)
+
+    async def async_close_connection(self) -> bool:
+        """
+        Async variant of close_connection, runs the blocking implementation in a worker thread by default
+
+        Returns:
+            True if connection is closed successfully, False otherwise
+        """
+        return await asyncio.to_thread(self.close_connection)
+
+    async def async_get_feed_content(self) -> FeedContent:
+        """
+        Async variant of get_feed_content, runs the blocking implementation in a worker thread by default.
+        Collectors having a native async client should override this function.
+
+        Returns:
+            the received content, preferably the raw bytes
+        """
+        return await asyncio.to_thread(self.get_feed_content)
 
     def __enter__(self) -> typing.Any:
         """
@@ -66,9 +121,9 @@ class FeedCollector(abc.ABC):
         """
         if self.make_connection():
             self.is_connection_available = True
-            LOGGER.debug(f"Connection is set up successfully for URL: {self.feed_url}")
+            LOGGER.debug("Connection is set up successfully", url=self.feed_url)
         else:
-            LOGGER.warning(f"Failed to set up the connection for URL: {self.feed_url}!")
+            LOGGER.warning("Failed to set up the connection!", url=self.feed_url)
         return self
 
     def __exit__(
@@ -91,9 +146,47 @@ class FeedCollector(abc.ABC):
         if not self.is_connection_available:
             return  # do not attempt to close the connection!
         if self.close_connection():
-            LOGGER.debug(f"Connection is closed successfully for URL: {self.feed_url}.")
+            LOGGER.debug("Connection is closed successfully", url=self.feed_url)
+        else:
+            LOGGER.warning("Failed to close the connection!", url=self.feed_url)
+
+    async def __aenter__(self) -> typing.Any:
+        """
+        Async enter with region, attempt to setup connection
+
+        Returns:
+            Self if successful in setting up the connection, exception otherwise
+        """
+        if await self.async_make_connection():
+            self.is_connection_available = True
+            LOGGER.debug("Connection is set up successfully", url=self.feed_url)
+        else:
+            LOGGER.warning("Failed to set up the connection!", url=self.feed_url)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: typing.Optional[typing.Type[BaseException]] = None,
+        exc_val: typing.Optional[BaseException] = None,
+        exc_tb: typing.Optional[TracebackType] = None,
+    ) -> None:
+        """
+        Closes the connection asynchronously
+
+        Args:
+            exc_type: The exception type
+            exc_val: The exception value
+            exc_tb: The exception traceback
+        """
+        if exc_type:
+            LOGGER.error(f"Exception {exc_type} occurred with value {exc_val}")
+            LOGGER.error(f"The stack trace: {exc_tb}")
+        if not self.is_connection_available:
+            return  # do not attempt to close the connection!
+        if await self.async_close_connection():
+            LOGGER.debug("Connection is closed successfully", url=self.feed_url)
         else:
-            LOGGER.warning(f"Failed to close the connection for URL: {self.feed_url}!")
+            LOGGER.warning("Failed to close the connection!", url=self.feed_url)
 
     def __str__(self) -> str:
         """
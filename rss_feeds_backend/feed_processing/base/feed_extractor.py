@@ -15,18 +15,47 @@ Implementation of FeedExtractor base class
 # -----------------------------------------------------------------------------#
 """
 import abc
+import asyncio
 import typing
+from concurrent.futures import Executor
+from datetime import datetime
 
 from rss_feeds_backend.common.enums import FeedType
 from rss_feeds_backend.db_models.feed import Feed
+from rss_feeds_backend.db_models.post import Post
+from rss_feeds_backend.feed_processing.base.feed_collector import FeedContent
 
 DEFAULT_TITLE = "Title Could Not Be Found"
 DEFAULT_DESCRIPTION = "There is no Description in this Feed"
 DEFAULT_TTL = -1
+KNOWN_ITEM_RUN_LENGTH = 3  # extraction stops after that many consecutive already-known items
+
+
+class PostRecord(typing.NamedTuple):
+    """Compact and picklable representation of a post, returned by the parsing stage"""
+    title: typing.Optional[str]
+    link: typing.Optional[str]
+    guid: typing.Optional[str]
+    description: typing.Optional[str]
+    publication_date: datetime
+
+
+class FeedRecord(typing.NamedTuple):
+    """Compact and picklable representation of a feed with its posts, returned by the parsing stage"""
+    title: typing.Optional[str]
+    link: typing.Optional[str]
+    description: typing.Optional[str]
+    ttl: int
+    last_build_date: datetime
+    posts: typing.List[PostRecord]
 
 
 class FeedExtractor(abc.ABC):
-    """Base class to perform extraction of feed details and posts from a feed content"""
+    """
+    Base class to perform extraction of feed details and posts from a feed content. The extractors implement the
+    parsing stage as extract_records, so that it can run in a worker process; the Feed and Post objects are built
+    from the records in the calling process.
+    """
 
     def __init__(self, feed_type: FeedType) -> None:
         """
@@ -37,14 +66,96 @@ class FeedExtractor(abc.ABC):
         """
         self.feed_type = feed_type
 
-    @abc.abstractmethod
-    def extract_feed(self, feed_content: str) -> typing.Optional[Feed]:
+    def extract_feed(
+            self,
+            feed_content: FeedContent,
+            known_guids: typing.AbstractSet[str] = frozenset(),
+    ) -> typing.Optional[Feed]:
         """
         Goes over the feed content and extracts the feed info with posts
 
         Args:
-            feed_content: the feed content in string
+            feed_content: the raw feed content in bytes (or memoryview), or an already decoded string
+            known_guids: guids of the already stored posts, extractors may stop at them
+
+        Returns:
+            Feed object containing the list of posts and other feed details, None if the content is invalid
+        """
+        feed_record = self.extract_records(feed_content, known_guids)
+        return self.build_feed(feed_record) if feed_record else None
+
+    @abc.abstractmethod
+    def extract_records(
+            self,
+            feed_content: FeedContent,
+            known_guids: typing.AbstractSet[str] = frozenset(),
+    ) -> typing.Optional[FeedRecord]:
+        """
+        Parses the feed content into picklable records without instantiating any DB model, may run in a worker
+        process
+
+        Args:
+            feed_content: the raw feed content in bytes (or memoryview), or an already decoded string
+            known_guids: guids of the already stored posts, extractors may stop at them
+
+        Returns:
+            FeedRecord object containing the list of post records and other feed details, None if content is invalid
+        """
+
+    async def async_extract_feed(
+            self,
+            feed_content: FeedContent,
+            known_guids: typing.AbstractSet[str] = frozenset(),
+            parse_pool: typing.Optional[Executor] = None,
+    ) -> typing.Optional[Feed]:
+        """
+        Async variant of extract_feed, runs the extraction in a worker thread so that the event loop is not blocked.
+        If a process pool is provided, the parsing runs in a worker process instead.
+
+        Args:
+            feed_content: the raw feed content in bytes (or memoryview), or an already decoded string
+            known_guids: guids of the already stored posts, extractors may skip them
+            parse_pool: optional process pool to offload the parsing to
+
+        Returns:
+            Feed object containing the list of posts and other feed details
+        """
+        if parse_pool is None:
+            return await asyncio.to_thread(self.extract_feed, feed_content, known_guids)
+        feed_record = await asyncio.get_running_loop().run_in_executor(
+            parse_pool,
+            self.extract_records,
+            bytes(feed_content) if isinstance(feed_content, memoryview) else feed_content,  # has to be picklable!
+            frozenset(known_guids),
+        )
+        return self.build_feed(feed_record) if feed_record else None
+
+    @classmethod
+    def build_feed(cls, feed_record: FeedRecord) -> Feed:
+        """
+        Instantiates the Feed and Post objects from the records of the parsing stage
+
+        Args:
+            feed_record: the parsed feed details with the post records
 
         Returns:
             Feed object containing the list of posts and other feed details
         """
+        feed = Feed(
+            title=feed_record.title or DEFAULT_TITLE,
+            link=feed_record.link,
+            description=feed_record.description or DEFAULT_DESCRIPTION,
+            ttl=feed_record.ttl,
+            last_build_date=feed_record.last_build_date,
+        )
+        feed.posts = [
+            Post(
+                title=post_record.title or DEFAULT_TITLE,
+                link=post_record.link,
+                guid=post_record.guid,
+                description=post_record.description or DEFAULT_DESCRIPTION,
+                publication_date=post_record.publication_date,
+            )
+            for post_record in feed_record.posts
+        ]
+        return feed
@@ -14,40 +14,79 @@ Implementation of FeedProccessor base object
 #                                                                              #
 # -----------------------------------------------------------------------------#
 """
-from time import sleep
+import asyncio
+import hashlib
+import itertools
+import time
+import typing
+from concurrent.futures import Executor
 
 import structlog
-import threading
-import typing
 
 from rss_feeds_backend.common.enums import FeedType
+from rss_feeds_backend.common.logging_profile import INGESTION_SUMMARY, Lazy
+from rss_feeds_backend.common.metrics import METRICS
 from rss_feeds_backend.database import insert_update_feed
-from rss_feeds_backend.feed_processing.base.feed_collector import FeedCollector
+from rss_feeds_backend.db_models.feed import Feed
+from rss_feeds_backend.feed_processing.base.feed_collector import FeedCollector, FeedContent
 from rss_feeds_backend.feed_processing.base.feed_extractor import FeedExtractor
-from rss_feeds_backend.feed_processing.feed_collectors.rest_api_get import EMPTY_STR
+from rss_feeds_backend.feed_processing.feed_collectors.rest_api_get import EMPTY_CONTENT
+from rss_feeds_backend.feed_processing.feed_writer import FeedWriter
+from rss_feeds_backend.feed_processing.poll_schedule import PollSchedule
 
 LOGGER = structlog.get_logger()
-DEFAULT_WAIT_INTERVAL = 30.0  # 5 minutes
 FALLBACK_WAIT_INTERVALS = (120.0, 300.0, 480.0)  # 2, 5, 8 minutes
+KNOWN_GUID_LIMIT = 1000  # most recent post guids kept per feed to let extractors skip the known posts
+POLLS = METRICS.counter("rss_feeds_polls_total", "Feed polls per outcome", ("outcome",))
+FETCH_SECONDS = METRICS.histogram("rss_feeds_fetch_seconds", "Duration of the feed requests", ("feed_type",), unit=1e-6)
+EXTRACT_SECONDS = METRICS.histogram(
+    "rss_feeds_extract_seconds",
+    "Duration of the feed extractions",
+    ("feed_type",),
+    unit=1e-6,
+)
+STORE_SECONDS = METRICS.histogram(
+    "rss_feeds_store_seconds",
+    "Duration of the feed stores, including the wait for the writer",
+    ("feed_type",),
+    unit=1e-6,
+)
+FETCHED_BYTES = METRICS.histogram("rss_feeds_fetched_bytes", "Size of the received feed contents", ("feed_type",))
+NEW_POSTS = METRICS.histogram("rss_feeds_new_posts", "New posts per stored poll", ("feed_type",))
 
 
-class FeedProcessor(threading.Thread):
-    """Thread-based class to periodically retrieve feeds from an address."""
+class FeedProcessor:
+    """Class to retrieve feeds from an address, periodically scheduled by the FeedManager's FeedScheduler"""
 
-    def __init__(self, feed_address: str, feed_type: FeedType = FeedType.UNDEFINED) -> None:
+    def __init__(
+            self,
+            feed_address: str,
+            feed_type: FeedType = FeedType.UNDEFINED,
+            poll_schedule: typing.Optional[PollSchedule] = None,
+    ) -> None:
         """
         Initializes the FeedProcessor object
 
         Args:
             feed_address: the address to the feed
             feed_type: the type of the feed
+            poll_schedule: decides the wait interval between polls, default bounds are used if not provided
         """
-        super().__init__()
         self.address: str = feed_address
         self.feed_type: FeedType = feed_type
+        self.poll_schedule: PollSchedule = poll_schedule or PollSchedule()
         self.feed_collector: typing.Optional[FeedCollector] = None
         self.feed_extractor: typing.Optional[FeedExtractor] = None
+        self.parse_pool: typing.Optional[Executor] = None  # optional process pool to offload the parsing to
+        self.feed_writer: typing.Optional[FeedWriter] = None  # write-behind stage batching the DB updates
         self.stop_requested: bool = False
+        self.is_running: bool = False  # True as long as the feed is kept in the FeedScheduler
+        self.fallback_index: int = 0
+        self.known_guids: typing.Dict[str, None] = {}  # insertion ordered set of the recently stored post guids
+        self.content_digest: typing.Optional[str] = None  # digest of the last stored feed content
+        self.refresh_count: int = 0  # successful refreshes
+        self.not_modified_count: int = 0  # refreshes skipped since the source replied 'not modified'
+        self.unchanged_count: int = 0  # refreshes skipped since the content digest did not change
 
     def assign_collector(self, feed_collector: FeedCollector) -> None:
         """
@@ -59,7 +98,7 @@ class FeedProcessor(threading.Thread):
         if self.feed_collector:
             LOGGER.info("Feed Collector has been set before...")
         self.feed_collector = feed_collector
-        LOGGER.debug(f"FeedCollector '{self.feed_collector}' is set for feed address: '{self.address}'")
+        LOGGER.debug("FeedCollector is set", collector=Lazy(lambda: str(self.feed_collector)), address=self.address)
 
     def assign_extractor(self, feed_extractor: FeedExtractor) -> None:
         """
@@ -71,60 +110,177 @@ class FeedProcessor(threading.Thread):
         if self.feed_extractor:
             LOGGER.info("Feed Extractor has been set before...")
         self.feed_extractor = feed_extractor
-        LOGGER.debug(f"FeedExtractor '{self.feed_extractor}' is set for feed address: '{self.address}'")
+        LOGGER.debug("FeedExtractor is set", extractor=Lazy(lambda: str(self.feed_extractor)), address=self.address)
 
     def stop(self) -> None:
-        """Sets the member variable flag to stop execution"""
+        """Sets the member variable flag to stop execution, the feed is not scheduled anymore"""
         self.stop_requested = True
+        self.is_running = False
         LOGGER.info(f"Feed Processor for address '{self.address}' is asked to stop its execution!")
 
-    def run(self) -> None:
+    def is_alive(self) -> bool:
         """
-        Periodically executes to get the feed from the feed source and extract the content
+        Checks whether the periodic refresh of the feed is still being executed
+
+        Returns:
+            True if the feed is periodically refreshed, False otherwise
         """
-        assert self.feed_collector, "Feed Collector member object has to be set before starting the execution"
-        assert self.feed_extractor, "Feed Extractor member object has to be set before starting the execution"
-        fallback_index = 0
-        while not self.stop_requested and fallback_index <= len(FALLBACK_WAIT_INTERVALS):
-            if self._refresh_feed():
-                fallback_index = 0
-                sleep(DEFAULT_WAIT_INTERVAL)
-            else:
-                LOGGER.warning(f"Feed refresh failed!")
-                if fallback_index < len(FALLBACK_WAIT_INTERVALS):
-                    LOGGER.info(f"Will retry again after {FALLBACK_WAIT_INTERVALS[fallback_index]}seconds")
-                    sleep(FALLBACK_WAIT_INTERVALS[fallback_index])
-                fallback_index = fallback_index + 1
-        LOGGER.info("The execution of feed refresh is completing...")
+        return self.is_running
 
-    def force_refresh_feed(self) -> bool:
+    def next_wait_interval(self, is_refreshed: bool) -> typing.Optional[float]:
         """
-        Forcefully starts the process of feed refresh
+        Decides how long to wait until the next refresh according to the outcome of the last one
+
+        Args:
+            is_refreshed: the result of the last refresh
 
         Returns:
-             True if feed is refreshed, False otherwise
+            seconds to wait until the next refresh, None if the periodic refresh should not continue
         """
-        if self.is_alive():
-            LOGGER.warning(f"Feed Processor thread for address '{self.address}' is already running!")
-            return False
-        return self._refresh_feed()
+        if self.stop_requested:
+            return None
+        if is_refreshed:
+            self.fallback_index = 0
+            return self.poll_schedule.next_interval()
+        LOGGER.warning("Feed refresh failed!", address=self.address)
+        if self.fallback_index >= len(FALLBACK_WAIT_INTERVALS):
+            LOGGER.info("The execution of feed refresh is completing...")
+            return None
+        wait_interval = FALLBACK_WAIT_INTERVALS[self.fallback_index]
+        LOGGER.info("Will retry again", address=self.address, seconds=wait_interval)
+        self.fallback_index = self.fallback_index + 1
+        return wait_interval
 
-    def _refresh_feed(self) -> bool:
+    async def refresh_feed(self) -> bool:
         """
-        Performs a feed retrieve
+        Performs a feed retrieve: fetch -> extract -> store, without blocking the event loop
 
         Returns:
             True if feed is successfully retrieved and refreshed, False otherwise
         """
-        feed_content: str = EMPTY_STR
-        with self.feed_collector as fc_obj:
+        feed_type = self.feed_type.value
+        feed_content: FeedContent = EMPTY_CONTENT
+        start = time.perf_counter()
+        async with self.feed_collector as fc_obj:
             if fc_obj.is_connection_available:
-                feed_content = fc_obj.get_feed_content()
+                feed_content = await fc_obj.async_get_feed_content()
+        FETCH_SECONDS.observe(time.perf_counter() - start, feed_type)
+        if self.feed_collector.is_not_modified:
+            self.not_modified_count += 1
+            self._report_poll("not_modified")  # extraction and DB update are skipped
+            return self._record_unchanged_refresh()
+        if feed_content:  # a failed poll has no content, its 0 bytes would skew the size quantiles
+            FETCHED_BYTES.observe(len(feed_content), feed_type)
+        content_digest = self._calculate_digest(feed_content) if feed_content else None
+        if content_digest and content_digest == self.content_digest:
+            self.unchanged_count += 1
+            self._report_poll("unchanged")  # content is identical to the stored one, extraction and DB update skipped
+            self.feed_collector.commit_validators()
+            return self._record_unchanged_refresh()
         if feed_content:
-            LOGGER.info("Feed is retrieved successfully!")
-            feed = self.feed_extractor.extract_feed(feed_content)
+            start = time.perf_counter()
+            feed = await self.feed_extractor.async_extract_feed(
+                feed_content,
+                self.known_guids.keys(),
+                parse_pool=self.parse_pool,
+            )
+            EXTRACT_SECONDS.observe(time.perf_counter() - start, feed_type)
             if feed:
-                LOGGER.info("Feed object is instantiated!")
-                insert_update_feed(feed)
+                feed.etag = self.feed_collector.pending_etag
+                feed.last_modified = self.feed_collector.pending_last_modified
+                feed.content_digest = content_digest
+                feed.feed_type = self.feed_type
+                publication_dates = [post.publication_date for post in feed.posts]
+                guids = [post.guid for post in feed.posts]
+                start = time.perf_counter()
+                new_post_count = await self._store_feed(feed)
+                STORE_SECONDS.observe(time.perf_counter() - start, feed_type)
+                self.feed_collector.commit_validators()  # a failed store leaves the former validators in use
+                NEW_POSTS.observe(new_post_count, feed_type)
+                self.poll_schedule.record_refresh(new_post_count, ttl=feed.ttl, publication_dates=publication_dates)
+                self._remember_guids(guids)
+                self.content_digest = content_digest
+                self.refresh_count += 1
+                self._report_poll("stored", seen=len(publication_dates), new=new_post_count)
                 return True
+        self._report_poll("failed")
         return False
+
+    def refresh_stats(self) -> typing.Dict[str, int]:
+        """
+        Returns the refresh counters showing how much extraction and DB work is saved
+
+        Returns:
+            dictionary of the counters
+        """
+        return {
+            "refreshed": self.refresh_count,
+            "skipped_not_modified": self.not_modified_count,
+            "skipped_unchanged": self.unchanged_count,
+        }
+
+    async def _store_feed(self, feed: Feed) -> int:
+        """
+        Stores the feed through the FeedWriter if assigned, otherwise within its own transaction
+
+        Args:
+            feed: Feed object instantiated from the feed content
+
+        Returns:
+            number of posts which were not in the database before
+        """
+        if self.feed_writer:
+            return await self.feed_writer.submit(feed)
+        return await asyncio.to_thread(insert_update_feed, feed)
+
+    def _report_poll(self, outcome: str, seen: int = 0, new: int = 0) -> None:
+        """
+        Writes a single sampled event per poll, adds its outcome to the ingestion summary and counts it
+
+        Args:
+            outcome: result of the poll, e.g. 'stored', 'not_modified', 'unchanged' or 'failed'
+            seen: number of the extracted posts
+            new: number of the posts which were not in the DB before
+        """
+        LOGGER.info("Poll summary", address=self.address, outcome=outcome, seen=seen, new=new, sampled=True)
+        INGESTION_SUMMARY.record(outcome, seen=seen, new=new)
+        POLLS.inc(1, outcome)
+
+    def _record_unchanged_refresh(self) -> bool:
+        """
+        Records a refresh which did not bring any change
+
+        Returns:
+            True since the refresh is successful
+        """
+        self.refresh_count += 1
+        self.poll_schedule.record_refresh(new_post_count=0)
+        return True
+
+    @classmethod
+    def _calculate_digest(cls, feed_content: FeedContent) -> str:
+        """
+        Calculates the digest of the feed content to detect the unchanged contents
+
+        Args:
+            feed_content: the raw feed content, or an already decoded string
+
+        Returns:
+            hex digest of the content
+        """
+        if isinstance(feed_content, str):
+            feed_content = feed_content.encode()
+        return hashlib.blake2b(feed_content, digest_size=16).hexdigest()
+
+    def _remember_guids(self, guids: typing.List[str]) -> None:
+        """
+        Keeps the guids of the stored posts, only the most recent KNOWN_GUID_LIMIT guids are kept
+
+        Args:
+            guids: guids of the posts in the last extracted feed content
+        """
+        for guid in guids:
+            self.known_guids.pop(guid, None)  # move the guid to the most recent position
+            self.known_guids[guid] = None
+        for guid in list(itertools.islice(self.known_guids, max(len(self.known_guids) - KNOWN_GUID_LIMIT, 0))):
+            del self.known_guids[guid]
@@ -0,0 +1,268 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of HostConnectionPool class
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import asyncio
+import dataclasses
+import os
+import threading
+import time
+import typing
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+import structlog
+from requests.adapters import HTTPAdapter
+
+LOGGER = structlog.get_logger()
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("RSS_FEEDS_HTTP_MAX_CONNECTIONS_PER_HOST", "10"))  # open connections per host
+IDLE_TIMEOUT = float(os.getenv("RSS_FEEDS_HTTP_IDLE_TIMEOUT", "300"))  # seconds, sessions of an unused host are closed
+EVICTION_INTERVAL = float(os.getenv("RSS_FEEDS_HTTP_EVICTION_INTERVAL", "60"))  # seconds between idle session checks
+
+
+@dataclasses.dataclass
+class HostPoolStats:
+    """Usage statistics of the keep-alive sessions of a single host"""
+    acquired: int = 0  # number of times a session of the host is handed out
+    reused: int = 0  # number of times an already open session is handed out
+    created: int = 0  # number of sessions opened for the host
+    evicted: int = 0  # number of sessions closed due to being idle
+    in_use: int = 0  # number of collectors currently holding a session of the host
+    last_used: float = dataclasses.field(default_factory=time.monotonic)
+
+
+class HostConnectionPool:
+    """Thread-safe pool of keep-alive HTTP sessions shared by all the collectors of the same host"""
+
+    def __init__(
+            self,
+            max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+            idle_timeout: float = IDLE_TIMEOUT,
+    ) -> None:
+        """
+        Initializes the HostConnectionPool object
+
+        Args:
+            max_connections_per_host: upper limit of the open connections towards a single host
+            idle_timeout: seconds after which the sessions of an unused host are closed
+        """
+        self.max_connections_per_host: int = max_connections_per_host
+        self.idle_timeout: float = idle_timeout
+        self.sessions: typing.Dict[str, requests.Session] = {}
+        self.async_clients: typing.Dict[str, httpx.AsyncClient] = {}
+        self.host_stats: typing.Dict[str, HostPoolStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_host(cls, url: str) -> str:
+        """
+        Extracts the key of the pool from the url
+
+        Args:
+            url: the address to connect to
+
+        Returns:
+            scheme and network location of the url, e.g. 'https://example.com:443'
+        """
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def acquire_session(self, url: str) -> requests.Session:
+        """
+        Hands out the keep-alive session of the url's host, opens a new one if necessary
+
+        Args:
+            url: the address to connect to
+
+        Returns:
+            requests Session object shared by the host
+        """
+        host = self.get_host(url)
+        with self._lock:
+            session = self.sessions.get(host)
+            if session is None:
+                session = self._create_session()
+                self.sessions[host] = session
+                self._mark_acquired(host, reused=False)
+            else:
+                self._mark_acquired(host, reused=True)
+            evicted_sessions = self._pop_idle(self.sessions)
+        for idle_session in evicted_sessions:
+            idle_session.close()
+        return session
+
+    async def acquire_async_client(self, url: str) -> httpx.AsyncClient:
+        """
+        Hands out the keep-alive async client of the url's host, opens a new one if necessary.
+        Must be called from the event loop that is going to use the client.
+
+        Args:
+            url: the address to connect to
+
+        Returns:
+            httpx AsyncClient object shared by the host
+        """
+        host = self.get_host(url)
+        with self._lock:
+            client = self.async_clients.get(host)
+            if client is None:
+                client = self._create_async_client()
+                self.async_clients[host] = client
+                self._mark_acquired(host, reused=False)
+            else:
+                self._mark_acquired(host, reused=True)
+            evicted_clients = self._pop_idle(self.async_clients)
+        for idle_client in evicted_clients:
+            await idle_client.aclose()
+        return client
+
+    def release(self, url: str) -> None:
+        """
+        Gives the session of the url's host back to the pool, the session is kept open for reuse
+
+        Args:
+            url: the address that was connected to
+        """
+        host = self.get_host(url)
+        with self._lock:
+            stats = self.host_stats.get(host)
+            if stats:
+                stats.in_use = max(stats.in_use - 1, 0)
+                stats.last_used = time.monotonic()
+
+    def stats(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """
+        Returns the usage statistics of all the hosts in the pool
+
+        Returns:
+            dictionary of statistics per host
+        """
+        with self._lock:
+            return {host: dataclasses.asdict(stats) for host, stats in self.host_stats.items()}
+
+    def close_all(self) -> None:
+        """Closes all the sync sessions in the pool"""
+        with self._lock:
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+        for session in sessions:
+            session.close()
+
+    async def async_evict_idle(self) -> int:
+        """
+        Closes the sessions and the async clients of the hosts not used for longer than the idle timeout.
+        Must be awaited on the event loop using the clients.
+
+        Returns:
+            number of the closed sessions and clients
+        """
+        with self._lock:
+            evicted_sessions = self._pop_idle(self.sessions)
+            evicted_clients = self._pop_idle(self.async_clients)
+        for idle_session in evicted_sessions:
+            idle_session.close()
+        for idle_client in evicted_clients:
+            await idle_client.aclose()
+        return len(evicted_sessions) + len(evicted_clients)
+
+    async def evict_idle_periodically(self, interval: float = EVICTION_INTERVAL) -> None:
+        """
+        Evicts the idle sessions every interval, so that the hosts which are not polled anymore do not keep their
+        sessions open until the shutdown. Runs until it is cancelled.
+
+        Args:
+            interval: seconds between the checks
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await self.async_evict_idle()
+
+    async def async_close_all(self) -> None:
+        """Closes all the async clients in the pool, must be awaited on the event loop using the clients"""
+        with self._lock:
+            clients = list(self.async_clients.values())
+            self.async_clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    def _create_session(self) -> requests.Session:
+        """
+        Opens a new keep-alive session with a bounded connection pool
+
+        Returns:
+            requests Session object
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_connections_per_host)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.verify = False
+        return session
+
+    def _create_async_client(self) -> httpx.AsyncClient:
+        """
+        Opens a new keep-alive async client with a bounded connection pool
+
+        Returns:
+            httpx AsyncClient object
+        """
+        limits = httpx.Limits(
+            max_connections=self.max_connections_per_host,
+            max_keepalive_connections=self.max_connections_per_host,
+            keepalive_expiry=self.idle_timeout,
+        )
+        return httpx.AsyncClient(verify=False, limits=limits)
+
+    def _mark_acquired(self, host: str, reused: bool) -> None:
+        """
+        Updates the statistics of the host for a handed out session, must be called with the lock held
+
+        Args:
+            host: key of the pool
+            reused: flag showing whether an already open session is handed out
+        """
+        stats = self.host_stats.setdefault(host, HostPoolStats())
+        stats.acquired += 1
+        stats.in_use += 1
+        stats.last_used = time.monotonic()
+        if reused:
+            stats.reused += 1
+        else:
+            stats.created += 1
+            LOGGER.info(f"A new keep-alive session is opened for host '{host}'")
+
+    def _pop_idle(self, pool: typing.Dict[str, typing.Any]) -> typing.List[typing.Any]:
+        """
+        Removes the sessions of the hosts not used for longer than the idle timeout, must be called with the lock held
+
+        Args:
+            pool: dictionary of sessions per host
+
+        Returns:
+            list of removed sessions to be closed by the caller
+        """
+        deadline = time.monotonic() - self.idle_timeout
+        evicted: typing.List[typing.Any] = []
+        for host in list(pool):
+            stats = self.host_stats[host]
+            if stats.in_use == 0 and stats.last_used < deadline:
+                evicted.append(pool.pop(host))
+                stats.evicted += 1
+                LOGGER.info(f"Idle keep-alive session of host '{host}' is evicted")
+        return evicted
+
+
+CONNECTION_POOL = HostConnectionPool()  # shared by all the collectors of the process!
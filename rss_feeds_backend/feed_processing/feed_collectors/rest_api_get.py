@@ -15,16 +15,21 @@ Implementation of RestApiGet base object
 # -----------------------------------------------------------------------------#
 """
 import typing
+from contextlib import nullcontext
+from http import HTTPStatus
 
+import httpx
 import requests
 import structlog
 from requests.auth import HTTPBasicAuth
 
 from rss_feeds_backend.feed_processing.base.feed_collector import FeedCollector
+from rss_feeds_backend.feed_processing.feed_collectors.connection_pool import CONNECTION_POOL, HostConnectionPool
 
 LOGGER = structlog.get_logger()
 REQUEST_TIMEOUT = 3  # seconds
 EMPTY_STR = ""
+EMPTY_CONTENT = b""
 
 
 class RestApiGet(FeedCollector):
@@ -35,6 +40,7 @@ class RestApiGet(FeedCollector):
             feed_url: str,
             username: typing.Optional[str] = None,
             password: typing.Optional[str] = None,
+            connection_pool: HostConnectionPool = CONNECTION_POOL,
     ) -> None:
         """
         Initializes the FeedCollector class with the provided configuration
@@ -43,47 +49,98 @@ class RestApiGet(FeedCollector):
             feed_url: the url address of the feed to collect
             username: optional credential to access to feed service
             password: optional credential to access to feed service
+            connection_pool: pool of keep-alive sessions shared per host
         """
         super().__init__(feed_url)  # initialize the parent object
         self.username: typing.Optional[str] = username
         self.password: typing.Optional[str] = password
+        self.connection_pool: HostConnectionPool = connection_pool
+        self.session: typing.Optional[requests.Session] = None
+        self.async_client: typing.Optional[httpx.AsyncClient] = None
 
     def make_connection(self) -> bool:
         """
-        Initiates a connection towards the configured endpoint
+        Initiates a connection towards the configured endpoint by acquiring the keep-alive session of its host
 
         Returns:
             True if connection is established successfully, False otherwise
         """
         if self.feed_url:
+            self.session = self.connection_pool.acquire_session(self.feed_url)
             return True
         LOGGER.warning("Server URL is not set! Connection cannot be made!")
         return False
 
     def close_connection(self) -> bool:
         """
-        Closes the open connection to the configured endpoint
+        Closes the open connection to the configured endpoint by giving the session back to the pool
 
         Returns:
             True if connection is closed successfully, False otherwise
         """
+        if self.session:
+            self.session = None
+            self.connection_pool.release(self.feed_url)
         return True
 
-    def get_feed_content(self) -> str:
+    def get_feed_content(self) -> bytes:
         """
         Requests the current feed content
 
         Returns:
-            the received status
+            the received raw content, not decoded so that the extractor honours the declared encoding
         """
         result = self._rest_get()
+        if self.is_not_modified:  # not a failure, the 304 is logged at debug level with the validators
+            return EMPTY_CONTENT
         if result:
-            LOGGER.info(f"REST GET is successful from url '{self.feed_url}'")
+            LOGGER.debug("REST GET is successful", url=self.feed_url)
             return result
-        LOGGER.info(f"REST GET is failed! No reply from url '{self.feed_url}'!")
-        return EMPTY_STR
+        LOGGER.info("REST GET is failed! No reply from url", url=self.feed_url, sampled=True)
+        return EMPTY_CONTENT
 
-    def _rest_get(self) -> typing.Optional[str]:  # noqa: WPS212
+    async def async_make_connection(self) -> bool:
+        """
+        Initiates a connection towards the configured endpoint by acquiring the keep-alive async client of its host
+
+        Returns:
+            True if connection is established successfully, False otherwise
+        """
+        if self.feed_url:
+            self.async_client = await self.connection_pool.acquire_async_client(self.feed_url)
+            return True
+        LOGGER.warning("Server URL is not set! Connection cannot be made!")
+        return False
+
+    async def async_close_connection(self) -> bool:
+        """
+        Closes the open connection to the configured endpoint by giving the async client back to the pool
+
+        Returns:
+            True if connection is closed successfully, False otherwise
+        """
+        if self.async_client:
+            self.async_client = None
+            self.connection_pool.release(self.feed_url)
+        return True
+
+    async def async_get_feed_content(self) -> bytes:
+        """
+        Requests the current feed content through the async HTTP client
+
+        Returns:
+            the received raw content, not decoded so that the extractor honours the declared encoding
+        """
+        result = await self._async_rest_get()
+        if self.is_not_modified:  # not a failure, the 304 is logged at debug level with the validators
+            return EMPTY_CONTENT
+        if result:
+            LOGGER.debug("Async REST GET is successful", url=self.feed_url)
+            return result
+        LOGGER.info("Async REST GET is failed! No reply from url", url=self.feed_url, sampled=True)
+        return EMPTY_CONTENT
+
+    def _rest_get(self) -> typing.Optional[bytes]:  # noqa: WPS212
         """
         Makes a REST GET call and returns the response content
 
@@ -93,17 +150,85 @@ class RestApiGet(FeedCollector):
         if not self.feed_url:
             LOGGER.warning("server_url is a mandatory member to set for RestApiGet objects!")
             return None
+        self.is_not_modified = False
         try:
-            response = requests.get(
+            http_get = self.session.get if self.session else requests.get
+            response = http_get(
                 url=self.feed_url,
                 auth=HTTPBasicAuth(self.username, self.password) if self.username and self.password else None,
+                headers=self._conditional_headers(),
                 verify=False,
                 timeout=REQUEST_TIMEOUT,
             )
         except requests.exceptions.RequestException as exc:
             LOGGER.error(f"Exception occurred during request get: {exc}")
             return None
-        return response.text if self._check_get_response(response) else None
+        self._update_validators(response.status_code, response.headers)
+        if self.is_not_modified or not self._check_get_response(response):
+            return None
+        return response.content
+
+    async def _async_rest_get(self) -> typing.Optional[bytes]:  # noqa: WPS212
+        """
+        Makes an async REST GET call and returns the response content
+
+        Returns:
+            response content if GET call returns success, None otherwise
+        """
+        if not self.feed_url:
+            LOGGER.warning("server_url is a mandatory member to set for RestApiGet objects!")
+            return None
+        self.is_not_modified = False
+        try:
+            # fall back to a short-lived client if no pooled connection is made beforehand
+            client_context = nullcontext(self.async_client) if self.async_client else httpx.AsyncClient(verify=False)
+            async with client_context as client:
+                response = await client.get(
+                    url=self.feed_url,
+                    auth=httpx.BasicAuth(self.username, self.password) if self.username and self.password else None,
+                    headers=self._conditional_headers(),
+                    timeout=REQUEST_TIMEOUT,
+                )
+        except httpx.HTTPError as exc:
+            LOGGER.error(f"Exception occurred during async request get: {exc}")
+            return None
+        self._update_validators(response.status_code, response.headers)
+        if self.is_not_modified or not self._check_async_get_response(response):
+            return None
+        return response.content
+
+    def _conditional_headers(self) -> typing.Dict[str, str]:
+        """
+        Generates the conditional request headers from the validators of the last retrieved content
+
+        Returns:
+            dictionary of If-None-Match/If-Modified-Since headers, empty if there is no validator
+        """
+        headers: typing.Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def _update_validators(self, status_code: int, headers: typing.Mapping[str, str]) -> None:
+        """
+        Keeps the validators sent by the server as pending until the content is stored, and marks the content as
+        not modified in case of 304
+
+        Args:
+            status_code: http status code of the response
+            headers: http headers of the response
+        """
+        if status_code == HTTPStatus.NOT_MODIFIED:
+            LOGGER.debug("Feed content is not modified since the last retrieve", url=self.feed_url)
+            self.is_not_modified = True
+            self.pending_etag = headers.get("ETag", self.etag)  # the stored content is still the current one
+            self.pending_last_modified = headers.get("Last-Modified", self.last_modified)
+            self.commit_validators()
+        elif status_code == HTTPStatus.OK:  # validators missing in the response do not describe the new content
+            self.pending_etag = headers.get("ETag")
+            self.pending_last_modified = headers.get("Last-Modified")
 
     @classmethod
     def _check_get_response(cls, response: requests.Response) -> bool:
@@ -119,6 +244,24 @@ class RestApiGet(FeedCollector):
         try:
             response.raise_for_status()
         except requests.HTTPError as error:
-            LOGGER.warning(f"Request failed. Error message: {str(error)}")
+            LOGGER.warning("Request failed!", error=str(error))
+            return False
+        return True
+
+    @classmethod
+    def _check_async_get_response(cls, response: httpx.Response) -> bool:
+        """
+        Check if the status code of the async client response is ok
+
+        Args:
+            response: The http response object
+
+        Returns:
+            True if the response is ok otherwise False
+        """
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as error:
+            LOGGER.warning("Request failed!", error=str(error))
             return False
         return True
@@ -15,28 +15,194 @@ Implementation of JsonExtractor class
 # -----------------------------------------------------------------------------#
 """
 import typing
+from datetime import datetime
+from types import MappingProxyType
+
+import orjson
+import structlog
 
 from rss_feeds_backend.common.enums import FeedType
-from rss_feeds_backend.db_models.feed import Feed
-from rss_feeds_backend.feed_processing.base.feed_extractor import FeedExtractor
+from rss_feeds_backend.feed_processing.base.feed_collector import FeedContent
+from rss_feeds_backend.feed_processing.base.feed_extractor import FeedExtractor, FeedRecord, PostRecord, \
+    DEFAULT_TITLE, DEFAULT_DESCRIPTION, DEFAULT_TTL, KNOWN_ITEM_RUN_LENGTH
+
+LOGGER = structlog.get_logger()
+JSON_FEED_VERSION_PREFIX = "https://jsonfeed.org/version/"
+POST_DESCRIPTION_KEYS = ("summary", "content_text", "content_html")  # in the order of preference
+POST_DATE_KEYS = ("date_published", "date_modified")  # in the order of preference
+JSON_FEED_ATTR_MAP = MappingProxyType(  # Feed attribute => JSON Feed keys in the order of preference
+    {
+        "title": ("title",),
+        "link": ("feed_url", "home_page_url"),
+        "description": ("description",),
+    },
+)
 
 
 class JsonExtractor(FeedExtractor):
-    """class to perform extraction of feed details and posts from a JSON feed content"""
+    """class to perform extraction of feed details and posts from a JSON Feed (version 1.1) content"""
 
-    def __init__(self) -> None:
+    def __init__(self, known_item_run_length: int = KNOWN_ITEM_RUN_LENGTH) -> None:
         """
         Initialize the JsonExtractor class with the provided parameters.
+
+        Args:
+            known_item_run_length: number of consecutive already-known items to stop the item conversion at
         """
         super().__init__(feed_type=FeedType.JSON)
+        self.known_item_run_length: int = known_item_run_length
+
+    def extract_records(
+            self,
+            feed_content: FeedContent,
+            known_guids: typing.AbstractSet[str] = frozenset(),
+    ) -> typing.Optional[FeedRecord]:
+        """
+        Parses the feed content into picklable records without instantiating any DB model.
+        As in the XML extractor, the items are converted until a run of already-known items is reached; the items
+        are listed the most recent first, so the older items are known as well.
+
+        Args:
+            feed_content: the feed content in string or bytes, bytes are parsed without decoding copy
+            known_guids: guids of the already stored posts, used to stop at the known items
+
+        Returns:
+            FeedRecord object containing the list of post records and other feed details, None if content is invalid
+        """
+        json_feed = self._load(feed_content)
+        if json_feed is None:
+            return None
+        posts: typing.List[PostRecord] = []
+        known_run = 0
+        for post in self.iter_post_records(json_feed):
+            posts.append(post)
+            known_run = known_run + 1 if post.guid in known_guids else 0
+            if known_guids and known_run >= self.known_item_run_length:
+                LOGGER.debug("Already-known items are reached, the rest of the items is skipped", run=known_run)
+                break
+        return FeedRecord(
+            title=self._first_value(json_feed, JSON_FEED_ATTR_MAP["title"]) or DEFAULT_TITLE,
+            link=self._first_value(json_feed, JSON_FEED_ATTR_MAP["link"]),
+            description=self._first_value(json_feed, JSON_FEED_ATTR_MAP["description"]) or DEFAULT_DESCRIPTION,
+            ttl=DEFAULT_TTL,  # JSON Feed does not declare a ttl
+            last_build_date=self._latest_publication_date(posts),
+            posts=posts,
+        )
+
+    def iter_post_records(self, json_feed: typing.Dict[str, typing.Any]) -> typing.Iterator[PostRecord]:
+        """
+        Converts the 'items' of a parsed JSON Feed into post records, one item at a time. orjson parses the whole
+        document beforehand, only the conversion is lazy so that the caller can stop before the older items.
+
+        Args:
+            json_feed: the parsed JSON Feed document
+
+        Yields:
+            PostRecord object for every item having an id
+        """
+        items = json_feed.get("items")
+        if not isinstance(items, list):
+            LOGGER.warning("JSON Feed content does not have an 'items' list!")
+            return
+        for item in items:
+            post = self._extract_post(item)
+            if post:
+                yield post
+
+    @classmethod
+    def _load(cls, feed_content: FeedContent) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """
+        Parses the JSON content with orjson, which accepts bytes and memoryview without decoding them to str first
+
+        Args:
+            feed_content: the feed content in string or bytes
+
+        Returns:
+            the parsed JSON Feed document if it is valid, None otherwise
+        """
+        try:
+            json_feed = orjson.loads(feed_content)
+        except orjson.JSONDecodeError as exc:
+            LOGGER.error(f"JSON Feed content cannot be parsed: {exc}")
+            return None
+        if not isinstance(json_feed, dict):
+            LOGGER.error("JSON Feed content is not a JSON object!")
+            return None
+        if not str(json_feed.get("version", "")).startswith(JSON_FEED_VERSION_PREFIX):
+            LOGGER.warning(f"Unexpected JSON Feed version: '{json_feed.get('version')}'")
+        return json_feed
+
+    def _extract_post(self, item: typing.Any) -> typing.Optional[PostRecord]:
+        """
+        Extracts the necessary Post details from an item of the JSON Feed and generates a post record
+
+        Args:
+             item: an element of the 'items' list
+
+        Returns:
+            PostRecord object if the item has an id, None otherwise
+        """
+        if not isinstance(item, dict) or item.get("id") is None:
+            LOGGER.warning("JSON Feed item without an id is skipped!", sampled=True)
+            return None
+        guid = str(item["id"])  # id may be a number in older feeds
+        return PostRecord(
+            title=item.get("title") or DEFAULT_TITLE,
+            link=item.get("url") or item.get("external_url") or guid,
+            guid=guid,
+            description=self._first_value(item, POST_DESCRIPTION_KEYS) or DEFAULT_DESCRIPTION,
+            publication_date=self._convert_datetime(self._first_value(item, POST_DATE_KEYS)),
+        )
+
+    @classmethod
+    def _first_value(
+            cls,
+            json_object: typing.Dict[str, typing.Any],
+            keys: typing.Sequence[str],
+    ) -> typing.Optional[str]:
+        """
+        Returns the value of the first key existing with a non-empty value
 
-    def extract_feed(self, feed_content: str) -> typing.Optional[Feed]:
+        Args:
+            json_object: a JSON object
+            keys: the keys in the order of preference
+
+        Returns:
+            the found value, None if none of the keys has a value
         """
-        Goes over the feed content and extracts the feed info with posts
+        for key in keys:
+            if json_object.get(key):
+                return json_object[key]
+        return None
+
+    @classmethod
+    def _latest_publication_date(cls, posts: typing.List[PostRecord]) -> datetime:
+        """
+        JSON Feed has no build date, the publication date of the latest post is used instead
 
         Args:
-            feed_content: the feed content in string
+            posts: the extracted post records
 
         Returns:
-            Feed object containing the list of posts and other feed details
-        """
\ No newline at end of file
+            the latest publication date, now if there is no post
+        """
+        if not posts:
+            return datetime.now()
+        # compare timestamps since naive and timezone aware datetimes cannot be compared directly
+        return max(posts, key=lambda post: post.publication_date.timestamp()).publication_date
+
+    @classmethod
+    def _convert_datetime(cls, datetime_reading: typing.Optional[str]) -> datetime:
+        """
+        Converts RFC 3339 datetime from string to datetime object
+
+        Args:
+            datetime_reading: string reading of datetime from JSON
+        """
+        if not datetime_reading:
+            return datetime.now()
+        try:
+            return datetime.fromisoformat(datetime_reading)
+        except ValueError:
+            LOGGER.warning("Datetime is not in RFC 3339 format!", datetime=datetime_reading, sampled=True)
+            return datetime.now()
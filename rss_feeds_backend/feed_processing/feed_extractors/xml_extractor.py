@@ -23,10 +23,9 @@ import structlog
 from lxml import etree
 
 from rss_feeds_backend.common.enums import FeedType
-from rss_feeds_backend.db_models.feed import Feed
-from rss_feeds_backend.db_models.post import Post
-from rss_feeds_backend.feed_processing.base.feed_extractor import FeedExtractor, DEFAULT_TITLE, DEFAULT_DESCRIPTION, \
-    DEFAULT_TTL
+from rss_feeds_backend.feed_processing.base.feed_collector import FeedContent
+from rss_feeds_backend.feed_processing.base.feed_extractor import FeedExtractor, FeedRecord, PostRecord, \
+    DEFAULT_TITLE, DEFAULT_DESCRIPTION, DEFAULT_TTL, KNOWN_ITEM_RUN_LENGTH
 from rss_feeds_backend.feed_processing.feed_collectors.rest_api_get import EMPTY_STR
 
 LOGGER = structlog.get_logger()
@@ -46,35 +45,105 @@ FEED_XPATH_MAP = MappingProxyType(
     },
 )
 POST_ATTR_LIST = ("title", "link", "description", "guid", "pubDate")
+CHANNEL_TAG_MAP = MappingProxyType(  # tag of a <channel> child => Feed attribute, used in streaming mode
+    {
+        "title": "title",
+        f"{{{NAMESPACES['atom']}}}link": "link",
+        "description": "description",
+        "ttl": "ttl",
+        "lastBuildDate": "last_build_date",
+    },
+)
+PARSE_CHUNK_SIZE = 65536  # bytes handed to lxml at once, the only copy made from a binary content
+ITEM_END_TAG = b"</item>"
+START_TAG_NAME_PATTERN = re.compile(rb"<(?:[-.\w]+:)?([-.\w]+)")  # local name of an element, with or without prefix
 
 
 class XmlExtractor(FeedExtractor):
     """class to perform extraction of feed details and posts from an XML feed content"""
 
-    def __init__(self) -> None:
+    def __init__(self, streaming: bool = True, known_item_run_length: int = KNOWN_ITEM_RUN_LENGTH) -> None:
         """
         Initialize the XmlExtractor class with the provided parameters.
+
+        Args:
+            streaming: flag to parse the content incrementally instead of building the whole tree
+            known_item_run_length: number of consecutive already-known items to stop the streaming parse at
         """
         super().__init__(feed_type=FeedType.XML)
+        self.streaming: bool = streaming
+        self.known_item_run_length: int = known_item_run_length
 
-    def extract_feed(self, feed_content: str) -> typing.Optional[Feed]:
+    def extract_records(
+            self,
+            feed_content: FeedContent,
+            known_guids: typing.AbstractSet[str] = frozenset(),
+    ) -> typing.Optional[FeedRecord]:
         """
-        Goes over the feed content and extracts the feed info with posts
+        Parses the feed content into picklable records without instantiating any DB model.
+        Binary content is handed to lxml as it is, so that lxml decodes it according to its declared encoding.
 
         Args:
-            feed_content: the feed content in string
+            feed_content: the raw feed content in bytes (or memoryview), or an already decoded string
+            known_guids: guids of the already stored posts, used to stop the streaming parse early
 
         Returns:
-            Feed object containing the list of posts and other feed details
+            FeedRecord object containing the list of post records and other feed details
         """
-        xml_content = re.sub(r'\bencoding="[-\w]+"', '', feed_content, count=1)  # remove encoding from xml content
-        rss_root = etree.fromstring(xml_content)
-        feed = self._initialize_feed_object(rss_root)
-        if feed:
-            feed.posts = self._extract_posts(rss_root, feed)
-        return feed
+        xml_content = self._to_binary(feed_content)
+        if self.streaming:
+            return self._extract_records_streaming(xml_content, known_guids)
+        parser = etree.XMLParser()
+        for chunk in self._iter_chunks(xml_content):
+            parser.feed(chunk)
+        rss_root = parser.close()
+        return self._create_feed_record(self._read_feed_attributes(rss_root), self._extract_posts(rss_root))
 
-    def _initialize_feed_object(self, element: "etree._Element") -> typing.Optional[Feed]:
+    def _extract_records_streaming(self, xml_content: memoryview, known_guids: typing.AbstractSet[str]) -> FeedRecord:
+        """
+        Parses the content incrementally, clearing every processed <item> so that the memory usage stays flat.
+        Once a run of already-known items is reached the parse stops, the older items are known as well. Only if
+        channel elements follow the last item, the parse goes on over the remaining items without extracting them
+        until those elements are read.
+
+        Args:
+            xml_content: the raw feed content
+            known_guids: guids of the already stored posts
+
+        Returns:
+            FeedRecord object containing the list of new post records and other feed details
+        """
+        attr_readings: typing.Dict[str, str] = {}
+        posts: typing.List[PostRecord] = []
+        seen_channel_tags: typing.Set[str] = set()
+        trailing_tags: typing.FrozenSet[str] = frozenset()  # channel tags after the last item, still to be read
+        known_run = 0
+        is_rest_known = False  # set once a run of known items is reached, the older items are skipped
+        for element in self._iter_end_events(xml_content):
+            parent = element.getparent()
+            if parent is None or parent.tag != "channel":
+                continue  # children of <item>s are read together with their <item>
+            if element.tag == "item":
+                post = None if is_rest_known else self._extract_post(element)
+                self._release_element(element, parent)
+                if post is None:
+                    continue
+                posts.append(post)
+                known_run = known_run + 1 if post.guid in known_guids else 0
+                if known_guids and known_run >= self.known_item_run_length:
+                    is_rest_known = True
+                    trailing_tags = self._find_trailing_channel_tags(xml_content)
+                    LOGGER.debug("Already-known items are reached", run=known_run, trailing=len(trailing_tags))
+            elif element.tag in CHANNEL_TAG_MAP:
+                seen_channel_tags.add(element.tag)
+                attr_value = self._get_child_text(element)
+                if attr_value:
+                    attr_readings[CHANNEL_TAG_MAP[element.tag]] = attr_value
+            if is_rest_known and trailing_tags <= seen_channel_tags:
+                break  # nothing left to read
+        return self._create_feed_record(attr_readings, posts)
+
+    def _read_feed_attributes(self, element: "etree._Element") -> typing.Dict[str, str]:
         """
         Extracts the necessary values from xml to instantiate Feed object
 
@@ -82,59 +151,82 @@ class XmlExtractor(FeedExtractor):
             element: xml element
 
         Returns:
-            Feed object if mandatory fields exist, None otherwise
+            text values of the feed attributes existing in the xml
         """
         attr_readings: typing.Dict[str, str] = {}
         for attr, xpath in FEED_XPATH_MAP.items():
             child = element.find(xpath, namespaces=NAMESPACES)
             attr_value = self._get_child_text(child)
             if not attr_value:
-                LOGGER.warning(f"For Feed attribute '{attr}', xpath: '{xpath}' does not exist in XML content!")
+                LOGGER.warning(
+                    "Feed attribute does not exist in XML content!",
+                    attribute=attr,
+                    xpath=xpath,
+                    sampled=True,
+                )
                 continue
             attr_readings[attr] = attr_value
-        return Feed(
+        return attr_readings
+
+    def _create_feed_record(
+            self,
+            attr_readings: typing.Dict[str, str],
+            posts: typing.List[PostRecord],
+    ) -> FeedRecord:
+        """
+        Creates the feed record from the extracted attribute values
+
+        Args:
+            attr_readings: text values of the feed attributes
+            posts: the extracted post records
+
+        Returns:
+            FeedRecord object with default values for the missing attributes
+        """
+        return FeedRecord(
             title=attr_readings.get("title", DEFAULT_TITLE),
             link=attr_readings.get("link"),
             description=attr_readings.get("description", DEFAULT_DESCRIPTION),
             ttl=int(attr_readings.get("ttl", DEFAULT_TTL)),
             last_build_date=self._convert_datetime(attr_readings.get("last_build_date")),
+            posts=posts,
         )
 
-    def _extract_posts(self, element: "etree._Element", feed: Feed) -> typing.List[Post]:
+    def _extract_posts(self, element: "etree._Element") -> typing.List[PostRecord]:
         """
-        Iterates over all the 'item's in the rss xml and generates Post objects
+        Iterates over all the 'item's in the rss xml and generates post records
 
         Args:
              element: root element of the rss xml content
 
         Returns:
-            list of Post objects
+            list of PostRecord objects
         """
-        posts: typing.List[Post] = []
+        posts: typing.List[PostRecord] = []
         for item in element.findall(f"{COMMON_XPATH}item"):
-            post = self._extract_post(item, feed)
+            post = self._extract_post(item)
             if post:
                 posts.append(post)
         return posts
 
-    def _extract_post(self, element: "etree._Element", feed: Feed) -> typing.Optional[Post]:
+    def _extract_post(self, element: "etree._Element") -> typing.Optional[PostRecord]:
         """
-        Extracts the necessary Post details from <item> xpath and generates Post object
+        Extracts the necessary Post details from <item> xpath and generates a post record
 
         Args:
              element: xml object of <item>
 
         Returns:
-            Post object if all the fields are extracted, None otherwise
+            PostRecord object if all the fields are extracted, None otherwise
         """
         post_attr_map: typing.Dict[str, str] = {}
         for child in element:
             if child.tag in POST_ATTR_LIST:
                 post_attr_map[child.tag] = child.text
         if len(post_attr_map) != len(POST_ATTR_LIST):
-            LOGGER.warning(f"Not all the POST class attributes are extracted!")
+            LOGGER.warning("Not all the POST class attributes are extracted!", sampled=True)
             return None
-        return Post(
+        return PostRecord(
             title=post_attr_map.get("title", DEFAULT_TITLE),
             link=post_attr_map.get("link"),
             guid=post_attr_map.get("guid"),
@@ -142,6 +234,93 @@ class XmlExtractor(FeedExtractor):
             publication_date=self._convert_datetime(post_attr_map.get("pubDate")),
         )
 
+    @classmethod
+    def _to_binary(cls, feed_content: FeedContent) -> memoryview:
+        """
+        Provides a view on the binary content without copying it
+
+        Args:
+            feed_content: the raw feed content in bytes (or memoryview), or an already decoded string
+
+        Returns:
+            memoryview of the binary content
+        """
+        if isinstance(feed_content, str):
+            # a decoded string does not match its declared encoding anymore, lxml would refuse it!
+            feed_content = re.sub(r'\bencoding="[-\w]+"', '', feed_content, count=1).encode()
+        return memoryview(feed_content)
+
+    @classmethod
+    def _iter_chunks(cls, xml_content: memoryview) -> typing.Iterator[bytes]:
+        """
+        Slices the content into chunks, lxml only accepts bytes so every chunk is copied but never the whole content
+
+        Args:
+            xml_content: the raw feed content
+
+        Yields:
+            consecutive chunks of the content
+        """
+        for offset in range(0, len(xml_content), PARSE_CHUNK_SIZE):
+            yield xml_content[offset:offset + PARSE_CHUNK_SIZE].tobytes()
+
+    @classmethod
+    def _find_trailing_channel_tags(cls, xml_content: memoryview) -> typing.FrozenSet[str]:
+        """
+        Finds the channel tags which follow the last <item>, searching the content backwards chunk by chunk so that
+        only its end is copied
+
+        Args:
+            xml_content: the raw feed content
+
+        Returns:
+            tags of CHANNEL_TAG_MAP appearing after the last item, empty if the content ends with the items
+        """
+        end = len(xml_content)
+        while end > 0:
+            start = max(end - PARSE_CHUNK_SIZE, 0)
+            chunk = xml_content[start:end + len(ITEM_END_TAG) - 1].tobytes()  # overlaps to find a split end tag
+            index = chunk.rfind(ITEM_END_TAG)
+            if index >= 0:
+                trailing_content = xml_content[start + index + len(ITEM_END_TAG):].tobytes()
+                names = {name.decode() for name in START_TAG_NAME_PATTERN.findall(trailing_content)}
+                return frozenset(tag for tag in CHANNEL_TAG_MAP if tag.rpartition("}")[2] in names)
+            end = start
+        return frozenset()
+
+    @classmethod
+    def _iter_end_events(cls, xml_content: memoryview) -> typing.Iterator["etree._Element"]:
+        """
+        Feeds the content chunk by chunk to a pull parser and yields the elements as soon as they are complete
+
+        Args:
+            xml_content: the raw feed content
+
+        Yields:
+            the completely parsed elements in document order
+        """
+        parser = etree.XMLPullParser(events=("end",))
+        for chunk in cls._iter_chunks(xml_content):
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                yield element
+        parser.close()
+        for _, element in parser.read_events():
+            yield element
+
+    @classmethod
+    def _release_element(cls, element: "etree._Element", parent: "etree._Element") -> None:
+        """
+        Frees the memory of a processed element together with its already processed preceding siblings
+
+        Args:
+            element: the processed xml element
+            parent: parent of the processed element
+        """
+        element.clear()
+        while element.getprevious() is not None:
+            del parent[0]
+
     @classmethod
     def _get_child_text(cls, child: typing.Optional["etree._Element"]) -> str:
         """
@@ -14,48 +14,144 @@ Implementation of FeedManager class
 #                                                                              #
 # -----------------------------------------------------------------------------#
 """
+import asyncio
+import multiprocessing
+import os
 import typing
+from concurrent.futures import ProcessPoolExecutor
 
 import structlog
 
 from rss_feeds_backend.common.enums import FeedType
+from rss_feeds_backend.db_models.feed import Feed
 from rss_feeds_backend.feed_processing.base.feed_processor import FeedProcessor
+from rss_feeds_backend.feed_processing.feed_collectors.connection_pool import CONNECTION_POOL
 from rss_feeds_backend.feed_processing.feed_factory import FeedFactory
+from rss_feeds_backend.feed_processing.feed_scheduler import FeedScheduler
+from rss_feeds_backend.feed_processing.feed_writer import FeedWriter
+from rss_feeds_backend.feed_processing.ingestion_engine import IngestionEngine, WORKER_COUNT
 
 LOGGER = structlog.get_logger()
+PARSE_WORKERS = int(os.getenv("RSS_FEEDS_PARSE_WORKERS", "0"))  # worker processes for parsing, 0 disables the pool
 
 
 class FeedManager:
     """Manager class to keep FeedProcessor objects and manager their lifecycle"""
 
-    def __init__(self) -> None:
-        """Initializes the FeedManager object"""
-        self.feed_processor_list: typing.List[FeedProcessor] = []  # start with empty list!
+    def __init__(self, worker_count: int = WORKER_COUNT, parse_workers: int = PARSE_WORKERS) -> None:
+        """
+        Initializes the FeedManager object
+
+        Args:
+            worker_count: number of feed refreshes running at the same time
+            parse_workers: number of processes to offload the feed parsing to, 0 parses in the current process
+        """
+        self.parse_pool: typing.Optional[ProcessPoolExecutor] = None
+        if parse_workers > 0:
+            # spawn, since forking a process running the ingestion threads is not safe
+            self.parse_pool = ProcessPoolExecutor(parse_workers, mp_context=multiprocessing.get_context("spawn"))
+            LOGGER.info(f"Feed parsing is offloaded to {parse_workers} worker processes")
+        self.feed_processors: typing.Dict[str, FeedProcessor] = {}  # start with empty dictionary!
+        self.feed_scheduler = FeedScheduler()  # knows which feed is due next
+        self.feed_writer = FeedWriter()  # single writer committing the feeds of all the processors in batches
+        self.ingestion_engine = IngestionEngine(
+            self.feed_scheduler,
+            worker_count=worker_count,
+            feed_writer=self.feed_writer,
+        )
+        self.ingestion_engine.start()  # single event loop thread dispatching the due feeds to the workers!
 
     def stop_all_processors(self) -> None:
         """Stops all the running FeedProcessors"""
-        for fp_obj in self.feed_processor_list:
+        for fp_obj in self.feed_processors.values():
             fp_obj.stop()
-        for fp_obj in self.feed_processor_list:
-            fp_obj.join()  # wait for threads to finish their execution!
+        self.ingestion_engine.stop()  # cancels the coroutines and waits for the event loop to finish!
+        CONNECTION_POOL.close_all()
+        if self.parse_pool:
+            self.parse_pool.shutdown(cancel_futures=True)
 
-    def define_new_feed_processor(self, feed_link: str, feed_type: FeedType) -> None:
+    def define_new_feed_processor(
+            self,
+            feed_link: str,
+            feed_type: FeedType,
+            stored_feed: typing.Optional[Feed] = None,
+    ) -> None:
         """
         Creates a new FeedProcessor object and starts execution
 
         Args:
             feed_link: the address of the feed source
             feed_type: the type of the feed
+            stored_feed: the feed persisted in the DB to restore the validators and the digest of the last content
         """
         fp_obj = FeedProcessor(feed_address=feed_link, feed_type=feed_type)
-        fp_obj.assign_collector(FeedFactory.initialize_feed_collector(feed_url=feed_link))
+        feed_collector = FeedFactory.initialize_feed_collector(feed_url=feed_link)
+        if feed_collector and stored_feed:
+            feed_collector.set_validators(etag=stored_feed.etag, last_modified=stored_feed.last_modified)
+        if stored_feed:
+            fp_obj.content_digest = stored_feed.content_digest
+        fp_obj.assign_collector(feed_collector)
         fp_obj.assign_extractor(FeedFactory.initialize_feed_extractor(feed_type=feed_type))
-        fp_obj.start()
-        self.feed_processor_list.append(fp_obj)
+        fp_obj.parse_pool = self.parse_pool
+        fp_obj.feed_writer = self.feed_writer
+        self.ingestion_engine.start_processor(fp_obj)
+        self.feed_processors[feed_link] = fp_obj
+
+    def get_feed_processor(self, feed_link: str) -> typing.Optional[FeedProcessor]:
+        """
+        Returns the FeedProcessor defined for the feed link
+
+        Args:
+            feed_link: the address of the feed source
+
+        Returns:
+            FeedProcessor object if it is defined, None otherwise
+        """
+        return self.feed_processors.get(feed_link)
+
+    def start_feed_processor(self, fp_obj: FeedProcessor) -> None:
+        """
+        Starts the periodic execution of an already defined FeedProcessor again
+
+        Args:
+            fp_obj: the FeedProcessor object to start
+        """
+        self.ingestion_engine.start_processor(fp_obj)
+
+    async def force_refresh_feed_processor(self, fp_obj: FeedProcessor) -> bool:
+        """
+        Forcefully refreshes the feed on the ingestion engine and waits for the result
+
+        Args:
+            fp_obj: the FeedProcessor object to refresh
+
+        Returns:
+            True if feed is refreshed, False otherwise
+        """
+        if fp_obj.is_alive():
+            LOGGER.warning(f"Feed Processor for address '{fp_obj.address}' is already running!")
+            return False
+        return await asyncio.wrap_future(self.ingestion_engine.refresh_processor(fp_obj))
+
+    def refresh_stats(self) -> typing.Dict[str, typing.Dict[str, int]]:
+        """
+        Collects the refresh counters of all the FeedProcessors
+
+        Returns:
+            dictionary of counters per feed link together with their totals under the 'total' key
+        """
+        stats: typing.Dict[str, typing.Dict[str, int]] = {}
+        total: typing.Dict[str, int] = {}
+        for feed_link, fp_obj in list(self.feed_processors.items()):
+            stats[feed_link] = fp_obj.refresh_stats()
+            for counter, count in stats[feed_link].items():
+                total[counter] = total.get(counter, 0) + count
+        stats["total"] = total
+        return stats
 
     def _check_feed_exists(self, feed_link: str) -> bool:
         """
-        Iterates over the feed list to check if the candidate feed is already in the list
+        Checks if the candidate feed is already in the dictionary
 
         Args:
             feed_link: the address to the feed source
@@ -63,9 +159,8 @@ class FeedManager:
         Returns:
             True if feed exists, False otherwise
         """
-        for fp_obj in self.feed_processor_list:
-            if fp_obj.address == feed_link:
-                LOGGER.info(f"A FeedProcessor for link '{feed_link}' already exists in the list!")
-                return True
-        LOGGER.info(f"There is no FeedProcessor for link '{feed_link}'")
+        if feed_link in self.feed_processors:
+            LOGGER.debug("A FeedProcessor already exists for the link", link=feed_link)
+            return True
+        LOGGER.debug("There is no FeedProcessor for the link", link=feed_link)
         return False
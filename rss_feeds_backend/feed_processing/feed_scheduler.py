@@ -0,0 +1,105 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of FeedScheduler class
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import heapq
+import itertools
+import time
+import typing
+
+import structlog
+
+from rss_feeds_backend.feed_processing.base.feed_processor import FeedProcessor
+
+LOGGER = structlog.get_logger()
+REMOVED = None  # placeholder of an invalidated heap entry
+
+
+class FeedScheduler:
+    """
+    Priority queue of FeedProcessors ordered by their next due time.
+    Scheduling, rescheduling and removal cost O(log n) per feed; invalidated entries are dropped lazily.
+    Not thread-safe, it is only accessed from the event loop of the IngestionEngine.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the FeedScheduler object"""
+        self.heap: typing.List[typing.List[typing.Any]] = []  # entries of [due_time, sequence, FeedProcessor]
+        self.entries: typing.Dict[str, typing.List[typing.Any]] = {}  # valid heap entry per feed address
+        self._sequence = itertools.count()  # tie-breaker keeping the insertion order of equal due times
+
+    def __len__(self) -> int:
+        """
+        Returns the number of scheduled feeds
+
+        Returns:
+            number of feeds waiting in the scheduler
+        """
+        return len(self.entries)
+
+    def schedule(self, fp_obj: FeedProcessor, delay: float) -> None:
+        """
+        Schedules the feed to be due after the delay, replaces the previous schedule of the feed if any
+
+        Args:
+            fp_obj: FeedProcessor object to be scheduled
+            delay: seconds from now until the feed is due
+        """
+        self.remove(fp_obj.address)
+        entry = [time.monotonic() + delay, next(self._sequence), fp_obj]
+        self.entries[fp_obj.address] = entry
+        heapq.heappush(self.heap, entry)
+
+    def remove(self, address: str) -> None:
+        """
+        Removes the schedule of the feed by invalidating its heap entry
+
+        Args:
+            address: the address of the feed
+        """
+        entry = self.entries.pop(address, None)
+        if entry is not None:
+            entry[-1] = REMOVED
+
+    def next_due_in(self) -> typing.Optional[float]:
+        """
+        Returns the seconds until the earliest scheduled feed is due
+
+        Returns:
+            seconds to wait (zero or negative if already due), None if there is no scheduled feed
+        """
+        self._drop_removed()
+        if not self.heap:
+            return None
+        return self.heap[0][0] - time.monotonic()
+
+    def pop_due(self) -> typing.Optional[FeedProcessor]:
+        """
+        Removes and returns the earliest scheduled feed if it is due
+
+        Returns:
+            FeedProcessor object if a feed is due, None otherwise
+        """
+        self._drop_removed()
+        if not self.heap or self.heap[0][0] > time.monotonic():
+            return None
+        fp_obj = heapq.heappop(self.heap)[-1]
+        del self.entries[fp_obj.address]
+        return fp_obj
+
+    def _drop_removed(self) -> None:
+        """Pops the invalidated entries from the top of the heap"""
+        while self.heap and self.heap[0][-1] is REMOVED:
+            heapq.heappop(self.heap)
@@ -0,0 +1,163 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of FeedWriter class
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import asyncio
+import os
+import time
+import typing
+
+import structlog
+
+from rss_feeds_backend.common.metrics import METRICS
+from rss_feeds_backend.database import insert_update_feed, insert_update_feeds
+from rss_feeds_backend.db_models.feed import Feed
+
+LOGGER = structlog.get_logger()
+FLUSH_SIZE = int(os.getenv("RSS_FEEDS_WRITER_FLUSH_SIZE", "50"))  # feeds committed in a single transaction at most
+FLUSH_INTERVAL = float(os.getenv("RSS_FEEDS_WRITER_FLUSH_INTERVAL", "0.5"))  # seconds to wait for a batch to fill
+QUEUE_SIZE = int(os.getenv("RSS_FEEDS_WRITER_QUEUE_SIZE", "256"))  # pending feeds before the processors are held
+COMMIT_SECONDS = METRICS.histogram("rss_feeds_writer_commit_seconds", "Duration of the batch commits", unit=1e-6)
+BATCH_FEEDS = METRICS.histogram("rss_feeds_writer_batch_feeds", "Feeds per committed batch")
+
+
+class FeedWriter:
+    """
+    Write-behind stage of the ingestion: FeedProcessors put the extracted feeds into a bounded queue and a single
+    writer coroutine commits them in batches, so that only one connection writes to the DB at a time.
+    Lives on the event loop of the IngestionEngine.
+    """
+
+    def __init__(
+            self,
+            flush_size: int = FLUSH_SIZE,
+            flush_interval: float = FLUSH_INTERVAL,
+            queue_size: int = QUEUE_SIZE,
+    ) -> None:
+        """
+        Initializes the FeedWriter object
+
+        Args:
+            flush_size: maximum number of feeds committed in a single transaction
+            flush_interval: seconds to wait for more feeds after the first feed of a batch arrives
+            queue_size: maximum number of feeds waiting to be written
+        """
+        self.flush_size: int = max(flush_size, 1)
+        self.flush_interval: float = flush_interval
+        self.queue_size: int = queue_size
+        self.write_queue: typing.Optional[asyncio.Queue] = None
+        self.batch_count: int = 0  # committed transactions
+        self.feed_count: int = 0  # feeds written
+        self.failed_count: int = 0  # feeds which could not be written
+        self.last_commit_latency: float = 0.0  # seconds
+        self.max_commit_latency: float = 0.0  # seconds
+        self.total_commit_latency: float = 0.0  # seconds
+
+    async def submit(self, feed: Feed) -> int:
+        """
+        Queues the feed to be written and waits until it is committed, waits for room if the queue is full
+
+        Args:
+            feed: Feed object instantiated from an RSS feed
+
+        Returns:
+            number of posts which were not in the database before
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.write_queue.put((feed, future))
+        return await future
+
+    async def run(self) -> None:
+        """Collects the queued feeds into batches and writes each batch within a single transaction"""
+        self.write_queue = asyncio.Queue(maxsize=self.queue_size)
+        while True:
+            batch = [await self.write_queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.flush_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.write_queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._write_batch(batch)
+
+    def stats(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns the queue depth and the commit statistics of the writer
+
+        Returns:
+            dictionary of the statistics, latencies are in seconds
+        """
+        return {
+            "queue_depth": self.write_queue.qsize() if self.write_queue else 0,
+            "queue_size": self.queue_size,
+            "flush_size": self.flush_size,
+            "flush_interval": self.flush_interval,
+            "batches": self.batch_count,
+            "feeds": self.feed_count,
+            "failed": self.failed_count,
+            "last_commit_latency": self.last_commit_latency,
+            "max_commit_latency": self.max_commit_latency,
+            "avg_commit_latency": self.total_commit_latency / self.batch_count if self.batch_count else 0.0,
+        }
+
+    async def _write_batch(self, batch: typing.List[typing.Tuple[Feed, asyncio.Future]]) -> None:
+        """
+        Commits the batch and hands the results to the waiting FeedProcessors, a failing batch is retried feed by feed
+
+        Args:
+            batch: pairs of the feed to be written and the future awaited by its FeedProcessor
+        """
+        feeds = [feed for feed, _ in batch]
+        start = time.perf_counter()
+        try:
+            new_post_counts = await asyncio.to_thread(insert_update_feeds, feeds)
+        except Exception as exc:
+            LOGGER.error(f"Batch of {len(batch)} feeds could not be written, writing them one by one: {exc}")
+            for feed, future in batch:
+                try:
+                    new_post_count = await asyncio.to_thread(insert_update_feed, feed)
+                except Exception as feed_exc:
+                    self.failed_count += 1
+                    if not future.done():
+                        future.set_exception(feed_exc)
+                    continue
+                self.feed_count += 1
+                if not future.done():
+                    future.set_result(new_post_count)
+            return
+        self._record_commit(time.perf_counter() - start, len(batch))
+        for (_, future), new_post_count in zip(batch, new_post_counts):
+            if not future.done():  # the FeedProcessor may have been cancelled meanwhile
+                future.set_result(new_post_count)
+
+    def _record_commit(self, latency: float, feed_count: int) -> None:
+        """
+        Updates the commit statistics
+
+        Args:
+            latency: seconds spent for writing and committing the batch
+            feed_count: number of feeds in the batch
+        """
+        self.batch_count += 1
+        self.feed_count += feed_count
+        self.last_commit_latency = latency
+        self.max_commit_latency = max(self.max_commit_latency, latency)
+        self.total_commit_latency += latency
+        COMMIT_SECONDS.observe(latency)
+        BATCH_FEEDS.observe(feed_count)
+        LOGGER.info("Feed batch is committed", feeds=feed_count, milliseconds=round(latency * 1000, 1), sampled=True)
@@ -0,0 +1,175 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of IngestionEngine class
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import asyncio
+import concurrent.futures
+import threading
+import typing
+
+import structlog
+
+from rss_feeds_backend.feed_processing.base.feed_processor import FeedProcessor
+from rss_feeds_backend.feed_processing.feed_collectors.connection_pool import CONNECTION_POOL
+from rss_feeds_backend.feed_processing.feed_scheduler import FeedScheduler
+from rss_feeds_backend.feed_processing.feed_writer import FeedWriter
+
+LOGGER = structlog.get_logger()
+WORKER_COUNT = 64  # number of feeds being fetched/extracted/stored at the same time
+STOP_TIMEOUT = 10.0  # seconds
+
+
+class IngestionEngine(threading.Thread):
+    """
+    Single thread hosting one asyncio event loop. A dispatcher coroutine hands the due feeds of the FeedScheduler
+    to a fixed number of worker coroutines which perform the refreshes and reschedule the feeds.
+    The optional FeedWriter coroutine commits the extracted feeds of all the workers in batches.
+    """
+
+    def __init__(
+            self,
+            feed_scheduler: FeedScheduler,
+            worker_count: int = WORKER_COUNT,
+            feed_writer: typing.Optional[FeedWriter] = None,
+    ) -> None:
+        """
+        Initializes the IngestionEngine object
+
+        Args:
+            feed_scheduler: priority queue of the feeds ordered by their due time
+            worker_count: number of feed refreshes running at the same time
+            feed_writer: write-behind stage to be run on the event loop, if any
+        """
+        super().__init__(name="IngestionEngine", daemon=True)
+        self.loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self.feed_scheduler: FeedScheduler = feed_scheduler
+        self.worker_count: int = worker_count
+        self.feed_writer: typing.Optional[FeedWriter] = feed_writer
+        self.work_queue: typing.Optional[asyncio.Queue] = None
+        self.tasks: typing.List[asyncio.Task] = []
+        self._wakeup: typing.Optional[asyncio.Event] = None
+        self._loop_ready = threading.Event()
+
+    def run(self) -> None:
+        """Runs the event loop until the engine is asked to stop"""
+        asyncio.set_event_loop(self.loop)
+        self.work_queue = asyncio.Queue(maxsize=self.worker_count)  # back pressure towards the dispatcher
+        self._wakeup = asyncio.Event()
+        if self.feed_writer:
+            self.tasks.append(self.loop.create_task(self.feed_writer.run(), name="writer"))
+        self.tasks.append(self.loop.create_task(self._dispatch(), name="dispatcher"))
+        self.tasks.append(self.loop.create_task(CONNECTION_POOL.evict_idle_periodically(), name="pool-evictor"))
+        for index in range(self.worker_count):
+            self.tasks.append(self.loop.create_task(self._work(), name=f"worker-{index}"))
+        self.loop.call_soon(self._loop_ready.set)
+        LOGGER.info(f"Ingestion Engine event loop is started with {self.worker_count} workers!")
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_default_executor())
+            self.loop.close()
+        LOGGER.info("Ingestion Engine event loop is closed!")
+
+    def start_processor(self, fp_obj: FeedProcessor) -> None:
+        """
+        Schedules the periodic refresh of a FeedProcessor, the first refresh is due immediately
+
+        Args:
+            fp_obj: FeedProcessor object to be driven by the engine
+        """
+        self._loop_ready.wait()
+        self.loop.call_soon_threadsafe(self._schedule, fp_obj, 0.0)
+
+    def refresh_processor(self, fp_obj: FeedProcessor) -> concurrent.futures.Future:
+        """
+        Runs a single feed refresh of the FeedProcessor on the event loop
+
+        Args:
+            fp_obj: FeedProcessor object to be refreshed
+
+        Returns:
+            future holding True if feed is refreshed, False otherwise
+        """
+        self._loop_ready.wait()
+        return asyncio.run_coroutine_threadsafe(fp_obj.refresh_feed(), self.loop)
+
+    def stop(self) -> None:
+        """Cancels the dispatcher and the workers and stops the event loop"""
+        if not self.is_alive():
+            return
+        future = asyncio.run_coroutine_threadsafe(self._cancel_tasks(), self.loop)
+        try:
+            future.result(timeout=STOP_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            LOGGER.warning("Not all the ingestion coroutines are cancelled in time!")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.join()
+
+    def _schedule(self, fp_obj: FeedProcessor, delay: float) -> None:
+        """
+        Puts the FeedProcessor into the scheduler, must be called from the event loop thread
+
+        Args:
+            fp_obj: FeedProcessor object to be scheduled
+            delay: seconds from now until the feed is due
+        """
+        fp_obj.stop_requested = False
+        fp_obj.is_running = True
+        self.feed_scheduler.schedule(fp_obj, delay)
+        self._wakeup.set()  # the dispatcher may be waiting for a later feed!
+
+    async def _dispatch(self) -> None:
+        """Waits until the earliest feed is due and hands it over to the workers"""
+        while True:
+            delay = self.feed_scheduler.next_due_in()
+            if delay is not None and delay <= 0:
+                fp_obj = self.feed_scheduler.pop_due()
+                if not fp_obj.stop_requested:
+                    await self.work_queue.put(fp_obj)
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass  # the earliest feed is due now!
+
+    async def _work(self) -> None:
+        """Refreshes the feeds handed over by the dispatcher and puts them back into the scheduler"""
+        while True:
+            fp_obj: FeedProcessor = await self.work_queue.get()
+            try:
+                is_refreshed = await fp_obj.refresh_feed()
+            except Exception as exc:  # a broken feed should not take the worker down!
+                LOGGER.error(f"Exception occurred during refresh of feed '{fp_obj.address}': {exc}")
+                is_refreshed = False
+            finally:
+                self.work_queue.task_done()
+            wait_interval = fp_obj.next_wait_interval(is_refreshed)
+            if wait_interval is None:
+                fp_obj.is_running = False
+            else:
+                self.feed_scheduler.schedule(fp_obj, wait_interval)
+                self._wakeup.set()
+
+    async def _cancel_tasks(self) -> None:
+        """
+        Cancels the dispatcher, the workers and the pool evictor, waits for them to finish and closes the pooled
+        async clients
+        """
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+        await CONNECTION_POOL.async_close_all()  # async clients are bound to this event loop!
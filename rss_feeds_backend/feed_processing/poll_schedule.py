@@ -0,0 +1,128 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of PollSchedule class
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import typing
+from datetime import datetime
+
+import structlog
+
+LOGGER = structlog.get_logger()
+INITIAL_POLL_INTERVAL = 300.0  # 5 minutes
+MIN_POLL_INTERVAL = 60.0  # 1 minute
+MAX_POLL_INTERVAL = 21600.0  # 6 hours
+SLOWDOWN_FACTOR = 1.5  # interval growth when a refresh brings no new post
+SPEEDUP_FACTOR = 2.0  # interval shrink when a refresh brings new posts
+PUBLISH_GAP_RATIO = 0.5  # poll twice per average gap between publications
+ACTIVITY_WINDOW = 10  # number of most recent publications used to estimate the activity
+SECONDS_IN_MINUTE = 60
+
+
+class PollSchedule:
+    """Decides when a feed is polled next according to its declared ttl, its recent activity and bounds"""
+
+    def __init__(
+            self,
+            min_interval: float = MIN_POLL_INTERVAL,
+            max_interval: float = MAX_POLL_INTERVAL,
+            initial_interval: float = INITIAL_POLL_INTERVAL,
+    ) -> None:
+        """
+        Initializes the PollSchedule object
+
+        Args:
+            min_interval: lower bound of the poll interval in seconds
+            max_interval: upper bound of the poll interval in seconds
+            initial_interval: poll interval in seconds until the feed activity is known
+        """
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.ttl_interval: float = 0.0  # seconds, declared by the feed via <ttl>
+        self.publish_gap: typing.Optional[float] = None  # seconds, average gap between recent publications
+        self.interval: float = self._clamp(initial_interval)
+
+    def record_refresh(
+            self,
+            new_post_count: int,
+            ttl: typing.Optional[int] = None,
+            publication_dates: typing.Sequence[datetime] = (),
+    ) -> float:
+        """
+        Updates the poll interval with the outcome of a successful refresh
+
+        Args:
+            new_post_count: number of posts which were not stored before
+            ttl: the <ttl> of the feed in minutes, negative or None if not declared
+            publication_dates: publication dates of the posts in the feed content
+
+        Returns:
+            the next poll interval in seconds
+        """
+        if ttl is not None:
+            self.ttl_interval = float(ttl * SECONDS_IN_MINUTE) if ttl > 0 else 0.0
+        publish_gap = self._estimate_publish_gap(publication_dates)
+        if publish_gap is not None:
+            self.publish_gap = publish_gap
+        if new_post_count:
+            interval = self.interval / SPEEDUP_FACTOR
+            if self.publish_gap is not None:
+                interval = min(interval, self.publish_gap * PUBLISH_GAP_RATIO)
+        else:
+            interval = self.interval * SLOWDOWN_FACTOR
+            if self.publish_gap is not None:
+                interval = min(interval, self.publish_gap)  # do not lag behind the usual publication pace
+        self.interval = self._clamp(max(interval, self.ttl_interval))
+        LOGGER.debug(
+            f"Next poll in {self.interval:.0f}s (new posts: {new_post_count}, ttl: {self.ttl_interval:.0f}s, "
+            f"publish gap: {self.publish_gap})",
+        )
+        return self.interval
+
+    def next_interval(self) -> float:
+        """
+        Returns the seconds to wait until the next poll of the feed
+
+        Returns:
+            the poll interval in seconds
+        """
+        return self.interval
+
+    def _clamp(self, interval: float) -> float:
+        """
+        Keeps the interval within the configured bounds
+
+        Args:
+            interval: candidate interval in seconds
+
+        Returns:
+            the interval bounded by min_interval and max_interval
+        """
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    @classmethod
+    def _estimate_publish_gap(cls, publication_dates: typing.Sequence[datetime]) -> typing.Optional[float]:
+        """
+        Calculates the average gap between the most recent publications of the feed
+
+        Args:
+            publication_dates: publication dates of the posts in the feed content
+
+        Returns:
+            average gap in seconds, None if there are not enough publications
+        """
+        timestamps = sorted((date.timestamp() for date in publication_dates), reverse=True)[:ACTIVITY_WINDOW]
+        if len(timestamps) < 2:
+            return None
+        return max((timestamps[0] - timestamps[-1]) / (len(timestamps) - 1), 0.0)
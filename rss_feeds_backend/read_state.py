@@ -0,0 +1,176 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of ReadStateIndex class
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import asyncio
+import collections
+import os
+import typing
+
+import structlog
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from rss_feeds_backend.common.logging_profile import Lazy
+from rss_feeds_backend.common.read_bitmap import ReadBitmap
+from rss_feeds_backend.database import (
+    async_bump_read_version_in_db,
+    async_fetch_read_post_ids_from_db,
+    async_fetch_read_version_from_db,
+)
+
+LOGGER = structlog.get_logger()
+MAX_CACHED_USERS = int(os.getenv("RSS_FEEDS_READ_STATE_USERS", "10000"))  # least recently used users are evicted
+
+
+class ReadStateIndex:
+    """
+    In-memory index of the posts read by each user, kept as compressed bitmaps of post ids.
+    The bitmap of a user is loaded from UserPost on first use; UserPost stays the persistent source of truth.
+    Every change of the read posts increases the read version of the user in the same transaction, and a bitmap is
+    only used while its version matches the DB, so the changes committed by the other processes are never missed.
+    The changes of this process are applied to the bitmap after the commit. Lives on the event loop of the API.
+    """
+
+    def __init__(self, max_users: int = MAX_CACHED_USERS) -> None:
+        """
+        Initializes the ReadStateIndex object
+
+        Args:
+            max_users: maximum number of users whose bitmaps are kept in memory
+        """
+        self.max_users: int = max_users
+        self.bitmaps: typing.OrderedDict[int, ReadBitmap] = collections.OrderedDict()
+        self.versions: typing.Dict[int, int] = {}  # read version of the DB each bitmap is up to date with
+        self._load_locks: typing.Dict[int, asyncio.Lock] = {}
+        self.load_count: int = 0  # bitmaps loaded from the DB
+        self.eviction_count: int = 0  # bitmaps dropped to stay within max_users
+        self.reload_count: int = 0  # bitmaps loaded again after the read posts changed in another process
+
+    async def get_bitmap(self, session: AsyncSession, user_id: int) -> ReadBitmap:
+        """
+        Returns the read posts of the user as of the current read version in the DB. The bitmap is loaded on first
+        use and loaded again if another process changed the read posts since.
+
+        Args:
+            session: async session for DB connection
+            user_id: primary key of the user
+
+        Returns:
+            bitmap of the read post ids
+        """
+        version = await async_fetch_read_version_from_db(session, user_id)
+        bitmap = self.bitmaps.get(user_id)
+        if bitmap is None or self.versions[user_id] != version:
+            lock = self._load_locks.setdefault(user_id, asyncio.Lock())
+            async with lock:  # concurrent requests of the same user load the bitmap only once
+                bitmap = self.bitmaps.get(user_id)
+                if bitmap is None or self.versions[user_id] != version:
+                    self.reload_count += bitmap is not None
+                    # the version is read before the posts, a change in between only causes another load
+                    bitmap = ReadBitmap(await async_fetch_read_post_ids_from_db(session, user_id))
+                    self._store(user_id, version, bitmap)
+            self._load_locks.pop(user_id, None)
+        self.bitmaps.move_to_end(user_id)
+        return bitmap
+
+    async def commit_changes(
+            self,
+            session: AsyncSession,
+            user_id: int,
+            read_ids: typing.Iterable[int] = (),
+            unread_ids: typing.Iterable[int] = (),
+    ) -> None:
+        """
+        Increases the read version of the user, commits the changes of the read posts made within the session and
+        applies them to the bitmap of the user if it is loaded
+
+        Args:
+            session: async session for DB connection, holding the uncommitted changes of the read posts
+            user_id: primary key of the user
+            read_ids: primary keys of the posts marked as read
+            unread_ids: primary keys of the posts marked as unread
+        """
+        version = await async_bump_read_version_in_db(session, user_id)
+        await session.commit()
+        bitmap = self.bitmaps.get(user_id)
+        if bitmap is None:
+            return
+        if self.versions[user_id] != version - 1:  # missed another change, the bitmap is loaded again on next use
+            self._drop(user_id)
+            return
+        bitmap.update(read_ids)
+        for post_id in unread_ids:
+            bitmap.discard(post_id)
+        self.versions[user_id] = version
+
+    def stats(self) -> typing.Dict[str, int]:
+        """
+        Returns the memory footprint of the index
+
+        Returns:
+            dictionary of the loaded users, read posts, containers and bytes
+        """
+        stats = {
+            "users": len(self.bitmaps),
+            "read_posts": 0,
+            "array_containers": 0,
+            "bitmap_containers": 0,
+            "bytes": 0,
+            "loads": self.load_count,
+            "evictions": self.eviction_count,
+            "reloads": self.reload_count,
+        }
+        for bitmap in self.bitmaps.values():
+            stats["read_posts"] += len(bitmap)
+            stats["bytes"] += bitmap.nbytes()
+            for container_type, count in bitmap.container_counts().items():
+                stats[f"{container_type}_containers"] += count
+        return stats
+
+    def _store(self, user_id: int, version: int, bitmap: ReadBitmap) -> None:
+        """
+        Keeps the loaded bitmap, evicts the least recently used ones beyond max_users
+
+        Args:
+            user_id: primary key of the user
+            version: read version of the DB the bitmap is loaded at
+            bitmap: bitmap of the read post ids
+        """
+        self.bitmaps[user_id] = bitmap
+        self.versions[user_id] = version
+        self.bitmaps.move_to_end(user_id)
+        self.load_count += 1
+        LOGGER.debug(
+            "Read state is loaded",
+            user_id=user_id,
+            read_posts=len(bitmap),
+            bytes=Lazy(bitmap.nbytes),  # walks all the containers, only computed if the event is written
+        )
+        while len(self.bitmaps) > self.max_users:
+            self._drop(next(iter(self.bitmaps)))
+            self.eviction_count += 1
+
+    def _drop(self, user_id: int) -> None:
+        """
+        Forgets the bitmap of the user
+
+        Args:
+            user_id: primary key of the user
+        """
+        self.bitmaps.pop(user_id, None)
+        self.versions.pop(user_id, None)
+
+
+READ_STATE_INDEX = ReadStateIndex()  # shared by all the requests of the process!
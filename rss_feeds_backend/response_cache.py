@@ -0,0 +1,152 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of ResponseCache class
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import collections
+import hashlib
+import os
+import threading
+import typing
+
+import orjson
+import structlog
+from fastapi.encoders import jsonable_encoder
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
+
+LOGGER = structlog.get_logger()
+MAX_ENTRIES = int(os.getenv("RSS_FEEDS_RESPONSE_CACHE_SIZE", "1024"))  # least recently used responses are evicted
+FEEDS_SCOPE = "feeds"  # bumped when the ingestion stores feed details
+POSTS_SCOPE = "posts"  # bumped when the ingestion stores new posts
+JSON_MEDIA_TYPE = "application/json"
+ResponseBuilder = typing.Callable[[], typing.Awaitable[typing.Tuple[typing.Any, typing.Dict[str, str]]]]
+
+
+class CacheEntry(typing.NamedTuple):
+    """Serialized response together with the data versions it is built from"""
+    versions: typing.Tuple[int, ...]
+    body: bytes
+    etag: str
+    headers: typing.Dict[str, str]
+
+
+def user_scope(user_id: int) -> str:
+    """
+    Returns the version scope of the data changed by the actions of a user
+
+    Args:
+        user_id: primary key of the user
+
+    Returns:
+        name of the scope
+    """
+    return f"user:{user_id}"
+
+
+class ResponseCache:
+    """
+    LRU cache of serialized list responses keyed by endpoint, user and query parameters.
+    Every entry remembers the versions of the data scopes it depends on; bumping a scope on a commit invalidates
+    all the entries built from the older data. The ETag of an entry lets polling clients revalidate with a 304.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES) -> None:
+        """
+        Initializes the ResponseCache object
+
+        Args:
+            max_entries: maximum number of responses kept in the cache
+        """
+        self.max_entries: int = max_entries
+        self.entries: typing.OrderedDict[typing.Tuple[typing.Any, ...], CacheEntry] = collections.OrderedDict()
+        self.versions: typing.Dict[str, int] = {}
+        self._lock = threading.Lock()  # the scopes are bumped by the ingestion thread as well
+
+    def bump(self, *scopes: str) -> None:
+        """
+        Marks the data of the scopes as changed, the responses depending on them are rebuilt on the next request
+
+        Args:
+            scopes: names of the changed scopes
+        """
+        with self._lock:
+            for scope in scopes:
+                self.versions[scope] = self.versions.get(scope, 0) + 1
+
+    async def respond(
+            self,
+            request: Request,
+            scopes: typing.Sequence[str],
+            build: ResponseBuilder,
+            user_id: typing.Optional[int] = None,
+    ) -> Response:
+        """
+        Serves the response from the cache if none of its scopes changed, builds and caches it otherwise.
+        Replies 304 if the client already has the response.
+
+        Args:
+            request: the incoming request
+            scopes: names of the data scopes the response depends on
+            build: coroutine function returning the content and the headers of the response
+            user_id: primary key of the user if the response is specific to the user, None if it is shared
+
+        Returns:
+            the response to send
+        """
+        key = (request.url.path, user_id, tuple(sorted(request.query_params.multi_items())))
+        versions = self._current_versions(scopes)  # taken before building, a concurrent bump is not lost
+        entry = self.entries.get(key)
+        if entry is None or entry.versions != versions:
+            content, headers = await build()
+            body = orjson.dumps(jsonable_encoder(content))
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            entry = CacheEntry(versions=versions, body=body, etag=etag, headers=headers)
+            self._store(key, entry)
+        else:
+            self.entries.move_to_end(key)
+        headers = {**entry.headers, "ETag": entry.etag}
+        if request.headers.get("if-none-match") == entry.etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=entry.body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+    def _current_versions(self, scopes: typing.Sequence[str]) -> typing.Tuple[int, ...]:
+        """
+        Returns the current versions of the scopes
+
+        Args:
+            scopes: names of the data scopes
+
+        Returns:
+            tuple of the versions in the order of the scopes
+        """
+        with self._lock:
+            return tuple(self.versions.get(scope, 0) for scope in scopes)
+
+    def _store(self, key: typing.Tuple[typing.Any, ...], entry: CacheEntry) -> None:
+        """
+        Keeps the entry, evicts the least recently used ones beyond max_entries
+
+        Args:
+            key: endpoint, user and query parameters of the response
+            entry: the serialized response
+        """
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+RESPONSE_CACHE = ResponseCache()  # shared by all the requests of the process!
@@ -19,11 +19,14 @@ import typing
 import structlog
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette import status
 
-from rss_feeds_backend.database import get_session
+from rss_feeds_backend.common.access_token import TOKEN_SIGNER
+from rss_feeds_backend.database import get_async_session
 from rss_feeds_backend.db_models.user import User, UserOutput
+from rss_feeds_backend.exceptions import InvalidTokenError
 
 LOGGER = structlog.get_logger()
 URL_PREFIX = "/auth"
@@ -31,26 +34,20 @@ router = APIRouter(prefix=URL_PREFIX)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{URL_PREFIX}/token")
 
 
-def get_current_user(
-        token: str = Depends(oauth2_scheme),
-        session: Session = Depends(get_session)) -> UserOutput:
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> typing.Dict[str, typing.Any]:
     """
-    Returns the currently logged in user details
+    Verifies the bearer token without a DB query
 
     Args:
-        token: oauth token provided when a user logs in
-        session: a unique session for a logged in user
+        token: signed access token provided when a user logs in
 
     Returns:
-        user details containing the username and id (primary key in the DB Table)
+        claims of the token, including the user id and name
     """
-    query = select(User).where(User.username == token)
-    user = session.exec(query).first()
-    if user:
-        LOGGER.info("The logged in user information is returned!")
-        return UserOutput.from_orm(user)
-    else:
-        LOGGER.error(f"User '{token}' is not logged in!")
+    try:
+        return TOKEN_SIGNER.verify(token)
+    except InvalidTokenError as exc:
+        LOGGER.error(f"Access token is rejected! {exc}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User is not logged in",
@@ -58,10 +55,24 @@ def get_current_user(
         )
 
 
+async def get_current_user(claims: typing.Dict[str, typing.Any] = Depends(get_token_claims)) -> UserOutput:
+    """
+    Returns the currently logged in user details
+
+    Args:
+        claims: claims of the verified access token
+
+    Returns:
+        user details containing the username and id (primary key in the DB Table)
+    """
+    LOGGER.debug("The logged in user information is returned!", user_id=claims["uid"])
+    return UserOutput(id=claims["uid"], username=claims["sub"])
+
+
 @router.post("/token")
 async def login(
         form_data: OAuth2PasswordRequestForm = Depends(),
-        session: Session = Depends(get_session)) -> typing.Dict[str, typing.Any]:
+        session: AsyncSession = Depends(get_async_session)) -> typing.Dict[str, typing.Any]:
     """
     Endpoint to implement login functionality
 
@@ -70,11 +81,34 @@ async def login(
         session: a unique session info
 
     Returns:
-        the dictionary containing username and token type if user password is verified, exception otherwise
+        the dictionary containing the signed access token, its type and lifetime if user password is verified,
+        exception otherwise
     """
     query = select(User).where(User.username == form_data.username)
-    user = session.exec(query).first()
-    if user and user.verify_password(form_data.password):
-        return {"access_token": user.username, "token_type": "bearer"}
+    user = (await session.exec(query)).first()
+    if user and await user.async_verify_password(form_data.password):
+        return {
+            "access_token": TOKEN_SIGNER.issue(user.id, user.username),
+            "token_type": "bearer",
+            "expires_in": TOKEN_SIGNER.ttl,
+        }
     else:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect username or password")
+
+
+@router.post("/logout")
+async def logout(claims: typing.Dict[str, typing.Any] = Depends(get_token_claims)) -> typing.Dict[str, str]:
+    """
+    Revokes the access token of the request, it is denied until it expires
+
+    Args:
+        claims: claims of the verified access token
+
+    Returns:
+        operation result with some detail message
+    """
+    TOKEN_SIGNER.revoke(claims)
+    return {
+        "result": "successful",
+        "message": f"User '{claims['sub']}' is logged out.",
+    }
@@ -17,18 +17,41 @@ Implementation of Feed related endpoints
 import typing
 
 import structlog
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette import status
 
 from rss_feeds_backend.common.enums import FeedType
 from rss_feeds_backend.common.registry import container
-from rss_feeds_backend.database import fetch_feed_from_db, get_session, fetch_all_feeds_from_db
+from rss_feeds_backend.common.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+)
+from rss_feeds_backend.common.streaming import ndjson_response, wants_ndjson
+from rss_feeds_backend.database import (
+    async_fetch_feed_from_db,
+    async_fetch_feeds_page_from_db,
+    async_fetch_post_ids_of_feed_from_db,
+    async_fetch_unread_counts_from_db,
+    async_follow_feed_in_db,
+    async_mark_posts_read_in_db,
+    async_rebuild_unread_counters,
+    async_stream_rows_from_db,
+    build_feeds_page_query,
+    get_async_session,
+)
 from rss_feeds_backend.db_models.feed import Feed
 from rss_feeds_backend.db_models.user import User, ADMIN_NAME
 from rss_feeds_backend.db_models.user_feed import UserFeed
 from rss_feeds_backend.feed_processing.base.feed_processor import FeedProcessor
+from rss_feeds_backend.feed_processing.feed_collectors.connection_pool import CONNECTION_POOL
 from rss_feeds_backend.feed_processing.feed_manager import FeedManager
+from rss_feeds_backend.read_state import READ_STATE_INDEX
+from rss_feeds_backend.response_cache import FEEDS_SCOPE, RESPONSE_CACHE, user_scope
 from rss_feeds_backend.routers.authentication import get_current_user
 
 LOGGER = structlog.get_logger()
@@ -39,7 +62,7 @@ router = APIRouter(prefix="/feed")
 async def define_feed(
         feed_link: str,
         feed_type: FeedType,
-        session: Session = Depends(get_session),
+        session: AsyncSession = Depends(get_async_session),
         user: User = Depends(get_current_user)) -> typing.Dict[str, str]:
     """
     Defines a new feed to the system. This privilege is only provided to admin!
@@ -60,9 +83,9 @@ async def define_feed(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=error_message,
         )
-    existing_feed = fetch_feed_from_db(link=feed_link, session=session)
+    existing_feed = await async_fetch_feed_from_db(link=feed_link, session=session)
     if existing_feed:
-        LOGGER.warning(f"A Feed with the link '{feed_link}' is already defined!")
+        LOGGER.warning("A Feed with the link is already defined!", link=feed_link)
         raise HTTPException(
             status_code=status.HTTP_412_PRECONDITION_FAILED,
             detail={
@@ -83,26 +106,48 @@ async def define_feed(
 
 @router.get("/list")
 async def list_feeds(
-        session: Session = Depends(get_session),
+        request: Request,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: typing.Optional[str] = None,
+        stream: bool = False,
+        session: AsyncSession = Depends(get_async_session),
         user: User = Depends(get_current_user),
 ) -> typing.List[Feed]:
     """
-    Fetches all the defined Feeds from DB
+    Fetches a page of the defined Feeds from DB in the order of their definition.
+    If there are more feeds, the cursor of the next page is returned in the X-Next-Cursor header.
+    The page is served from the response cache until the ingestion stores feeds, 304 if the ETag matches.
+    In streaming mode all the feeds after the cursor are written as NDJSON while they are fetched, ignoring the limit.
 
     Args:
+         request: the incoming request, its path and query parameters key the cached response
+         limit: maximum number of feeds in the page
+         cursor: cursor of the page to fetch, None for the first page
+         stream: flag to stream the feeds as NDJSON, same as the 'Accept: application/x-ndjson' header
          session: a unique session for DB connection
          user: logged in user details
 
     Returns:
-        all defined feeds from DB
+        a page of defined feeds from DB
     """
-    return fetch_all_feeds_from_db(session)
+    after_id = decode_cursor(cursor, int)[0] if cursor else None
+    if wants_ndjson(request, stream):
+        return ndjson_response(async_stream_rows_from_db(session, build_feeds_page_query(after_id=after_id), Feed))
+
+    async def build_page() -> typing.Tuple[typing.List[Feed], typing.Dict[str, str]]:
+        feeds = await async_fetch_feeds_page_from_db(session, limit + 1, after_id)  # one more to detect the next page
+        if len(feeds) > limit:
+            feeds = feeds[:limit]
+            return feeds, {NEXT_CURSOR_HEADER: encode_cursor(feeds[-1].id)}
+        return feeds, {}
+
+    return await RESPONSE_CACHE.respond(request, (FEEDS_SCOPE,), build_page)
 
 
 @router.post("/refresh")
 async def force_refresh(
         feed_link: str,
-        session: Session = Depends(get_session),
+        session: AsyncSession = Depends(get_async_session),
         user: User = Depends(get_current_user),
 ) -> typing.Dict[str, str]:
     """
@@ -117,19 +162,16 @@ async def force_refresh(
     Returns:
         operation result with some detail message
     """
-    feed_processor: typing.Optional[FeedProcessor] = None
-    for fp_obj in container.resolve(FeedManager).feed_processor_list:
-        if fp_obj.address == feed_link:
-            feed_processor = fp_obj
-            break
+    feed_manager: FeedManager = container.resolve(FeedManager)
+    feed_processor: typing.Optional[FeedProcessor] = feed_manager.get_feed_processor(feed_link)
     if not feed_processor:
         message = f"There is no background process defined for feed with link: '{feed_link}'"
     elif feed_processor.is_alive():
         message = f"The background process for '{feed_link}' is running. So, no force refresh action can be taken!"
-    elif not feed_processor.force_refresh_feed():
+    elif not await feed_manager.force_refresh_feed_processor(feed_processor):
         message = f"Force refresh is not successful! The background process for '{feed_link}' will not be started!"
     else:
-        feed_processor.start()
+        feed_manager.start_feed_processor(feed_processor)
         message = f"Force refresh is successful. The background process for '{feed_link}' is started again."
         LOGGER.info(message)
         return {
@@ -146,37 +188,129 @@ async def force_refresh(
     )
 
 
+@router.get("/connection_stats")
+async def connection_stats(
+        user: User = Depends(get_current_user),
+) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    """
+    Returns the usage statistics of the keep-alive sessions shared per feed host
+
+    Args:
+         user: logged in user details
+
+    Returns:
+        dictionary of acquired/reused/created/evicted/in_use counts per host
+    """
+    return CONNECTION_POOL.stats()
+
+
+@router.get("/refresh_stats")
+async def refresh_stats(
+        user: User = Depends(get_current_user),
+) -> typing.Dict[str, typing.Dict[str, int]]:
+    """
+    Returns how many refreshes are performed and how many of them skipped extraction and DB update
+
+    Args:
+         user: logged in user details
+
+    Returns:
+        dictionary of refresh counters per feed link and their totals
+    """
+    return container.resolve(FeedManager).refresh_stats()
+
+
+@router.get("/writer_stats")
+async def writer_stats(
+        user: User = Depends(get_current_user),
+) -> typing.Dict[str, typing.Any]:
+    """
+    Returns the queue depth and the commit latencies of the write-behind DB writer
+
+    Args:
+         user: logged in user details
+
+    Returns:
+        dictionary of the writer statistics
+    """
+    return container.resolve(FeedManager).feed_writer.stats()
+
 
 @router.get("/followed_list")
 async def list_followed_feeds(
-        session: Session = Depends(get_session),
+        request: Request,
+        session: AsyncSession = Depends(get_async_session),
         user: User = Depends(get_current_user),
 ) -> typing.List[Feed]:
     """
-    Fetches all the followed Feeds by the user from DB
+    Fetches all the followed Feeds by the user from DB.
+    The list is served from the response cache until the ingestion stores feeds or the user follows or unfollows one.
 
     Args:
+         request: the incoming request, its path and query parameters key the cached response
          session: a unique session for DB connection
          user: logged in user details
 
     Returns:
         all followed feeds from DB
     """
-    followed_feeds: typing.List[Feed] = []
-    query = select(UserFeed).where(UserFeed.user_id == user.id)
-    user_feed_list = session.exec(query).all()
-    for user_feed in user_feed_list:
-        query = select(Feed).where(Feed.id == user_feed.feed_id)
-        feed = session.exec(query).first()
-        if feed:
-            followed_feeds.append(feed)
-    return followed_feeds
+    async def build_list() -> typing.Tuple[typing.List[Feed], typing.Dict[str, str]]:
+        query = select(Feed).join(UserFeed, UserFeed.feed_id == Feed.id).where(UserFeed.user_id == user.id)
+        return (await session.exec(query.order_by(UserFeed.id))).all(), {}
+
+    return await RESPONSE_CACHE.respond(request, (FEEDS_SCOPE, user_scope(user.id)), build_list, user_id=user.id)
+
+
+@router.get("/unread_counts")
+async def unread_counts(
+        session: AsyncSession = Depends(get_async_session),
+        user: User = Depends(get_current_user),
+) -> typing.Dict[str, int]:
+    """
+    Returns the number of unread posts per followed feed from the maintained counters
+
+    Args:
+         session: a unique session for DB connection
+         user: logged in user details
+
+    Returns:
+        dictionary of unread post counts per followed feed link
+    """
+    return await async_fetch_unread_counts_from_db(session, user.id)
+
+
+@router.post("/rebuild_unread_counts")
+async def rebuild_unread_counts(
+        fix: bool = True,
+        session: AsyncSession = Depends(get_async_session),
+        user: User = Depends(get_current_user),
+) -> typing.Dict[str, int]:
+    """
+    Checks the unread counters of all the users against the actual counts and repairs the drifted ones.
+    This privilege is only provided to admin!
+
+    Args:
+        fix: flag to repair the drifted counters, only checks the consistency if False
+        session: a unique session for DB connection
+        user: logged in user details
+
+    Returns:
+        number of checked, drifted and fixed counters
+    """
+    if user.username != ADMIN_NAME:
+        error_message = f"Only {ADMIN_NAME} can rebuild the unread counters!"
+        LOGGER.error(error_message)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=error_message,
+        )
+    return await async_rebuild_unread_counters(session, fix=fix)
 
 
 @router.post("/follow")
 async def follow_feed(
         feed_link: str,
-        session: Session = Depends(get_session),
+        session: AsyncSession = Depends(get_async_session),
         user: User = Depends(get_current_user)) -> typing.Dict[str, str]:
     """
     Enables the user to follow the feed having the provided link
@@ -189,9 +323,9 @@ async def follow_feed(
     Returns:
         operation result with some detail message
     """
-    feed = _get_feed(feed_link, session)
+    feed = await _get_feed(feed_link, session)
     query = select(UserFeed).where(UserFeed.user_id == user.id)
-    user_feed_list = session.exec(query).all()
+    user_feed_list = (await session.exec(query)).all()
     for user_feed in user_feed_list:
         if user_feed.feed_id == feed.id:
             error_message = f"The feed with link '{feed_link}' is already followed by the user '{user.username}'!"
@@ -200,8 +334,9 @@ async def follow_feed(
                 status_code=status.HTTP_412_PRECONDITION_FAILED,
                 detail=error_message,
             )
-    session.add(UserFeed(user_id=user.id, feed_id=feed.id))
-    session.commit()
+    await async_follow_feed_in_db(session, user.id, feed.id)
+    await session.commit()
+    RESPONSE_CACHE.bump(user_scope(user.id))
     result_message = f"Feed with link '{feed_link}' is now followed by the user '{user.username}'."
     return {
         "result": "successful",
@@ -212,7 +347,7 @@ async def follow_feed(
 @router.post("/unfollow")
 async def unfollow_feed(
         feed_link: str,
-        session: Session = Depends(get_session),
+        session: AsyncSession = Depends(get_async_session),
         user: User = Depends(get_current_user)) -> typing.Dict[str, str]:
     """
     Enables the user to unfollow the feed having the provided link
@@ -225,9 +360,9 @@ async def unfollow_feed(
     Returns:
         operation result with some detail message
     """
-    feed = _get_feed(feed_link, session)
+    feed = await _get_feed(feed_link, session)
     query = select(UserFeed).where(UserFeed.user_id == user.id, UserFeed.feed_id == feed.id)
-    user_feed = session.exec(query).first()
+    user_feed = (await session.exec(query)).first()
     if not user_feed:
         error_message = f"The feed with link '{feed_link}' is not followed by the user '{user.username}'!"
         LOGGER.error(error_message)
@@ -235,8 +370,9 @@ async def unfollow_feed(
             status_code=status.HTTP_412_PRECONDITION_FAILED,
             detail=error_message,
         )
-    session.delete(user_feed)
-    session.commit()
+    await session.delete(user_feed)
+    await session.commit()
+    RESPONSE_CACHE.bump(user_scope(user.id))
     result_message = f"Feed with link '{feed_link}' is unfollowed by the user '{user.username}'."
     return {
         "result": "successful",
@@ -244,7 +380,38 @@ async def unfollow_feed(
     }
 
 
-def _get_feed(feed_link: str, session: Session) -> Feed:
+@router.post("/mark_read")
+async def mark_feed_read(
+        feed_link: str,
+        session: AsyncSession = Depends(get_async_session),
+        user: User = Depends(get_current_user)) -> typing.Dict[str, str]:
+    """
+    Marks all the posts of the feed having the provided link as read for the logged in user.
+    The unread posts are the difference of the posts of the feed and the read state bitmap, only they are inserted.
+
+    Args:
+        feed_link: feed link as identifier to mark read
+        session: a unique session for DB connection
+        user: logged in user details
+
+    Returns:
+        operation result with some detail message
+    """
+    feed = await _get_feed(feed_link, session)
+    read_posts = await READ_STATE_INDEX.get_bitmap(session, user.id)
+    unread_post_ids = read_posts.difference(await async_fetch_post_ids_of_feed_from_db(session, feed.id))
+    marked_count = await async_mark_posts_read_in_db(session, user.id, feed.id, unread_post_ids)
+    if marked_count:
+        await READ_STATE_INDEX.commit_changes(session, user.id, read_ids=unread_post_ids)
+        RESPONSE_CACHE.bump(user_scope(user.id))
+    result_message = f"{marked_count} posts of the feed '{feed_link}' are marked as READ for '{user.username}'."
+    return {
+        "result": "successful",
+        "message": result_message,
+    }
+
+
+async def _get_feed(feed_link: str, session: AsyncSession) -> Feed:
     """
     Fetches the feed object from DB or throws exception in case there is no feed matching in DB
 
@@ -255,7 +422,7 @@ def _get_feed(feed_link: str, session: Session) -> Feed:
     Returns:
         Feed object from the DB
     """
-    feed = fetch_feed_from_db(feed_link, session)
+    feed = await async_fetch_feed_from_db(feed_link, session)
     if not feed:
         error_message = f"There is no Feed defined with the link '{feed_link}'"
         LOGGER.error(error_message)
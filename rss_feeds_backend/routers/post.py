@@ -15,78 +15,195 @@ Implementation of Post related endpoints
 # -----------------------------------------------------------------------------#
 """
 import typing
+from datetime import datetime
 
 import structlog
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette import status
 
-from rss_feeds_backend.database import get_session, fetch_all_posts_from_db, fetch_post_from_db
-from rss_feeds_backend.db_models.feed import Feed
+from rss_feeds_backend.common.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    decode_cursor,
+    encode_cursor,
+)
+from rss_feeds_backend.common.streaming import ndjson_response, wants_ndjson
+from rss_feeds_backend.database import (
+    get_async_session,
+    async_fetch_filtered_posts_from_db,
+    async_fetch_post_from_db,
+    async_fetch_posts_page_from_db,
+    async_mark_post_read_in_db,
+    async_mark_post_unread_in_db,
+    async_search_posts_from_db,
+    async_stream_rows_from_db,
+    build_filtered_posts_query,
+    build_posts_page_query,
+)
 from rss_feeds_backend.db_models.post import Post
 from rss_feeds_backend.db_models.user import User
-from rss_feeds_backend.db_models.user_feed import UserFeed
-from rss_feeds_backend.db_models.user_post import UserPost
+from rss_feeds_backend.read_state import READ_STATE_INDEX
+from rss_feeds_backend.response_cache import POSTS_SCOPE, RESPONSE_CACHE, user_scope
 from rss_feeds_backend.routers.authentication import get_current_user
 
 LOGGER = structlog.get_logger()
+READ_ID_LIST_LIMIT = 500  # read posts pushed into the query as an id list at most, larger read sets use EXISTS
 router = APIRouter(prefix="/post")
 
 
 @router.get("/list")
 async def list_posts(
-        session: Session = Depends(get_session),
+        request: Request,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: typing.Optional[str] = None,
+        stream: bool = False,
+        session: AsyncSession = Depends(get_async_session),
         user: User = Depends(get_current_user),
 ) -> typing.List[Post]:
     """
-    Fetches all the Posts from DB
+    Fetches a page of Posts from DB, the most recent first.
+    If there are more posts, the cursor of the next page is returned in the X-Next-Cursor header.
+    The page is served from the response cache until the ingestion stores new posts, 304 if the ETag matches.
+    In streaming mode all the posts after the cursor are written as NDJSON while they are fetched, ignoring the limit.
 
     Args:
+         request: the incoming request, its path and query parameters key the cached response
+         limit: maximum number of posts in the page
+         cursor: cursor of the page to fetch, None for the first page
+         stream: flag to stream the posts as NDJSON, same as the 'Accept: application/x-ndjson' header
          session: a unique session for DB connection
          user: logged in user details
 
     Returns:
-        all defined feeds from DB
+        a page of posts from DB
     """
-    return fetch_all_posts_from_db(session)
+    after = decode_cursor(cursor, datetime.fromisoformat, int) if cursor else None
+    if wants_ndjson(request, stream):
+        return ndjson_response(async_stream_rows_from_db(session, build_posts_page_query(after=after), Post))
+
+    async def build_page() -> typing.Tuple[typing.List[Post], typing.Dict[str, str]]:
+        posts = await async_fetch_posts_page_from_db(session, limit + 1, after)  # one more to detect the next page
+        if len(posts) > limit:
+            posts = posts[:limit]
+            return posts, {NEXT_CURSOR_HEADER: encode_cursor(posts[-1].publication_date, posts[-1].id)}
+        return posts, {}
+
+    return await RESPONSE_CACHE.respond(request, (POSTS_SCOPE,), build_page)
 
 
 @router.get("/list_filtered")
 async def list_filtered_posts(
+        request: Request,
         filter_read: typing.Optional[bool] = None,
         filter_feed_link: typing.Optional[str] = None,
         filter_followed: typing.Optional[bool] = None,
-        session: Session = Depends(get_session),
+        stream: bool = False,
+        session: AsyncSession = Depends(get_async_session),
         user: User = Depends(get_current_user),
 ) -> typing.List[Post]:
     """
     Fetches all the Posts from DB
 
     Args:
+        request: the incoming request
         filter_read: flag to filter out posts according to their read status
         filter_feed_link: to filter out posts for certain Feeds
         filter_followed: flag to filter out posts if the feed is followed by the user
+        stream: flag to stream the posts as NDJSON, same as the 'Accept: application/x-ndjson' header
         session: a unique session for DB connection
         user: logged in user details
 
     Returns:
         all defined feeds from DB
     """
-    posts = fetch_all_posts_from_db(session)
-    if filter_read is not None:
-        posts = _apply_read_unread_filter(posts, filter_read, session, user)
-    if filter_feed_link is not None:
-        posts = _apply_feed_filter(posts, filter_feed_link, session)
-    if filter_followed is not None:
-        posts = _apply_followed_filter(posts, filter_followed, session, user)
-    return posts
+    read = filter_read
+    post_ids: typing.Optional[typing.List[int]] = None
+    if filter_read:  # a short read list is pushed into the query as ids, the unread posts are filtered via SQL
+        # the bitmap is up to date with the read version in the DB, so it can replace the EXISTS subquery
+        read_posts = await READ_STATE_INDEX.get_bitmap(session, user.id)
+        if len(read_posts) <= READ_ID_LIST_LIMIT:
+            read, post_ids = None, list(read_posts)
+    if wants_ndjson(request, stream):
+        query = build_filtered_posts_query(
+            user.id,
+            read=read,
+            feed_link=filter_feed_link,
+            followed=filter_followed,
+            post_ids=post_ids,
+        )
+        return ndjson_response(async_stream_rows_from_db(session, query.order_by(Post.id), Post))
+    return await async_fetch_filtered_posts_from_db(
+        session,
+        user.id,
+        read=read,
+        feed_link=filter_feed_link,
+        followed=filter_followed,
+        post_ids=post_ids,
+    )
+
+
+@router.get("/search")
+async def search_posts(
+        response: Response,
+        search_text: str = Query(..., min_length=1),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: typing.Optional[str] = None,
+        filter_read: typing.Optional[bool] = None,
+        filter_feed_link: typing.Optional[str] = None,
+        filter_followed: typing.Optional[bool] = None,
+        session: AsyncSession = Depends(get_async_session),
+        user: User = Depends(get_current_user),
+) -> typing.List[Post]:
+    """
+    Searches the titles and the descriptions of the Posts, the best match first.
+    If there are more matches, the cursor of the next page is returned in the X-Next-Cursor header.
+
+    Args:
+        response: the response to set the next cursor header on
+        search_text: words to search, all of them have to match
+        limit: maximum number of posts in the page
+        cursor: cursor of the page to fetch, None for the first page
+        filter_read: flag to filter out posts according to their read status
+        filter_feed_link: to filter out posts for certain Feeds
+        filter_followed: flag to filter out posts if the feed is followed by the user
+        session: a unique session for DB connection
+        user: logged in user details
+
+    Returns:
+        a page of the matching posts from DB
+    """
+    if not search_text.split():
+        error_message = "Search text must contain at least one word!"
+        LOGGER.error(error_message)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error_message,
+        )
+    after = decode_cursor(cursor, float, int) if cursor else None
+    matches = await async_search_posts_from_db(
+        session,
+        user.id,
+        search_text,
+        limit + 1,  # one more to detect the next page
+        after=after,
+        read=filter_read,
+        feed_link=filter_feed_link,
+        followed=filter_followed,
+    )
+    if len(matches) > limit:
+        matches = matches[:limit]
+        last_post, last_rank = matches[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_rank, last_post.id)
+    return [post for post, _ in matches]
 
 
 @router.post("/toggle_read")
 async def toggle_read(
         post_guid: str,
         mark_read: bool = True,
-        session: Session = Depends(get_session),
+        session: AsyncSession = Depends(get_async_session),
         user: User = Depends(get_current_user)) -> typing.Dict[str, str]:
     """
     Marks a certain post as read or unread for the logged in user
@@ -100,29 +217,26 @@ async def toggle_read(
     Returns:
         operation result with some detail message
     """
-    error_occurred: bool = False
-    post = _get_post(post_guid, session)
-    query = select(UserPost).where(UserPost.user_id == user.id, UserPost.post_id == post.id)
-    user_post = session.exec(query).first()
-    if user_post:
-        if mark_read:
-            message = f"The post with guid '{post_guid}' is already marked as read by user '{user.username}'!"
-            error_occurred = True
+    post = await _get_post(post_guid, session)
+    is_read = post.id in await READ_STATE_INDEX.get_bitmap(session, user.id)
+    # the bitmap saves the write of a repeated toggle, UserPost decides the toggles racing with each other
+    if mark_read:
+        is_changed = not is_read and await async_mark_post_read_in_db(session, user.id, post)
+        if is_changed:
+            await READ_STATE_INDEX.commit_changes(session, user.id, read_ids=[post.id])
+            message = f"Post with guid '{post_guid}' is marked as READ for the user '{user.username}'."
         else:
-            # mark the read Post as UNREAD
-            session.delete(user_post)
-            session.commit()
-            message = f"The post with guid '{post_guid}' is marked as UNread for the user '{user.username}'"
+            message = f"The post with guid '{post_guid}' is already marked as read by user '{user.username}'!"
     else:
-        if mark_read:
-            # if reached here, the Post can be marked as READ!
-            session.add(UserPost(user_id=user.id, post_id=post.id))
-            session.commit()
-            message = f"Post with guid '{post_guid}' is marked as READ for the user '{user.username}'."
+        is_changed = is_read and await async_mark_post_unread_in_db(session, user.id, post)
+        if is_changed:
+            await READ_STATE_INDEX.commit_changes(session, user.id, unread_ids=[post.id])
+            message = f"The post with guid '{post_guid}' is marked as UNread for the user '{user.username}'"
         else:
             message = f"The post with guid '{post_guid}' cannot be marked as UNread since it is not read beforehand!"
-            error_occurred = True
-    if error_occurred:
+    if is_changed:
+        RESPONSE_CACHE.bump(user_scope(user.id))
+    else:
         LOGGER.error(message)
         raise HTTPException(
             status_code=status.HTTP_412_PRECONDITION_FAILED,
@@ -134,99 +248,70 @@ async def toggle_read(
     }
 
 
-def _get_post(post_guid: str, session: Session) -> Post:
+@router.get("/read_state")
+async def read_state(
+        post_ids: typing.List[int] = Query(...),
+        session: AsyncSession = Depends(get_async_session),
+        user: User = Depends(get_current_user),
+) -> typing.Dict[str, typing.List[int]]:
     """
-    Fetches the post object from DB or throws exception in case there is no post matching in DB
+    Splits the given posts, e.g. a page of posts, into the ones read and not read by the logged in user
 
     Args:
-        post_guid: guid of the post
+        post_ids: primary keys of the posts to check
         session: a unique session for DB connection
+        user: logged in user details
 
     Returns:
-        Post object from the DB
+        dictionary of the read and the unread post ids
     """
-    post = fetch_post_from_db(post_guid, session)
-    if not post:
-        error_message = f"There is no Post defined with the guid '{post_guid}'"
+    if len(post_ids) > MAX_PAGE_SIZE:
+        error_message = f"At most {MAX_PAGE_SIZE} posts can be checked at once!"
         LOGGER.error(error_message)
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
+            status_code=status.HTTP_400_BAD_REQUEST,
             detail=error_message,
         )
-    return post
-
-
-def _apply_read_unread_filter(posts: typing.List[Post], read_flag: bool, session: Session, user: User):
-    """
-    Filter outs the posts according to their read state (Read vs UNread)
+    read_post_ids, unread_post_ids = (await READ_STATE_INDEX.get_bitmap(session, user.id)).partition(post_ids)
+    return {
+        "read": read_post_ids,
+        "unread": unread_post_ids,
+    }
 
-    Args:
-        posts: the list of Posts to be filtered out
-        read_flag: Flag to filter out Posts
-        session: a unique session for DB connection
-        user: logged in user details
 
-    Returns:
-        the filtered out list of Posts object
-    """
-    filtered_posts: typing.List[Post] = []
-    for post in posts:
-        query = select(UserPost).where(UserPost.user_id == user.id, UserPost.post_id == post.id)
-        user_post = session.exec(query).first()  # marked as Read
-        if user_post and read_flag:
-            # filter out only Read Posts
-            filtered_posts.append(post)
-        elif not user_post and not read_flag:
-            # filter out only UNread Posts
-            filtered_posts.append(post)
-    return filtered_posts
-
-
-def _apply_feed_filter(posts: typing.List[Post], feed_link: str, session: Session):
+@router.get("/read_state_stats")
+async def read_state_stats(
+        user: User = Depends(get_current_user),
+) -> typing.Dict[str, int]:
     """
-    Filter outs the posts according to which feed they belong to
+    Returns the memory footprint of the in-memory read state bitmaps
 
     Args:
-        posts: the list of Posts to be filtered out
-        feed_link: feed link to filter out Posts
-        session: a unique session for DB connection
+         user: logged in user details
 
     Returns:
-        the filtered out list of Posts object
+        dictionary of the loaded users, read posts, containers and bytes
     """
-    query = select(Feed).where(Feed.link == feed_link)
-    feed = session.exec(query).first()
-    filtered_posts: typing.List[Post] = []
-    for post in posts:
-        if post.feed_id == feed.id:
-            filtered_posts.append(post)
-    return filtered_posts
+    return READ_STATE_INDEX.stats()
 
 
-def _apply_followed_filter(posts: typing.List[Post], followed: bool, session: Session, user: User):
+async def _get_post(post_guid: str, session: AsyncSession) -> Post:
     """
-    Filter outs the posts if the feed which they belong to is followed by the user
+    Fetches the post object from DB or throws exception in case there is no post matching in DB
 
     Args:
-        posts: the list of Posts to be filtered out
-        followed: Flag to filter out Posts
+        post_guid: guid of the post
         session: a unique session for DB connection
-        user: logged in user details
 
     Returns:
-        the filtered out list of Posts object
+        Post object from the DB
     """
-    query = select(UserFeed).where(UserFeed.user_id == user.id)
-    followed_feeds = session.exec(query).all()  # followed feeds
-    followed_feed_id_list: typing.List[int] = []
-    for feed in followed_feeds:
-        followed_feed_id_list.append(feed.feed_id)
-    filtered_posts: typing.List[Post] = []
-    for post in posts:
-        if followed and post.feed_id in followed_feed_id_list:
-            # filter out followed Feeds' posts
-            filtered_posts.append(post)
-        elif not followed and post.feed_id not in followed_feed_id_list:
-            # filter out unfollowed Feeds' posts
-            filtered_posts.append(post)
-    return filtered_posts
+    post = await async_fetch_post_from_db(post_guid, session)
+    if not post:
+        error_message = f"There is no Post defined with the guid '{post_guid}'"
+        LOGGER.error(error_message)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=error_message,
+        )
+    return post
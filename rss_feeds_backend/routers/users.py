@@ -14,12 +14,18 @@ Implementation of User related endpoints
 #                                                                              #
 # -----------------------------------------------------------------------------#
 """
+import csv
+import sys
+import typing
+
 import structlog
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import SQLModel, Session
+from sqlmodel import SQLModel, Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette import status
 
-from rss_feeds_backend.database import engine, get_session
+from rss_feeds_backend.common.password_hashing import PASSWORD_HASHER
+from rss_feeds_backend.database import engine, get_async_session
 from rss_feeds_backend.db_models.user import User, ADMIN_NAME, ADMIN_PASS
 from rss_feeds_backend.routers.authentication import get_current_user
 
@@ -31,7 +37,7 @@ router = APIRouter(prefix="/user")
 async def user_add(
         username: str,
         password: str,
-        session: Session = Depends(get_session),
+        session: AsyncSession = Depends(get_async_session),
         user: User = Depends(get_current_user)) -> User:
     """
     Adds a new user to the database. This privilege is only provided to admin!
@@ -53,10 +59,10 @@ async def user_add(
             detail=error_message,
         )
     new_user = User(username=username)
-    new_user.set_password(password)
+    await new_user.async_set_password(password)
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    await session.commit()
+    await session.refresh(new_user)
     return new_user
 
 
@@ -73,5 +79,52 @@ def main():
         session.commit()
 
 
+def provision_users(credentials: typing.List[typing.Tuple[str, str]], session: Session) -> typing.List[User]:
+    """
+    Creates the users which do not exist yet, their passwords are hashed in parallel on the password hashing pool
+
+    Args:
+        credentials: username and password pairs of the new users
+        session: session for DB connection
+
+    Returns:
+        the created users
+    """
+    usernames = [username for username, _ in credentials]
+    existing_usernames = set(session.exec(select(User.username).where(User.username.in_(usernames))).all())
+    new_credentials: typing.Dict[str, str] = {}
+    for username, password in credentials:
+        if username not in existing_usernames:
+            new_credentials.setdefault(username, password)  # the first row of a repeated username wins
+    LOGGER.info(f"{len(new_credentials)} users will be created, {len(existing_usernames)} users already exist")
+    password_hashes = PASSWORD_HASHER.hash_many(new_credentials.values())
+    new_users = [
+        User(username=username, password_hash=password_hash)
+        for username, password_hash in zip(new_credentials, password_hashes)
+    ]
+    session.add_all(new_users)
+    session.commit()
+    return new_users
+
+
+def bulk_main(path: str) -> None:
+    """
+    Creates the users listed in a CSV file of 'username,password' rows. Can be called from the terminal.
+
+    Args:
+        path: path of the CSV file
+    """
+    SQLModel.metadata.create_all(engine)
+    with open(path, newline="") as csv_file:
+        credentials = [(row[0].strip(), row[1]) for row in csv.reader(csv_file) if row]
+    with Session(engine) as session:
+        new_users = provision_users(credentials, session)
+    PASSWORD_HASHER.shutdown()
+    LOGGER.info(f"{len(new_users)} users are created from '{path}'")
+
+
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        bulk_main(sys.argv[1])
+    else:
+        main()
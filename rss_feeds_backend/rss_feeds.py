@@ -14,20 +14,34 @@ Implementation of RSS Feed Backend application initialization
 #                                                                              #
 # -----------------------------------------------------------------------------#
 """
+import time
+import typing
+
 from fastapi import FastAPI
 from sqlmodel import SQLModel, Session
 from starlette.middleware.cors import CORSMiddleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, PlainTextResponse, Response
 from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
 
-from rss_feeds_backend.database import engine, fetch_all_feeds_from_db
+from rss_feeds_backend.database import engine, fetch_all_feeds_from_db, upgrade_schema
 from rss_feeds_backend.exceptions import BadRequestException
+from rss_feeds_backend.common.logging_profile import configure_logging
+from rss_feeds_backend.common.metrics import METRICS, PROMETHEUS_MEDIA_TYPE
+from rss_feeds_backend.common.pagination import NEXT_CURSOR_HEADER
+from rss_feeds_backend.common.password_hashing import PASSWORD_HASHER
 from rss_feeds_backend.common.enums import FeedType
 from rss_feeds_backend.common.registry import container
 from rss_feeds_backend.feed_processing.feed_manager import FeedManager
 from rss_feeds_backend.routers import authentication, users, feed, post
 
+configure_logging()  # selected via the RSS_FEEDS_LOG_PROFILE environment variable
+REQUEST_SECONDS = METRICS.histogram(
+    "rss_feeds_http_request_seconds",
+    "Duration of the API requests until the response starts",
+    ("method", "route", "status"),
+    unit=1e-6,
+)
 app = FastAPI(title="RSS Feeds")
 app.include_router(authentication.router)
 app.include_router(users.router)
@@ -46,17 +60,54 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 
+@app.middleware("http")
+async def time_request(request: Request, call_next: typing.Callable[[Request], typing.Awaitable[Response]]) -> Response:
+    """
+    Records the duration of every request per route template, so that the unknown paths do not add samples
+
+    Args:
+        request: the incoming request
+        call_next: passes the request to the application
+
+    Returns:
+        the response of the application
+    """
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    route_path = route.path if route is not None else "unmatched"
+    REQUEST_SECONDS.observe(time.perf_counter() - start, request.method, route_path, str(response.status_code))
+    return response
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """
+    Exposes the ingestion and API metrics of the process in Prometheus text format
+
+    Returns:
+        the metrics as plain text
+    """
+    return PlainTextResponse(METRICS.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
 @app.on_event("startup")
 def on_startup() -> None:
     """Executed when application is starting."""
     SQLModel.metadata.create_all(engine)
+    upgrade_schema(engine)  # databases of the former versions lack the newer columns and indexes
     feed_manager = FeedManager()
     with Session(engine) as session:
         for feed_db in fetch_all_feeds_from_db(session):
-            feed_manager.define_new_feed_processor(feed_db.link, FeedType.XML)
+            feed_manager.define_new_feed_processor(
+                feed_db.link,
+                FeedType(feed_db.feed_type),
+                stored_feed=feed_db,
+            )
     container.register(FeedManager, instance=feed_manager)  # register FeedManager to access throughout the code!
 
 
@@ -64,6 +115,7 @@ def on_startup() -> None:
 def on_shutdown() -> None:
     """Executed when application is shutting down."""
     container.resolve(FeedManager).stop_all_processors()
+    PASSWORD_HASHER.shutdown()
 
 
 @app.exception_handler(BadRequestException)
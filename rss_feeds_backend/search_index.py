@@ -0,0 +1,166 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Implementation of the full-text search indexes of the posts
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import typing
+from types import MappingProxyType
+
+import structlog
+from sqlalchemy import and_, func, insert, literal, literal_column, or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Subquery, column, table
+from sqlmodel import Session
+
+from rss_feeds_backend.db_models.post import Post
+
+LOGGER = structlog.get_logger()
+FTS_TABLE_NAME = "post_fts"
+FTS_TOKENIZER = "porter unicode61"  # case and diacritics insensitive, English words are matched by their stems
+
+
+def split_search_terms(search_text: str) -> typing.List[str]:
+    """
+    Splits the search text of the user into its terms
+
+    Args:
+        search_text: free text entered by the user
+
+    Returns:
+        list of the terms, all of them have to match
+    """
+    return search_text.split()
+
+
+class PostSearchIndex:
+    """
+    Base class of the full-text search over the titles and the descriptions of the posts.
+    Used as is for the databases without a dedicated index: every term is looked up via LIKE scans and all the
+    matches share the same rank.
+    """
+
+    def create(self, connection: Connection) -> None:
+        """
+        Creates the index structures if necessary, called after the tables are created
+
+        Args:
+            connection: connection creating the tables
+        """
+
+    def index_posts(self, session: Session, guids: typing.Collection[str]) -> None:
+        """
+        Adds the newly inserted posts to the index within the inserting transaction
+
+        Args:
+            session: session inserting the posts
+            guids: guids of the inserted posts
+        """
+
+    def build_search_subquery(self, search_text: str) -> Subquery:
+        """
+        Builds the subquery of the posts matching all the terms of the search text
+
+        Args:
+            search_text: free text entered by the user
+
+        Returns:
+            subquery of the matching post ids and their ranks, lower rank is a better match
+        """
+        conditions = [
+            or_(Post.title.contains(term, autoescape=True), Post.description.contains(term, autoescape=True))
+            for term in split_search_terms(search_text)
+        ]
+        query = select(Post.id.label("post_id"), literal(0.0).label("rank")).where(and_(*conditions))
+        return query.subquery("search")
+
+
+class Fts5PostSearchIndex(PostSearchIndex):
+    """
+    SQLite FTS5 index ranking the matches by BM25. The index is an external content table over the post table,
+    so the texts are not stored twice; the ingestion adds the new posts to it in the same transaction.
+    """
+
+    fts_table = table(FTS_TABLE_NAME, column("rowid"), column("title"), column("description"))
+
+    def create(self, connection: Connection) -> None:
+        """
+        Creates the FTS5 table if necessary and fills it from the existing posts
+
+        Args:
+            connection: connection creating the tables
+        """
+        query = text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name")
+        if connection.execute(query, {"name": FTS_TABLE_NAME}).first():
+            return
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE_NAME} USING fts5("
+            f"title, description, content='{Post.__tablename__}', content_rowid='id', tokenize='{FTS_TOKENIZER}')",
+        ))
+        connection.execute(text(f"INSERT INTO {FTS_TABLE_NAME}({FTS_TABLE_NAME}) VALUES('rebuild')"))
+        LOGGER.info(f"Full-text search index '{FTS_TABLE_NAME}' is created from the existing posts")
+
+    def index_posts(self, session: Session, guids: typing.Collection[str]) -> None:
+        """
+        Adds the newly inserted posts to the FTS5 table within the inserting transaction
+
+        Args:
+            session: session inserting the posts
+            guids: guids of the inserted posts
+        """
+        if not guids:
+            return
+        new_posts = select(Post.id, Post.title, Post.description).where(Post.guid.in_(guids))
+        statement = insert(self.fts_table).from_select(["rowid", "title", "description"], new_posts)
+        session.execute(statement)
+
+    def build_search_subquery(self, search_text: str) -> Subquery:
+        """
+        Builds the subquery of the posts matching all the terms of the search text, ranked by BM25
+
+        Args:
+            search_text: free text entered by the user
+
+        Returns:
+            subquery of the matching post ids and their ranks, lower rank is a better match
+        """
+        # every term is quoted, so the text of the user cannot inject FTS5 query syntax
+        match_query = " ".join('"' + term.replace('"', '""') + '"' for term in split_search_terms(search_text))
+        fts_table_column = literal_column(FTS_TABLE_NAME)
+        query = select(
+            self.fts_table.c.rowid.label("post_id"),
+            func.bm25(fts_table_column).label("rank"),
+        ).where(fts_table_column.match(match_query))
+        return query.subquery("search")
+
+
+SEARCH_INDEX_MAP = MappingProxyType(
+    {
+        "sqlite": Fts5PostSearchIndex,
+    },
+)
+
+
+def create_search_index(backend_name: str) -> PostSearchIndex:
+    """
+    Instantiates the search index supported by the database backend
+
+    Args:
+        backend_name: name of the database backend, e.g. 'sqlite'
+
+    Returns:
+        PostSearchIndex object of the backend, the LIKE scanning base class if no dedicated index is supported
+    """
+    search_index_class = SEARCH_INDEX_MAP.get(backend_name, PostSearchIndex)
+    LOGGER.info(f"Search index '{search_index_class.__name__}' is selected for {backend_name} database")
+    return search_index_class()
@@ -48,6 +48,7 @@ setup(
     license="",
     test_suite="test",
     install_requires=[
+        "aiosqlite==0.19.0",
         "annotated-types==0.5.0",
         "anyio==3.7.1",
         "bcrypt==4.0.1",
@@ -94,6 +95,10 @@ setup(
     extras_require={
         "dev": [
         ],
+        "postgres": [
+            "asyncpg==0.28.0",
+            "psycopg2-binary==2.9.7",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -0,0 +1,115 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Unit tests of FeedScheduler class
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import types
+import typing
+
+import pytest
+
+from rss_feeds_backend.feed_processing import feed_scheduler
+from rss_feeds_backend.feed_processing.feed_scheduler import FeedScheduler
+
+
+class FakeClock:
+    """Monotonic clock advanced by the tests"""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake_clock = FakeClock()
+    monkeypatch.setattr(feed_scheduler.time, "monotonic", fake_clock)
+    return fake_clock
+
+
+def make_feed(address: str) -> typing.Any:
+    """Stands in for a FeedProcessor, the scheduler only uses its address"""
+    return types.SimpleNamespace(address=address)
+
+
+def pop_all_due(scheduler: FeedScheduler) -> typing.List[str]:
+    """Pops the due feeds and returns their addresses in the popped order"""
+    addresses = []
+    fp_obj = scheduler.pop_due()
+    while fp_obj is not None:
+        addresses.append(fp_obj.address)
+        fp_obj = scheduler.pop_due()
+    return addresses
+
+
+def test_feeds_are_popped_by_due_time(clock):
+    scheduler = FeedScheduler()
+    for address, delay in (("a", 5), ("b", 1), ("c", 3), ("d", 3)):
+        scheduler.schedule(make_feed(address), delay)
+    assert len(scheduler) == 4
+    assert scheduler.pop_due() is None
+    assert scheduler.next_due_in() == pytest.approx(1)
+    clock.now += 3
+    assert pop_all_due(scheduler) == ["b", "c", "d"]  # equal due times keep the scheduling order
+    assert scheduler.next_due_in() == pytest.approx(2)
+    clock.now += 2
+    assert pop_all_due(scheduler) == ["a"]
+    assert len(scheduler) == 0
+    assert scheduler.next_due_in() is None
+
+
+def test_reschedule_replaces_previous_schedule(clock):
+    scheduler = FeedScheduler()
+    feed = make_feed("a")
+    scheduler.schedule(feed, 1)
+    scheduler.schedule(make_feed("b"), 2)
+    scheduler.schedule(feed, 10)  # postponed
+    assert len(scheduler) == 2
+    clock.now += 5
+    assert pop_all_due(scheduler) == ["b"]
+    assert scheduler.next_due_in() == pytest.approx(5)
+    scheduler.schedule(feed, 0)  # brought forward
+    assert pop_all_due(scheduler) == ["a"]
+    clock.now += 10
+    assert pop_all_due(scheduler) == []  # the replaced entries are never popped
+    assert scheduler.heap == []
+
+
+def test_removed_feed_is_never_popped(clock):
+    scheduler = FeedScheduler()
+    for address, delay in (("a", 1), ("b", 2), ("c", 3)):
+        scheduler.schedule(make_feed(address), delay)
+    scheduler.remove("a")
+    scheduler.remove("c")
+    scheduler.remove("unknown")
+    assert len(scheduler) == 1
+    assert scheduler.next_due_in() == pytest.approx(2)  # the removed entry on top is skipped
+    clock.now += 5
+    assert pop_all_due(scheduler) == ["b"]
+    assert scheduler.next_due_in() is None
+
+
+def test_popped_feed_can_be_scheduled_again(clock):
+    scheduler = FeedScheduler()
+    feed = make_feed("a")
+    scheduler.schedule(feed, 0)
+    assert scheduler.pop_due() is feed
+    scheduler.remove("a")  # no longer scheduled, nothing to invalidate
+    scheduler.schedule(feed, 4)
+    assert len(scheduler) == 1
+    clock.now += 4
+    assert scheduler.pop_due() is feed
+    assert len(scheduler) == 0
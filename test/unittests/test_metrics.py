@@ -0,0 +1,108 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Unit tests of HdrRecorder class
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import math
+import random
+import typing
+
+import pytest
+
+from rss_feeds_backend.common.metrics import QUANTILES, SUB_BUCKET_BITS, HdrRecorder, Histogram
+
+MAX_RELATIVE_ERROR = 1 / (1 << (SUB_BUCKET_BITS - 1))  # width of a bucket relative to its lower bound
+
+
+def exact_percentile(values: typing.List[int], quantile: float) -> int:
+    """Returns the smallest recorded value with at least the given fraction of the values at or below it"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(quantile * len(ordered)), 1) - 1]
+
+
+def record_all(values: typing.Iterable[int]) -> HdrRecorder:
+    """Records the values in a new recorder"""
+    recorder = HdrRecorder()
+    for value in values:
+        recorder.record(value)
+    return recorder
+
+
+def test_empty_recorder():
+    recorder = HdrRecorder()
+    assert recorder.percentile(0.5) == 0
+    assert recorder.count == 0
+
+
+def test_small_values_are_exact():
+    values = list(range(1, 101))
+    recorder = record_all(values)
+    for quantile in (0.01, 0.25, 0.5, 0.9, 0.99, 1.0):
+        assert recorder.percentile(quantile) == exact_percentile(values, quantile)
+    assert recorder.count == 100
+    assert recorder.total == sum(values)
+    assert recorder.max == 100
+
+
+def test_negative_values_are_counted_as_zero():
+    recorder = record_all([-5, -1, 0])
+    assert recorder.buckets == {0: 3}
+    assert recorder.percentile(1.0) == 0
+
+
+@pytest.mark.parametrize("value", [127, 128, 129, 1000, 1023, 1024, 65535, 10 ** 6, 2 ** 40 + 12345])
+def test_bucket_bounds(value):
+    recorder = record_all([value])
+    (lower_bound,) = recorder.buckets
+    shift = max(value.bit_length() - SUB_BUCKET_BITS, 0)
+    assert lower_bound == value >> shift << shift
+    assert lower_bound <= value < lower_bound + (1 << shift)
+    assert (1 << shift) <= max(lower_bound * MAX_RELATIVE_ERROR, 1)
+    assert recorder.percentile(0.5) == value  # the upper bound of the bucket is capped at the maximum
+
+
+def test_percentile_returns_upper_bound_of_bucket():
+    recorder = record_all([1000, 1001, 2000])
+    assert recorder.buckets == {1000: 2, 2000: 1}
+    assert recorder.percentile(0.5) == 1007  # highest value of the bucket [1000, 1008)
+    assert recorder.percentile(1.0) == 2000
+
+
+@pytest.mark.parametrize(
+    "distribution",
+    [
+        lambda rng: rng.randrange(1, 10 ** 6),  # uniform
+        lambda rng: int(rng.expovariate(1 / 5000)),  # exponential, e.g. latencies in microseconds
+        lambda rng: int(rng.lognormvariate(10, 2)),  # long tail
+    ],
+)
+def test_quantiles_of_known_distributions(distribution):
+    rng = random.Random(25)
+    values = [distribution(rng) for _ in range(50000)]
+    recorder = record_all(values)
+    for quantile in QUANTILES + (0.0001, 1.0):
+        expected = exact_percentile(values, quantile)
+        assert expected <= recorder.percentile(quantile) <= expected * (1 + MAX_RELATIVE_ERROR)
+    assert recorder.percentile(1.0) == max(values)
+
+
+def test_histogram_records_in_its_unit():
+    histogram = Histogram("rss_feeds_test_seconds", "test", label_names=("stage",), unit=1e-6)
+    for _ in range(10):
+        histogram.observe(0.0015, "fetch")
+    recorder = histogram.recorders[("fetch",)]
+    assert recorder.percentile(0.5) == 1500
+    lines = histogram.render()
+    assert 'rss_feeds_test_seconds{stage="fetch",quantile="0.5"} 0.0015' in lines
+    assert 'rss_feeds_test_seconds_count{stage="fetch"} 10' in lines
@@ -0,0 +1,126 @@
+"""
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#                            Python script                                     #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+Description  :
+Unit tests of ReadBitmap class
+
+# -----------------------------------------------------------------------------#
+#                                                                              #
+#       Copyright (c) 2023 , Ali Yavuz Kahveci.                                #
+#                         All rights reserved                                  #
+#                                                                              #
+# -----------------------------------------------------------------------------#
+"""
+import random
+import typing
+
+import pytest
+
+from rss_feeds_backend.common.read_bitmap import ARRAY_LIMIT, CONTAINER_BITS, ReadBitmap
+
+
+def assert_same(bitmap: ReadBitmap, expected: typing.Set[int]) -> None:
+    """Checks the bitmap against the expected set of values"""
+    assert len(bitmap) == len(expected)
+    assert list(bitmap) == sorted(expected)
+    assert all(value in bitmap for value in expected)
+
+
+def test_random_values_match_set():
+    rng = random.Random(18)
+    values = {rng.randrange(4 << CONTAINER_BITS) for _ in range(20000)}
+    bitmap = ReadBitmap(values)
+    assert_same(bitmap, values)
+    removed = set(rng.sample(sorted(values), 5000))
+    for value in removed:
+        assert bitmap.discard(value)
+    assert_same(bitmap, values - removed)
+    assert not any(value in bitmap for value in removed)
+
+
+def test_boundary_values():
+    values = {0, (1 << CONTAINER_BITS) - 1, 1 << CONTAINER_BITS, (1 << 32) - 1}
+    bitmap = ReadBitmap(values)
+    assert_same(bitmap, values)
+    assert bitmap.container_counts() == {"array": 3, "bitmap": 0}
+
+
+def test_add_and_discard_report_changes():
+    bitmap = ReadBitmap()
+    assert bitmap.add(7)
+    assert not bitmap.add(7)
+    assert bitmap.discard(7)
+    assert not bitmap.discard(7)
+    assert not bitmap.discard(1 << CONTAINER_BITS)
+    assert_same(bitmap, set())
+    assert bitmap.containers == {}
+
+
+def test_array_is_converted_to_bitmap_beyond_limit():
+    expected = set(range(0, 2 * ARRAY_LIMIT + 2, 2))  # one value more than the limit
+    bitmap = ReadBitmap(expected)
+    assert bitmap.container_counts() == {"array": 0, "bitmap": 1}
+    assert_same(bitmap, expected)
+    assert not bitmap.add(0)  # already in the bitmap container
+    assert bitmap.add(1)
+    expected.add(1)
+    assert_same(bitmap, expected)
+
+
+def test_array_stays_at_limit():
+    expected = set(range(ARRAY_LIMIT))
+    bitmap = ReadBitmap(expected)
+    assert bitmap.container_counts() == {"array": 1, "bitmap": 0}
+    bitmap.add(ARRAY_LIMIT)
+    expected.add(ARRAY_LIMIT)
+    assert bitmap.container_counts() == {"array": 0, "bitmap": 1}
+    assert_same(bitmap, expected)
+
+
+def test_discard_demotes_bitmap_to_array():
+    expected = set(range(ARRAY_LIMIT + 2))
+    bitmap = ReadBitmap(expected)
+    bitmap.discard(5)
+    expected.discard(5)
+    assert bitmap.container_counts() == {"array": 0, "bitmap": 1}
+    bitmap.discard(ARRAY_LIMIT)
+    expected.discard(ARRAY_LIMIT)
+    assert bitmap.container_counts() == {"array": 1, "bitmap": 0}
+    assert_same(bitmap, expected)
+    bitmap.add(5)
+    bitmap.add(ARRAY_LIMIT)
+    expected |= {5, ARRAY_LIMIT}
+    assert bitmap.container_counts() == {"array": 0, "bitmap": 1}
+    assert_same(bitmap, expected)
+
+
+def test_random_operations_across_conversions_match_set():
+    rng = random.Random(4096)
+    bitmap = ReadBitmap()
+    expected = set()
+    for _ in range(60000):  # values of 2 containers, dense enough to cross the limit back and forth
+        value = rng.randrange(2 * ARRAY_LIMIT) + rng.randrange(2) * (1 << CONTAINER_BITS)
+        if rng.random() < 0.55:
+            assert bitmap.add(value) == (value not in expected)
+            expected.add(value)
+        else:
+            assert bitmap.discard(value) == (value in expected)
+            expected.discard(value)
+    assert_same(bitmap, expected)
+    assert sum(bitmap.cardinalities.values()) == len(expected)
+
+
+@pytest.mark.parametrize("size", [0, 100, ARRAY_LIMIT + 100])
+def test_partition_matches_set_operations(size):
+    rng = random.Random(size)
+    values = set(rng.sample(range(3 << CONTAINER_BITS), size))
+    bitmap = ReadBitmap(values)
+    page = [rng.randrange(3 << CONTAINER_BITS) for _ in range(300)] + rng.sample(sorted(values), min(size, 50))
+    inside, outside = bitmap.partition(page)
+    assert inside == sorted(set(page) & values)
+    assert outside == sorted(set(page) - values)
+    assert bitmap.intersection(page) == inside
+    assert bitmap.difference(page) == outside